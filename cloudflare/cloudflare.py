@@ -3,17 +3,800 @@ import asyncio
 import time
 import tempfile
 from datetime import datetime
-from PIL import Image #type: ignore
+from PIL import Image, ImageOps #type: ignore
 from redbot.core import commands, Config #type: ignore
+from redbot.core.data_manager import cog_data_path #type: ignore
 import aiohttp #type: ignore
 import ipaddress
 import json
 import re
 import io
+import logging
+import sqlite3
+import csv
+import hashlib
+import gzip
+import yaml #type: ignore
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+log = logging.getLogger("red.beehive-cogs.cloudflare")
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings of it map to one scan."""
+    parts = urlsplit(url.strip().strip("<>"))
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+class Paginator(discord.ui.View):
+    """
+    Button paginator that renders pages on demand.
+
+    `source` is a zero-argument callable returning an iterator or async iterator of pages, so
+    pages are only built when the user reaches them. A page is an embed, or an `(embed, items)`
+    tuple whose extra items (such as link buttons) are shown with that page only. Only the last
+    `window` rendered pages are kept; moving back past them restarts the source and skips
+    forward to the wanted page.
+    """
+
+    def __init__(self, author, source, *, timeout: float = 60.0, window: int = 10):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.source = source
+        self.window = window
+        self.message = None
+        self.index = 0
+        self.total = None
+        self._pages = OrderedDict()
+        self._iterator = None
+        self._produced = 0
+        self._page_items = []
+
+    async def send(self, destination, message: discord.Message = None):
+        """
+        Send the first page, attaching the page buttons only if there is more than one.
+
+        Pass `message` to turn an already sent message into the paginator instead.
+        """
+        first = await self._page(0)
+        if first is None:
+            return None
+        if await self._page(1) is None:
+            self._remove_navigation()
+        embed = self._show_items(first)
+        self._refresh_buttons()
+        if message is not None:
+            await message.edit(embed=embed, view=self if self.children else None)
+            self.message = message
+        else:
+            self.message = await destination.send(embed=embed, view=self if self.children else None)
+        if not self.children:
+            self.stop()
+        return self.message
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("Only the person who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self):
+        self._remove_navigation()
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self if self.children else None)
+            except discord.HTTPException:
+                pass
+
+    def _remove_navigation(self):
+        for item in (self.previous_page, self.page_label, self.next_page, self.close):
+            self.remove_item(item)
+
+    def _show_items(self, page):
+        """Swap in the extra items of `page` and return its embed."""
+        embed, items = page if isinstance(page, tuple) else (page, [])
+        for item in self._page_items:
+            self.remove_item(item)
+        self._page_items = list(items)
+        for item in self._page_items:
+            self.add_item(item)
+        return embed
+
+    async def _advance(self):
+        try:
+            if hasattr(self._iterator, "__anext__"):
+                page = await self._iterator.__anext__()
+            else:
+                page = next(self._iterator)
+        except (StopIteration, StopAsyncIteration):
+            self.total = self._produced
+            return None
+        self._pages[self._produced] = page
+        self._produced += 1
+        while len(self._pages) > self.window:
+            self._pages.popitem(last=False)
+        return page
+
+    async def _page(self, index: int):
+        if index in self._pages:
+            self._pages.move_to_end(index)
+            return self._pages[index]
+        if self.total is not None and index >= self.total:
+            return None
+        if self._iterator is None or index < self._produced:
+            source = self.source()
+            self._iterator = source.__aiter__() if hasattr(source, "__aiter__") else iter(source)
+            self._produced = 0
+            self._pages.clear()
+        page = None
+        while self._produced <= index:
+            page = await self._advance()
+            if page is None:
+                return None
+        return page
+
+    def _refresh_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.total is not None and self.index >= self.total - 1
+        total = self.total if self.total is not None else "?"
+        self.page_label.label = f"{self.index + 1}/{total}"
+
+    async def _show(self, interaction: discord.Interaction, index: int):
+        page = await self._page(index)
+        if page is None:
+            await interaction.response.defer()
+            return
+        self.index = index
+        # Look one page ahead so the next button is disabled on the last page
+        await self._page(index + 1)
+        if index in self._pages:
+            self._pages.move_to_end(index)
+        embed = self._show_items(page)
+        self._refresh_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.grey)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="1/?", style=discord.ButtonStyle.grey, disabled=True)
+    async def page_label(self, interaction: discord.Interaction, button: discord.ui.Button):
+        pass
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.grey)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index + 1)
+
+    @discord.ui.button(emoji="❌", style=discord.ButtonStyle.grey)
+    async def close(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.defer()
+        await interaction.message.delete()
+
+
+ASN_HEADERS = {"asn", "as", "as_number", "asnumber", "autonomous_system"}
+
+
+def parse_indicators(text: str):
+    """
+    Split free-form text (one per line, CSV, or space separated) into unique IPs, collapsed networks and ASNs.
+
+    ASNs need their `AS` prefix (`AS13335`), so ports, counts and timestamps in pasted logs aren't looked up.
+    Bare numbers are only taken as ASNs when the input is a single column, or from a column whose CSV header
+    names it as the ASN. Returns `(ips, networks, asns, duplicates, invalid)`.
+    """
+    rows = [
+        [token.strip().strip("\"'") for token in re.split(r"[\s,;]+", line.strip())]
+        for line in text.splitlines() if line.strip()
+    ]
+    asn_columns = set()
+    # A first line without any digits is a header rather than data
+    if rows and not any(re.search(r"\d", token) for token in rows[0]):
+        asn_columns = {column for column, name in enumerate(rows.pop(0)) if name.lower() in ASN_HEADERS}
+    single_column = all(len([token for token in row if token]) <= 1 for row in rows)
+
+    ips, networks, asns, invalid = set(), set(), set(), []
+    duplicates = 0
+    for row in rows:
+        for column, token in enumerate(row):
+            if not token:
+                continue
+            before = len(ips) + len(networks) + len(asns)
+            asn_match = re.fullmatch(r"(?i)as(\d{1,10})", token)
+            if not asn_match and (single_column or column in asn_columns):
+                asn_match = re.fullmatch(r"(\d{1,10})", token)
+            if asn_match and int(asn_match.group(1)) <= 0xFFFFFFFF:
+                asns.add(int(asn_match.group(1)))
+            else:
+                try:
+                    ips.add(ipaddress.ip_address(token))
+                except ValueError:
+                    try:
+                        networks.add(ipaddress.ip_network(token, strict=False))
+                    except ValueError:
+                        invalid.append(token)
+                        continue
+            if len(ips) + len(networks) + len(asns) == before:
+                duplicates += 1
+
+    collapsed = []
+    for version in (4, 6):
+        collapsed.extend(ipaddress.collapse_addresses(net for net in networks if net.version == version))
+    duplicates += len(networks) - len(collapsed)
+    return sorted(ips, key=lambda ip: (ip.version, ip)), collapsed, sorted(asns), duplicates, invalid
+
+
+IMAGE_FORMATS = {"PNG": "image/png", "JPEG": "image/jpeg", "GIF": "image/gif", "WEBP": "image/webp"}
+IMAGE_TRANSCODE_FORMATS = {"webp": ("WEBP", "image/webp"), "avif": ("AVIF", "image/avif")}
+IMAGE_MAX_DIMENSION = 12000
+IMAGE_MAX_AREA = 100_000_000
+# Upload limit used outside servers (DMs), where there's no guild filesize_limit to check
+DEFAULT_UPLOAD_LIMIT = 10 * 1024 * 1024
+
+
+def prepare_image(data: bytes, filename: str, transcode: str = None):
+    """
+    Validate, strip metadata from and optionally transcode an image before upload.
+
+    This is CPU bound and meant to run in a worker thread. Returns `(data, filename, content_type, info)`
+    and raises `ValueError` for anything Cloudflare Images would reject.
+    """
+    try:
+        # open() only reads the header, so the size limits below are checked before any pixels are decoded
+        image = Image.open(io.BytesIO(data))
+    except Image.DecompressionBombError:
+        raise ValueError("Image is too large to process.")
+    except Exception:
+        raise ValueError("File is not a readable image.")
+
+    if image.format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format `{image.format}`.")
+    width, height = image.size
+    if max(width, height) > IMAGE_MAX_DIMENSION or width * height > IMAGE_MAX_AREA:
+        raise ValueError(f"Image is {width}x{height}; the limit is {IMAGE_MAX_DIMENSION}px per side and {IMAGE_MAX_AREA:,} pixels.")
+    try:
+        image.load()
+    except Image.DecompressionBombError:
+        raise ValueError("Image is too large to process.")
+    except Exception:
+        raise ValueError("File is not a readable image.")
+
+    info = {"format": image.format, "width": width, "height": height, "original_size": len(data)}
+    if getattr(image, "is_animated", False):
+        # Re-encoding animations frame by frame costs far more than it saves; upload them as-is.
+        info["processed_size"] = len(data)
+        return data, filename, IMAGE_FORMATS[image.format], info
+
+    source_format = image.format
+    transposed = image.getexif().get(0x0112, 1) != 1
+    if transposed:
+        image = ImageOps.exif_transpose(image)
+    transparency = image.info.get("transparency")
+    image.info = {"transparency": transparency} if transparency is not None else {}
+
+    if transcode:
+        save_format, content_type = IMAGE_TRANSCODE_FORMATS[transcode]
+        filename = f"{filename.rsplit('.', 1)[0]}.{transcode}"
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or transparency is not None else "RGB")
+    else:
+        save_format, content_type = source_format, IMAGE_FORMATS[source_format]
+
+    options = {}
+    if save_format == "JPEG":
+        # "keep" reuses the source quantization tables, which only exist while the image is untouched.
+        options["quality"] = 90 if transposed else "keep"
+    elif save_format == "WEBP":
+        options["quality"] = 85
+    elif save_format == "AVIF":
+        options["quality"] = 70
+    elif save_format == "PNG":
+        options["optimize"] = True
+
+    output = io.BytesIO()
+    image.save(output, format=save_format, **options)
+    processed = output.getvalue()
+    info.update(width=image.width, height=image.height, format=save_format, processed_size=len(processed))
+    return processed, filename, content_type, info
+
+
+def har_attachment(har: dict, scan_id: str, limit: int):
+    """
+    Encode a scan's HAR for upload as compact JSON, gzipped if that's what it takes to fit under `limit` bytes.
+
+    Returns `(data, filename)`, or None if it won't fit either way. Meant to run in a worker thread.
+    """
+    data = json.dumps(har, separators=(",", ":")).encode()
+    if len(data) <= limit:
+        return data, f"{scan_id}_har.json"
+    data = gzip.compress(data, compresslevel=6)
+    if len(data) <= limit:
+        return data, f"{scan_id}_har.json.gz"
+    return None
+
+
+class RateLimiter:
+    """Token bucket that allows `rate` acquisitions every `per` seconds."""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+
+
+def parse_scan_verdict(scan_id: str, scan_result: dict) -> dict:
+    """Reduce a finished URL scan to the verdict fields the cog reports on."""
+    overall = scan_result.get("verdicts", {}).get("overall", {})
+    return {
+        "scan_id": scan_id,
+        "url": scan_result.get("task", {}).get("url"),
+        "malicious": bool(overall.get("malicious", False)),
+        "categories": [category.get("name") for category in overall.get("categories", [])],
+        "phishing": list(overall.get("phishing", [])),
+        "scanned_at": time.time(),
+    }
+
+
+class VerdictCache:
+    """SQLite-backed store of URL scan verdicts keyed by canonical URL, expiring after `ttl` seconds."""
+
+    def __init__(self, path, ttl: int = 3600):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(str(path))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts (url TEXT PRIMARY KEY, verdict TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM verdicts WHERE stored_at >= ?", (time.time() - self.ttl,)).fetchone()[0]
+
+    def get(self, url: str):
+        row = self._db.execute("SELECT verdict, stored_at FROM verdicts WHERE url = ?", (canonicalize_url(url),)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, url: str, verdict: dict):
+        self._db.execute(
+            "INSERT OR REPLACE INTO verdicts (url, verdict, stored_at) VALUES (?, ?, ?)",
+            (canonicalize_url(url), json.dumps(verdict), time.time())
+        )
+        self._db.execute("DELETE FROM verdicts WHERE stored_at < ?", (time.time() - self.ttl,))
+        self._db.commit()
+
+    def clear(self):
+        self._db.execute("DELETE FROM verdicts")
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._db.close()
+
+    def describe(self) -> str:
+        return f"Verdict cache hit rate {self.hit_rate:.0%} ({self.hits}/{self.hits + self.misses})"
+
+
+class ImageIndex:
+    """SQLite-backed local index of Cloudflare Images libraries, kept in sync by `uploaded` timestamp."""
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(str(path))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            "account_id TEXT NOT NULL, id TEXT NOT NULL, filename TEXT, uploaded TEXT, variants TEXT NOT NULL, "
+            "signed INTEGER NOT NULL DEFAULT 0, size INTEGER, PRIMARY KEY (account_id, id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS images_uploaded ON images (account_id, uploaded)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS image_syncs (account_id TEXT PRIMARY KEY, watermark TEXT NOT NULL, synced_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def watermark(self, account_id: str):
+        """Newest `uploaded` timestamp seen by the last sync, or None if the account has never been synced."""
+        row = self._db.execute("SELECT watermark FROM image_syncs WHERE account_id = ?", (account_id,)).fetchone()
+        return row[0] if row else None
+
+    def synced_at(self, account_id: str):
+        row = self._db.execute("SELECT synced_at FROM image_syncs WHERE account_id = ?", (account_id,)).fetchone()
+        return row[0] if row else None
+
+    def upsert(self, account_id: str, images, full: bool = False, synced: bool = False):
+        """
+        Store `images` as returned by the API.
+
+        A `full` sync also drops anything no longer listed, and a `synced` batch moves the sync watermark forward.
+        """
+        rows = [
+            (
+                account_id, image.get("id"), image.get("filename"), image.get("uploaded"),
+                json.dumps(image.get("variants", [])), int(bool(image.get("requireSignedURLs"))), image.get("size")
+            )
+            for image in images if image.get("id")
+        ]
+        if full:
+            self._db.execute("DELETE FROM images WHERE account_id = ?", (account_id,))
+        self._db.executemany(
+            "INSERT OR REPLACE INTO images (account_id, id, filename, uploaded, variants, signed, size) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        if synced:
+            watermark = max([row[3] or "" for row in rows] + [self.watermark(account_id) or ""])
+            self._db.execute(
+                "INSERT OR REPLACE INTO image_syncs (account_id, watermark, synced_at) VALUES (?, ?, ?)",
+                (account_id, watermark, time.time())
+            )
+        self._db.commit()
+
+    def remove(self, account_id: str, image_id: str):
+        self._db.execute("DELETE FROM images WHERE account_id = ? AND id = ?", (account_id, image_id))
+        self._db.commit()
+
+    def search(self, account_id: str, text: str = None, after: str = None, before: str = None, variant: str = None, signed: bool = None):
+        """Indexed images matching every given filter, newest first."""
+        clauses, params = ["account_id = ?"], [account_id]
+        if text:
+            clauses.append("(filename LIKE ? OR id LIKE ?)")
+            params += [f"%{text}%"] * 2
+        if after:
+            clauses.append("uploaded >= ?")
+            params.append(after)
+        if before:
+            clauses.append("uploaded < ?")
+            params.append(before)
+        if variant:
+            clauses.append("variants LIKE ?")
+            params.append(f'%/{variant}"%')
+        if signed is not None:
+            clauses.append("signed = ?")
+            params.append(int(signed))
+        cursor = self._db.execute(
+            f"SELECT id, filename, uploaded, variants, signed, size FROM images WHERE {' AND '.join(clauses)} ORDER BY uploaded DESC",
+            params
+        )
+        for image_id, filename, uploaded, variants, signed_urls, size in cursor:
+            yield {
+                "id": image_id, "filename": filename, "uploaded": uploaded,
+                "variants": json.loads(variants), "signed": bool(signed_urls), "size": size,
+            }
+
+    def stats(self, account_id: str) -> dict:
+        count, signed, oldest, newest, total_size = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(signed), 0), MIN(uploaded), MAX(uploaded), SUM(size) FROM images WHERE account_id = ?",
+            (account_id,)
+        ).fetchone()
+        recent_cutoff = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(time.time() - 30 * 86400))
+        recent = self._db.execute(
+            "SELECT COUNT(*) FROM images WHERE account_id = ? AND uploaded >= ?", (account_id, recent_cutoff)
+        ).fetchone()[0]
+        variants = Counter()
+        for (row,) in self._db.execute("SELECT variants FROM images WHERE account_id = ?", (account_id,)):
+            variants.update(url.rsplit("/", 1)[-1] for url in json.loads(row))
+        return {
+            "count": count, "signed": signed, "oldest": oldest, "newest": newest, "total_size": total_size,
+            "recent": recent, "variants": variants, "synced_at": self.synced_at(account_id),
+        }
+
+    def close(self):
+        self._db.close()
+
+
+def load_desired_state(data: bytes, filename: str) -> dict:
+    """Parse a desired-state document, YAML for `.yaml`/`.yml` files and JSON otherwise."""
+    text = data.decode("utf-8")
+    try:
+        state = yaml.safe_load(text) if filename.lower().endswith((".yaml", ".yml")) else json.loads(text)
+    except (yaml.YAMLError, json.JSONDecodeError) as e:
+        raise ValueError(f"Could not parse `{filename}`: {e}")
+    if not isinstance(state, dict):
+        raise ValueError("The desired-state file must contain a mapping at the top level.")
+    return state
+
+
+def routing_rule_key(rule: dict) -> str:
+    """Identify an Email Routing rule by its matchers, which is what makes two rules the same rule."""
+    matchers = sorted((m.get("type", ""), m.get("field", ""), str(m.get("value", ""))) for m in rule.get("matchers", []))
+    return json.dumps(matchers)
+
+
+def normalize_routing_rule(rule: dict) -> dict:
+    """Expand the `source`/`destination` shorthand into a full Email Routing rule body."""
+    if "source" not in rule:
+        return dict(rule)
+    body = {key: value for key, value in rule.items() if key not in ("source", "destination")}
+    destination = rule.get("destination", [])
+    body["matchers"] = [{"type": "literal", "field": "to", "value": rule["source"]}]
+    body["actions"] = [{"type": "forward", "value": destination if isinstance(destination, list) else [destination]}]
+    return body
+
+
+def diff_resources(current: dict, desired: dict, prune: bool = False, read_only=()):
+    """
+    Compare keyed current and desired resources and return `(action, key, current, body)` changes.
+
+    Only the fields present in a desired resource are compared, and updates send the current resource
+    merged with the desired fields so omitted settings are left as they are. Resources that only exist
+    remotely are deleted when `prune` is set.
+    """
+    changes = []
+    for key, wanted in desired.items():
+        existing = current.get(key)
+        if existing is None:
+            changes.append(("create", key, None, wanted))
+        elif any(existing.get(field) != value for field, value in wanted.items()):
+            body = {field: value for field, value in {**existing, **wanted}.items() if field not in read_only}
+            changes.append(("update", key, existing, body))
+    if prune:
+        changes.extend(("delete", key, existing, None) for key, existing in current.items() if key not in desired)
+    return changes
+
+
+class JobTimeout(Exception):
+    """Raised when a polled job does not finish within its allotted time."""
+
+
+class JobPoller:
+    """
+    Polls long-running Cloudflare jobs with exponential backoff and an upper bound on duration.
+
+    Every wait is tracked so that unloading the cog cancels jobs still being polled.
+    """
+
+    def __init__(self, initial: float = 5.0, factor: float = 2.0, max_interval: float = 30.0, max_duration: float = 600.0):
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self.max_duration = max_duration
+        self._waiters = set()
+
+    async def wait(self, check, on_pending=None, max_duration: float = None):
+        """
+        Await `check()` until it returns something other than None and return that value.
+
+        `on_pending` is awaited after every unfinished check. Raises JobTimeout once
+        `max_duration` seconds have passed without a result.
+        """
+        task = asyncio.current_task()
+        self._waiters.add(task)
+        deadline = time.monotonic() + (max_duration or self.max_duration)
+        interval = self.initial
+        try:
+            while True:
+                await asyncio.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+                result = await check()
+                if result is not None:
+                    return result
+                if time.monotonic() >= deadline:
+                    raise JobTimeout()
+                if on_pending is not None:
+                    await on_pending()
+                interval = min(interval * self.factor, self.max_interval)
+        finally:
+            self._waiters.discard(task)
+
+    def cancel_all(self):
+        for task in list(self._waiters):
+            task.cancel()
+
+
+class URLScanScheduler:
+    """
+    Background pipeline for automatic URL scans.
+
+    Submissions go out concurrently under a global rate limit, one poller task checks every
+    pending scan on an adaptive interval, and verdicts are dispatched to every message that
+    contained the URL. The same URL posted many times maps to one in-flight scan.
+    """
+
+    SUBMIT_CONCURRENCY = 4
+    POLL_MIN_INTERVAL = 10
+    POLL_MAX_INTERVAL = 60
+    SCAN_TIMEOUT = 600
+
+    def __init__(self, cog, submit_rate: int = 30, submit_per: float = 60.0):
+        self.cog = cog
+        self.limiter = RateLimiter(submit_rate, submit_per)
+        self._submit_semaphore = asyncio.Semaphore(self.SUBMIT_CONCURRENCY)
+        self._inflight = {}  # canonical url -> scan entry
+        self._pending = {}  # scan uuid -> scan entry
+        self._tasks = set()
+        self._poller = None
+        self._poll_interval = self.POLL_MIN_INTERVAL
+
+    def enqueue(self, url: str, message: discord.Message):
+        """Attach a message to the scan for `url`, submitting a new scan only if none is in flight."""
+        key = canonicalize_url(url)
+        scan = self._inflight.get(key)
+        if scan is not None:
+            scan["messages"].append(message)
+            return
+        cached = self.cog.verdicts.get(key)
+        if cached is not None:
+            if cached["malicious"]:
+                self._spawn(self._dispatch_threat([message]))
+            return
+        scan = {"url": key, "uuid": None, "submitted": None, "messages": [message]}
+        self._inflight[key] = scan
+        self._spawn(self._submit(scan))
+
+    def shutdown(self):
+        if self._poller is not None:
+            self._poller.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        self._inflight.clear()
+        self._pending.clear()
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _credentials(self):
+        api_tokens = await self.cog.bot.get_shared_api_tokens("cloudflare")
+        account_id = api_tokens.get("account_id")
+        bearer_token = api_tokens.get("bearer_token")
+        if not account_id or not bearer_token:
+            return None, None
+        headers = {
+            "Authorization": f"Bearer {bearer_token}",
+            "Content-Type": "application/json"
+        }
+        return account_id, headers
+
+    async def _submit(self, scan):
+        scan_id = None
+        try:
+            account_id, headers = await self._credentials()
+            if account_id:
+                api_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan"
+                async with self._submit_semaphore:
+                    await self.limiter.acquire()
+                    async with self.cog.session.post(api_url, headers=headers, json={"url": scan["url"]}) as response:
+                        if response.status == 409:
+                            data = None
+                        else:
+                            data = await response.json()
+                            if data.get("success", False):
+                                scan_id = data.get("result", {}).get("uuid")
+                if data is None:
+                    # Domain on cooldown, reuse the most recent scan of this URL instead
+                    scan_id = await self.cog._find_latest_scan(scan["url"], account_id, headers)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("Failed to submit %s for scanning", scan["url"])
+
+        if not scan_id:
+            self._inflight.pop(scan["url"], None)
+            return
+
+        scan["uuid"] = scan_id
+        scan["submitted"] = time.monotonic()
+        self._pending[scan_id] = scan
+        self._poll_interval = self.POLL_MIN_INTERVAL
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    async def _poll_loop(self):
+        while self._pending:
+            await asyncio.sleep(self._poll_interval)
+            try:
+                account_id, headers = await self._credentials()
+                if not account_id:
+                    continue
+                scans = list(self._pending.values())
+                finished = await asyncio.gather(
+                    *(self._check(scan, account_id, headers) for scan in scans),
+                    return_exceptions=True
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("URL scan poller failed")
+                continue
+
+            if any(result is True for result in finished):
+                self._poll_interval = self.POLL_MIN_INTERVAL
+            else:
+                self._poll_interval = min(self._poll_interval * 2, self.POLL_MAX_INTERVAL)
+
+    async def _check(self, scan, account_id, headers):
+        """Poll one scan. Returns True once the scan has left the pending set."""
+        status_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan/{scan['uuid']}"
+        data = None
+        try:
+            async with self.cog.session.get(status_url, headers=headers) as response:
+                if response.status != 202:
+                    data = await response.json()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.debug("Failed to check scan %s, will retry", scan["uuid"], exc_info=True)
+
+        if data is None:
+            if time.monotonic() - scan["submitted"] > self.SCAN_TIMEOUT:
+                self._finish(scan)
+                return True
+            return False
+
+        self._finish(scan)
+        if not data.get("success", False):
+            return True
+        verdict = parse_scan_verdict(scan["uuid"], data.get("result", {}).get("scan", {}))
+        self.cog.verdicts.put(scan["url"], verdict)
+        if verdict["malicious"]:
+            self._spawn(self._dispatch_threat(scan["messages"]))
+        return True
+
+    def _finish(self, scan):
+        self._pending.pop(scan["uuid"], None)
+        self._inflight.pop(scan["url"], None)
+
+    async def _dispatch_threat(self, messages):
+        unique = {message.id: message for message in messages}
+        await asyncio.gather(*(self._remove_message(message) for message in unique.values()))
+
+    async def _remove_message(self, message: discord.Message):
+        try:
+            await message.delete()
+        except discord.NotFound:
+            # Already removed, possibly because another link in it was flagged first
+            return
+        except discord.HTTPException:
+            log.warning("Unable to remove flagged message %s in channel %s", message.id, message.channel.id)
+            return
+        embed = discord.Embed(
+            title="Cloudflare detected a threat!",
+            description=f"Cloudflare detected a threat in a message sent in this channel and removed it to safeguard the community.",
+            color=0xFF6633
+        )
+        try:
+            await message.channel.send(embed=embed)
+        except discord.HTTPException:
+            pass
+
 
 class Cloudflare(commands.Cog):
     """A Red-Discordbot cog to interact with the Cloudflare API."""
 
+    ACCOUNT_CONCURRENCY = 4
+    INTEL_CACHE_TTL = 3600
+    BULK_INTEL_LIMIT = 10000
+    IMAGE_SYNC_INTERVAL = 300
+    APPLY_CONCURRENCY = 8
+
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1234567890)
@@ -22,10 +805,247 @@ class Cloudflare(commands.Cog):
             "email": None,
             "bearer_token": None,
             "account_id": None,
+            "image_hashes": {},
+            "image_bytes_saved": 0,
         }
         self.config.register_global(**default_global)
+        self.config.register_guild(auto_scan=False)
         self.session = aiohttp.ClientSession()
-    
+        self.verdicts = VerdictCache(cog_data_path(self) / "verdicts.sqlite3")
+        self.image_index = ImageIndex(cog_data_path(self) / "images.sqlite3")
+        self.url_scans = URLScanScheduler(self)
+        self.jobs = JobPoller()
+        self._account_limits = {}
+        self._intel_cache = {}
+        self.image_executor = ThreadPoolExecutor(max_workers=2)
+        self._image_sync_locks = {}
+
+    def cog_unload(self):
+        self.image_executor.shutdown(wait=False)
+        self.jobs.cancel_all()
+        self.url_scans.shutdown()
+        self.verdicts.close()
+        self.image_index.close()
+        self.bot.loop.create_task(self.session.close())
+
+    def _account_limit(self, account_id: str):
+        """Semaphore bounding how many Cloudflare API calls one account has in flight at once."""
+        limit = self._account_limits.get(account_id)
+        if limit is None:
+            limit = self._account_limits[account_id] = asyncio.Semaphore(self.ACCOUNT_CONCURRENCY)
+        return limit
+
+    async def _account_get(self, account_id: str, headers: dict, path: str, params: dict = None):
+        """GET an account-scoped API path and return its `result`, raising on an unsuccessful response."""
+        url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/{path}"
+        async with self._account_limit(account_id):
+            async with self.session.get(url, headers=headers, params=params) as response:
+                data = await response.json()
+        if not data.get("success", False):
+            error_message = (data.get("errors") or [{"message": f"Status code: {response.status}"}])[0].get("message")
+            raise RuntimeError(error_message)
+        return data.get("result")
+
+    async def _cached_account_get(self, account_id: str, headers: dict, path: str, params: dict = None):
+        """Like `_account_get`, but reuses results fetched within the last `INTEL_CACHE_TTL` seconds."""
+        key = (account_id, path, tuple(sorted((params or {}).items())))
+        cached = self._intel_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.INTEL_CACHE_TTL:
+            return cached[1]
+        result = await self._account_get(account_id, headers, path, params)
+        now = time.monotonic()
+        if len(self._intel_cache) > 20000:
+            self._intel_cache = {key: value for key, value in self._intel_cache.items() if now - value[0] < self.INTEL_CACHE_TTL}
+        self._intel_cache[key] = (now, result)
+        return result
+
+    async def _sync_images(self, account_id: str, headers: dict, full: bool = False) -> int:
+        """
+        Bring the local image index up to date by walking `/images/v2` with continuation tokens.
+
+        Incremental syncs list newest first and stop at the newest image already indexed; a full sync
+        re-lists everything so deleted images drop out. Returns the number of images fetched.
+        """
+        lock = self._image_sync_locks.setdefault(account_id, asyncio.Lock())
+        async with lock:
+            watermark = None if full else self.image_index.watermark(account_id)
+            synced_at = self.image_index.synced_at(account_id)
+            if watermark is not None and time.time() - synced_at < self.IMAGE_SYNC_INTERVAL:
+                return 0
+
+            params = {"per_page": 1000, "sort_order": "desc"}
+            fetched = []
+            while True:
+                result = await self._account_get(account_id, headers, "images/v2", params) or {}
+                images = result.get("images", [])
+                fetched.extend(images)
+                if watermark is not None and any((image.get("uploaded") or "") <= watermark for image in images):
+                    break
+                token = result.get("continuation_token")
+                if not token or not images:
+                    break
+                params["continuation_token"] = token
+            self.image_index.upsert(account_id, fetched, full=watermark is None, synced=True)
+            return len(fetched)
+
+    async def _get_all_pages(self, url: str, headers: dict, limit_key: str, per_page: int = 50):
+        """Fetch every page of a paginated list endpoint, requesting the pages after the first concurrently."""
+        async def fetch(page):
+            async with self._account_limit(limit_key):
+                async with self.session.get(url, headers=headers, params={"page": page, "per_page": per_page}) as response:
+                    data = await response.json(content_type=None)
+            if not data.get("success", False):
+                error_message = (data.get("errors") or [{"message": f"Status code: {response.status}"}])[0].get("message")
+                raise RuntimeError(error_message)
+            return data
+
+        first = await fetch(1)
+        total_pages = (first.get("result_info") or {}).get("total_pages") or 1
+        rest = await asyncio.gather(*(fetch(page) for page in range(2, total_pages + 1)))
+        return [item for data in (first, *rest) for item in data.get("result") or []]
+
+    async def _apply_plan(self, ctx, title: str, phases, headers: dict, dry_run: bool):
+        """
+        Preview a list of change phases, then (unless `dry_run`) confirm and run them.
+
+        Phases run one after another; the changes within a phase run concurrently, at most
+        `APPLY_CONCURRENCY` at a time.
+        """
+        changes = [change for phase in phases for change in phase]
+        if not changes:
+            await ctx.send(embed=discord.Embed(
+                title=title,
+                description="Everything already matches the desired state. Nothing to change.",
+                color=0x2BBD8E
+            ))
+            return
+
+        symbols = {"create": "+", "update": "~", "delete": "-"}
+        lines = [f"{symbols[change['action']]} {change['kind']} {change['label']}" for change in changes]
+        totals = Counter((change["kind"], change["action"]) for change in changes)
+        summary = "\n".join(f"**{kind}**: `{count}` to {action}" for (kind, action), count in sorted(totals.items()))
+        preview = "\n".join(lines[:20]) + (f"\n... and {len(lines) - 20} more" if len(lines) > 20 else "")
+
+        embed = discord.Embed(
+            title=f"{title} plan" if dry_run else "Confirm changes",
+            description=f"{summary}\n```diff\n{preview}\n```",
+            color=0xFF6633
+        )
+        plan_file = discord.File(io.BytesIO("\n".join(lines).encode()), filename="plan.txt") if len(lines) > 20 else None
+        if dry_run:
+            embed.set_footer(text="Dry run, nothing was changed.")
+            await ctx.send(embed=embed, file=plan_file)
+            return
+
+        embed.set_footer(text="React to confirm or cancel this request")
+        confirmation_message = await ctx.send(embed=embed, file=plan_file)
+        await confirmation_message.add_reaction("✅")
+        await confirmation_message.add_reaction("❌")
+
+        def check(reaction, user):
+            return user == ctx.author and str(reaction.emoji) in ["✅", "❌"] and reaction.message.id == confirmation_message.id
+
+        try:
+            reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
+        except asyncio.TimeoutError:
+            await ctx.send(embed=discord.Embed(title="Timeout", description="Confirmation timed out. No changes were made.", color=0xff4545))
+            return
+        if str(reaction.emoji) == "❌":
+            await ctx.send(embed=discord.Embed(title="Cancelled", description="No changes were made.", color=0xff4545))
+            return
+
+        limit = asyncio.Semaphore(self.APPLY_CONCURRENCY)
+
+        async def run(change):
+            async with limit:
+                try:
+                    async with self.session.request(change["method"], change["url"], headers=headers, json=change["payload"]) as response:
+                        data = await response.json(content_type=None)
+                except Exception as e:
+                    return change, str(e)
+            if not data.get("success", False):
+                return change, (data.get("errors") or [{"message": f"Status code: {response.status}"}])[0].get("message")
+            return change, None
+
+        failures = []
+        async with ctx.typing():
+            for phase in phases:
+                for change, error in await asyncio.gather(*(run(change) for change in phase)):
+                    if error:
+                        failures.append(f"{symbols[change['action']]} {change['kind']} {change['label']}: {error}")
+
+        embed = discord.Embed(
+            title=f"{title} applied" if not failures else f"{title} partially applied",
+            description=f"**`{len(changes) - len(failures)}`** of **`{len(changes)}`** change(s) succeeded.",
+            color=0x2BBD8E if not failures else 0xff4545
+        )
+        if failures:
+            embed.add_field(name="Failed", value="\n".join(f"`{failure[:180]}`" for failure in failures[:10]), inline=False)
+        await ctx.send(embed=embed)
+
+    async def _find_latest_scan(self, url: str, account_id: str, headers: dict):
+        """Return the UUID of the newest existing scan of `url`, or None if there isn't one."""
+        search_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan"
+        params = {"page_url": canonicalize_url(url), "limit": 10}
+        try:
+            async with self.session.get(search_url, headers=headers, params=params) as response:
+                data = await response.json()
+        except Exception:
+            log.exception("Failed to look up existing scans for %s", url)
+            return None
+        if not data.get("success", False):
+            return None
+        tasks = [task for task in data.get("result", {}).get("tasks", []) if task.get("success", True) and task.get("uuid")]
+        if not tasks:
+            return None
+        return max(tasks, key=lambda task: task.get("time", ""))["uuid"]
+
+    async def _fetch_scan_har(self, scan_id: str, account_id: str, headers: dict):
+        """Return the HAR of a finished scan, or None if Cloudflare has none."""
+        api_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan/{scan_id}/har"
+        async with self.session.get(api_url, headers=headers) as response:
+            data = await response.json()
+        if not data.get("success", False):
+            return None
+        return data.get("result", {}).get("har") or None
+
+    async def _fetch_scan_screenshot(self, scan_id: str, account_id: str, headers: dict):
+        """Return the PNG screenshot of a finished scan, or None if Cloudflare has none."""
+        api_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan/{scan_id}/screenshot"
+        async with self.session.get(api_url, headers=headers) as response:
+            if response.content_type != "image/png":
+                return None
+            return await response.read()
+
+    def _verdict_embed(self, verdict: dict, cached: bool = False):
+        if verdict["malicious"]:
+            embed = discord.Embed(
+                title="Cloudflare detected a threat",
+                description=f"A URL scan has completed and Cloudflare has detected one or more threats",
+                color=0xff4545
+            )
+        else:
+            embed = discord.Embed(
+                title="Cloudflare detected no threats",
+                description=f"A URL scan has finished with no detections to report.",
+                color=0x2BBD8E
+            )
+        categories = ", ".join(filter(None, verdict["categories"]))
+        phishing = ", ".join(verdict["phishing"])
+        if categories:
+            embed.add_field(name="Categories", value=f"{categories}", inline=False)
+        if phishing:
+            embed.add_field(name="Phishing", value=f"{phishing}", inline=False)
+        if cached:
+            embed.add_field(name="Scanned", value=f"<t:{int(verdict['scanned_at'])}:R>", inline=False)
+        embed.set_footer(text=f"{verdict['scan_id']} • {self.verdicts.describe()}")
+
+        # Add a URL button to view the report
+        view = discord.ui.View()
+        report_url = f"https://radar.cloudflare.com/scan/{verdict['scan_id']}"
+        report_button = discord.ui.Button(label="View on Cloudflare Radar", url=report_url, style=discord.ButtonStyle.link)
+        view.add_item(report_button)
+        return embed, view
 
 
     @commands.is_owner()
@@ -35,8 +1055,12 @@ class Cloudflare(commands.Cog):
         
     @commands.is_owner()
     @images.command(name="upload")
-    async def upload_image(self, ctx):
-        """Upload an image to Cloudflare Images."""
+    async def upload_image(self, ctx, convert: str = None):
+        """
+        Upload an image to Cloudflare Images.
+
+        EXIF metadata is stripped before upload (animated GIF and WebP files are uploaded as-is), and `convert` can be `webp` or `avif` to transcode the image first. Images already uploaded from this bot are detected by content hash and not uploaded again.
+        """
         if not ctx.message.attachments:
             await ctx.send(embed=discord.Embed(
                 title="Error",
@@ -54,6 +1078,16 @@ class Cloudflare(commands.Cog):
             ))
             return
 
+        if convert is not None:
+            convert = convert.lower()
+            if convert not in IMAGE_TRANSCODE_FORMATS:
+                await ctx.send(embed=discord.Embed(
+                    title="Error",
+                    description=f"Images can only be converted to {', '.join(f'`{fmt}`' for fmt in IMAGE_TRANSCODE_FORMATS)}.",
+                    color=discord.Color.from_str("#ff4545")
+                ))
+                return
+
         api_tokens = await self.bot.get_shared_api_tokens("cloudflare")
         account_id = api_tokens.get("account_id")
         bearer_token = api_tokens.get("bearer_token")
@@ -72,16 +1106,47 @@ class Cloudflare(commands.Cog):
         url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/images/v1"
 
         try:
-            async with self.session.get(attachment.url) as resp:
-                if resp.status != 200:
+            async with ctx.typing():
+                async with self.session.get(attachment.url) as resp:
+                    if resp.status != 200:
+                        await ctx.send(embed=discord.Embed(
+                            title="Error",
+                            description="Failed to download the image.",
+                            color=discord.Color.from_str("#ff4545")
+                        ))
+                        return
+                    raw = await resp.read()
+
+                try:
+                    processed, filename, content_type, info = await self.bot.loop.run_in_executor(
+                        self.image_executor, prepare_image, raw, attachment.filename, convert
+                    )
+                except ValueError as e:
                     await ctx.send(embed=discord.Embed(
                         title="Error",
-                        description="Failed to download the image.",
+                        description=str(e),
                         color=discord.Color.from_str("#ff4545")
                     ))
                     return
+
+                digest = await self.bot.loop.run_in_executor(
+                    self.image_executor, lambda: hashlib.sha256(processed).hexdigest()
+                )
+                existing_id = (await self.config.image_hashes()).get(f"{account_id}:{digest}")
+                if existing_id:
+                    total_saved = await self.config.image_bytes_saved() + len(processed)
+                    await self.config.image_bytes_saved.set(total_saved)
+                    embed = discord.Embed(
+                        title="Already uploaded",
+                        description="An identical image is already in your account, so it was not uploaded again.",
+                        color=discord.Color.from_str("#2BBD8E"))
+                    embed.add_field(name="ID", value=f"```{existing_id}```", inline=False)
+                    embed.set_footer(text=f"{len(processed):,} bytes skipped · {total_saved:,} bytes saved by deduplication so far")
+                    await ctx.send(embed=embed)
+                    return
+
                 data = aiohttp.FormData()
-                data.add_field('file', await resp.read(), filename=attachment.filename, content_type=attachment.content_type)
+                data.add_field('file', processed, filename=filename, content_type=content_type)
 
                 # aiohttp.FormData automatically sets the correct Content-Type with boundary
                 async with self.session.post(url, headers=headers, data=data) as response:
@@ -95,22 +1160,32 @@ class Cloudflare(commands.Cog):
                         await ctx.send(embed=embed)
                         return
 
-                    result = data.get("result", {})
-                    filename = result.get("filename", "Unknown")
-                    image_id = result.get("id", "Unknown")
-                    uploaded = result.get("uploaded", "Unknown")
-                    variants = result.get("variants", [])
+            result = data.get("result", {})
+            filename = result.get("filename", "Unknown")
+            image_id = result.get("id", "Unknown")
+            uploaded = result.get("uploaded", "Unknown")
+            variants = result.get("variants", [])
+
+            async with self.config.image_hashes() as image_hashes:
+                image_hashes[f"{account_id}:{digest}"] = image_id
+            if self.image_index.synced_at(account_id) is not None:
+                self.image_index.upsert(account_id, [result])
+            saved = info["original_size"] - info["processed_size"]
+            if saved > 0:
+                await self.config.image_bytes_saved.set(await self.config.image_bytes_saved() + saved)
 
-                    embed = discord.Embed(
-                        title="Uploaded successfully",
-                        color=discord.Color.from_str("#2BBD8E"))
-                    embed.add_field(name="Filename", value=f"**`{filename}`**", inline=False)
-                    embed.add_field(name="Uploaded", value=f"**`{uploaded}`**", inline=False)
-                    embed.add_field(name="ID", value=f"```{image_id}```", inline=False)
-                    for variant in variants:
-                        embed.add_field(name="Variant", value=variant, inline=False)
+            embed = discord.Embed(
+                title="Uploaded successfully",
+                color=discord.Color.from_str("#2BBD8E"))
+            embed.add_field(name="Filename", value=f"**`{filename}`**", inline=False)
+            embed.add_field(name="Uploaded", value=f"**`{uploaded}`**", inline=False)
+            embed.add_field(name="ID", value=f"```{image_id}```", inline=False)
+            embed.add_field(name="Dimensions", value=f"**`{info['width']}`x`{info['height']}`** ({info['format']})", inline=True)
+            embed.add_field(name="Size", value=f"**`{info['original_size']:,}`** → **`{info['processed_size']:,}`** bytes", inline=True)
+            for variant in variants:
+                embed.add_field(name="Variant", value=variant, inline=False)
 
-                    await ctx.send(embed=embed)
+            await ctx.send(embed=embed)
         except Exception as e:
             await ctx.send(embed=discord.Embed(
                 title="Error",
@@ -152,6 +1227,11 @@ class Cloudflare(commands.Cog):
                     await ctx.send(embed=embed)
                     return
 
+                self.image_index.remove(account_id, image_id)
+                async with self.config.image_hashes() as image_hashes:
+                    for digest in [key for key, value in image_hashes.items() if value == image_id]:
+                        del image_hashes[digest]
+
                 embed = discord.Embed(
                     title="Deleted successfully",
                     description=f"Image with ID `{image_id}` has been deleted.",
@@ -224,8 +1304,12 @@ class Cloudflare(commands.Cog):
 
     @commands.is_owner()
     @images.command(name="list")
-    async def list_images(self, ctx):
-        """List available images."""
+    async def list_images(self, ctx, *, filters: str = None):
+        """
+        List and search images from the local image index.
+
+        Free text matches filenames and IDs. Narrow results with `after:YYYY-MM-DD`, `before:YYYY-MM-DD`, `variant:<name>` and `signed:yes|no`, or pass `refresh` to rebuild the index from scratch.
+        """
         api_tokens = await self.bot.get_shared_api_tokens("cloudflare")
         account_id = api_tokens.get("account_id")
         bearer_token = api_tokens.get("bearer_token")
@@ -242,60 +1326,67 @@ class Cloudflare(commands.Cog):
             "Content-Type": "application/json"
         }
 
-        url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/images/v2"
+        search = {"text": [], "after": None, "before": None, "variant": None, "signed": None}
+        full = False
+        for token in (filters or "").split():
+            key, _, value = token.partition(":")
+            key = key.lower()
+            if token.lower() == "refresh":
+                full = True
+            elif key in ("after", "before", "variant") and value:
+                search[key] = value
+            elif key == "signed" and value.lower() in ("yes", "no", "true", "false"):
+                search["signed"] = value.lower() in ("yes", "true")
+            else:
+                search["text"].append(token)
+        search["text"] = " ".join(search["text"]) or None
 
         try:
-            async with self.session.get(url, headers=headers) as response:
-                data = await response.json()
-                if not data.get("success", False):
-                    error_message = data.get("errors", [{"message": "Unknown error"}])[0].get("message")
-                    embed = discord.Embed(
-                        title="Failed to Fetch Images",
-                        description=f"**Error:** {error_message}",
-                        color=discord.Color.from_str("#ff4545")
-                    )
-                    await ctx.send(embed=embed)
-                    return
+            async with ctx.typing():
+                await self._sync_images(account_id, headers, full=full)
+        except Exception as e:
+            embed = discord.Embed(
+                title="Failed to Fetch Images",
+                description=f"**Error:** {e}",
+                color=discord.Color.from_str("#ff4545")
+            )
+            await ctx.send(embed=embed)
+            return
 
-                images = data.get("result", {}).get("images", [])
-                if not images:
-                    await ctx.send(embed=discord.Embed(
-                        title="No Images Found",
-                        description="No images found.",
-                        color=discord.Color.from_str("#ff4545")
-                    ))
-                    return
+        images = list(self.image_index.search(account_id, **search))
+        if not images:
+            await ctx.send(embed=discord.Embed(
+                title="No Images Found",
+                description="No images match those filters." if filters else "No images found.",
+                color=discord.Color.from_str("#ff4545")
+            ))
+            return
 
+        def image_pages():
+            per_page = 10
+            total_pages = (len(images) + per_page - 1) // per_page
+            for page, start in enumerate(range(0, len(images), per_page), start=1):
                 embed = discord.Embed(
                     title="Available Images",
-                    description="Here are the available images:",
+                    description=f"**`{len(images)}`** image(s) found" + (f" for **`{filters}`**" if filters else "") + ":",
                     color=discord.Color.from_str("#2BBD8E")
                 )
-
-                for image in images:
-                    filename = image.get("filename", "Unknown")
-                    image_id = image.get("id", "Unknown")
-                    upload_time = image.get("uploaded", "Unknown")
-                    variants = image.get("variants", [])
-
+                for image in images[start:start + per_page]:
+                    variants = ", ".join(url.rsplit("/", 1)[-1] for url in image["variants"]) or "None"
                     embed.add_field(
-                        name=f"Image ID: {image_id}",
-                        value=f"**Filename:** `{filename}`\n**Uploaded:** `{upload_time}`\n**Variants:** {', '.join(variants)}",
+                        name=f"Image ID: {image['id']}",
+                        value=f"**Filename:** `{image['filename']}`\n**Uploaded:** `{image['uploaded']}`\n**Variants:** {variants}",
                         inline=False
                     )
+                embed.set_footer(text=f"Page {page}/{total_pages}")
+                yield embed
 
-                await ctx.send(embed=embed)
-        except Exception as e:
-            await ctx.send(embed=discord.Embed(
-                title="Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.from_str("#ff4545")
-            ))
+        await Paginator(ctx.author, image_pages, timeout=30.0).send(ctx)
 
     @commands.is_owner()
     @images.command(name="stats")
     async def image_stats(self, ctx):
-        """Fetch Cloudflare Images usage statistics."""
+        """Show Cloudflare Images usage statistics and a breakdown of the indexed image library."""
         api_tokens = await self.bot.get_shared_api_tokens("cloudflare")
         account_id = api_tokens.get("account_id")
         bearer_token = api_tokens.get("bearer_token")
@@ -312,40 +1403,50 @@ class Cloudflare(commands.Cog):
             "Content-Type": "application/json"
         }
 
-        url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/images/v1/stats"
-
         try:
-            async with self.session.get(url, headers=headers) as response:
-                data = await response.json()
-                if not data.get("success", False):
-                    error_message = data.get("errors", [{"message": "Unknown error"}])[0].get("message")
-                    embed = discord.Embed(
-                        title="Failed to Fetch Image Stats",
-                        description=f"**Error:** {error_message}",
-                        color=discord.Color.from_str("#ff4545")
-                    )
-                    await ctx.send(embed=embed)
-                    return
-
-                result = data.get("result", {})
-                count = result.get("count", {})
-                allowed = count.get("allowed", "Unknown")
-                current = count.get("current", "Unknown")
-
-                embed = discord.Embed(
-                    title="Usage statistics",
-                    description="Here are your current usage statistics for Cloudflare Images:",
-                    color=discord.Color.from_str("#2BBD8E"))
-                embed.add_field(name="Allowed", value=f"**`{allowed}`**", inline=True)
-                embed.add_field(name="Current", value=f"**`{current}`**", inline=True)
-
-                await ctx.send(embed=embed)
+            async with ctx.typing():
+                usage, _ = await asyncio.gather(
+                    self._account_get(account_id, headers, "images/v1/stats"),
+                    self._sync_images(account_id, headers)
+                )
         except Exception as e:
-            await ctx.send(embed=discord.Embed(
-                title="Error",
-                description=f"An error occurred: {str(e)}",
+            embed = discord.Embed(
+                title="Failed to Fetch Image Stats",
+                description=f"**Error:** {e}",
                 color=discord.Color.from_str("#ff4545")
-            ))
+            )
+            await ctx.send(embed=embed)
+            return
+
+        count = (usage or {}).get("count", {})
+        allowed = count.get("allowed", "Unknown")
+        current = count.get("current", "Unknown")
+        stats = self.image_index.stats(account_id)
+
+        embed = discord.Embed(
+            title="Usage statistics",
+            description="Here are your current usage statistics for Cloudflare Images:",
+            color=discord.Color.from_str("#2BBD8E"))
+        embed.add_field(name="Allowed", value=f"**`{allowed}`**", inline=True)
+        embed.add_field(name="Current", value=f"**`{current}`**", inline=True)
+        embed.add_field(name="Bytes saved", value=f"**`{await self.config.image_bytes_saved():,}`**", inline=True)
+        embed.add_field(name="Indexed", value=f"**`{stats['count']}`**", inline=True)
+        embed.add_field(name="Uploaded in last 30 days", value=f"**`{stats['recent']}`**", inline=True)
+        embed.add_field(name="Signed URLs required", value=f"**`{stats['signed']}`**", inline=True)
+        if stats["oldest"]:
+            embed.add_field(name="Oldest", value=f"**`{stats['oldest']}`**", inline=True)
+            embed.add_field(name="Newest", value=f"**`{stats['newest']}`**", inline=True)
+        if stats["total_size"]:
+            embed.add_field(name="Total size", value=f"**`{stats['total_size']:,}`** bytes", inline=True)
+        if stats["variants"]:
+            embed.add_field(
+                name="Variants",
+                value="\n".join(f"**{name}**: `{total}`" for name, total in stats["variants"].most_common(10)),
+                inline=False
+            )
+        if stats["synced_at"]:
+            embed.set_footer(text=f"Index synced {datetime.fromtimestamp(stats['synced_at']).strftime('%Y-%m-%d %H:%M:%S')}")
+        await ctx.send(embed=embed)
 
     @commands.is_owner()
     @commands.group()
@@ -605,6 +1706,79 @@ class Cloudflare(commands.Cog):
                 color=discord.Color.from_str("#ff4545")
             ))
 
+    @commands.is_owner()
+    @loadbalancing.command(name="apply")
+    async def apply_load_balancers(self, ctx, dry_run: bool = False):
+        """
+        Apply a desired-state YAML or JSON file of load balancers.
+
+        Attach a file with a `load_balancers` list. Load balancers are matched to existing ones by `name`, and only the settings listed in the file are compared and changed. Nothing is deleted unless the file sets `prune: true`. Pass `True` for a dry run that only previews the changes.
+        """
+        api_tokens = await self.bot.get_shared_api_tokens("cloudflare")
+        bearer_token = api_tokens.get("bearer_token")
+        zone_id = api_tokens.get("zone_id")
+        if not bearer_token or not zone_id:
+            embed = discord.Embed(
+                title="Error",
+                description="Bearer token or zone identifier not set.",
+                color=discord.Color.from_str("#ff4545")
+            )
+            await ctx.send(embed=embed)
+            return
+
+        if not ctx.message.attachments:
+            await ctx.send(embed=discord.Embed(
+                title="Error",
+                description="Please attach a YAML or JSON desired-state file.",
+                color=discord.Color.from_str("#ff4545")
+            ))
+            return
+
+        try:
+            attachment = ctx.message.attachments[0]
+            state = load_desired_state(await attachment.read(), attachment.filename)
+            prune = bool(state.get("prune", False))
+            desired = {}
+            for lb in state.get("load_balancers") or []:
+                if not lb.get("name"):
+                    raise ValueError("Every load balancer needs a `name`.")
+                desired[lb["name"].lower()] = lb
+        except (ValueError, AttributeError, TypeError) as e:
+            await ctx.send(embed=discord.Embed(
+                title="Error",
+                description=str(e) or "The desired-state file is not valid.",
+                color=discord.Color.from_str("#ff4545")
+            ))
+            return
+
+        headers = {
+            "Authorization": f"Bearer {bearer_token}",
+            "Content-Type": "application/json"
+        }
+
+        url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/load_balancers"
+
+        try:
+            async with ctx.typing():
+                current = {lb["name"].lower(): lb for lb in await self._get_all_pages(url, headers, zone_id)}
+        except Exception as e:
+            await ctx.send(embed=discord.Embed(
+                title="Failed to Fetch Load Balancers",
+                description=f"**Error:** {e}",
+                color=discord.Color.from_str("#ff4545")
+            ))
+            return
+
+        changes = []
+        for action, key, existing, body in diff_resources(current, desired, prune=prune, read_only=("id", "created_on", "modified_on")):
+            change = {"action": action, "kind": "load balancer", "label": key, "payload": body}
+            if action == "create":
+                changes.append({**change, "method": "POST", "url": url})
+            else:
+                changes.append({**change, "method": "PUT" if action == "update" else "DELETE", "url": f"{url}/{existing['id']}"})
+
+        await self._apply_plan(ctx, "Load Balancing", [changes], headers, dry_run)
+
     @commands.is_owner()
     @loadbalancing.command(name="patch")
     async def patch_load_balancer(self, ctx, load_balancer_id: str, key: str, value: str):
@@ -1073,53 +2247,16 @@ class Cloudflare(commands.Cog):
                 return
 
             zone_names = [zone["name"] for zone in zones]
-            pages = [zone_names[i:i + 10] for i in range(0, len(zone_names), 10)]
-
-            current_page = 0
-            embed = discord.Embed(
-                title="Zones in Cloudflare account",
-                description="\n".join(pages[current_page]),
-                color=discord.Color.from_str("#2BBD8E")
-            )
-            message = await ctx.send(embed=embed)
-
-            if len(pages) > 1:
-                await message.add_reaction("◀️")
-                await message.add_reaction("❌")
-                await message.add_reaction("▶️")
-
-                def check(reaction, user):
-                    return user == ctx.author and str(reaction.emoji) in ["◀️", "❌", "▶️"] and reaction.message.id == message.id
 
-                while True:
-                    try:
-                        reaction, user = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
-
-                        if str(reaction.emoji) == "▶️" and current_page < len(pages) - 1:
-                            current_page += 1
-                            embed.description = "\n".join(pages[current_page])
-                            await message.edit(embed=embed)
-                            await message.remove_reaction(reaction, user)
-
-                        elif str(reaction.emoji) == "◀️" and current_page > 0:
-                            current_page -= 1
-                            embed.description = "\n".join(pages[current_page])
-                            await message.edit(embed=embed)
-                            await message.remove_reaction(reaction, user)
-
-                        elif str(reaction.emoji) == "❌":
-                            await message.delete()
-                            break
-
-                    except asyncio.TimeoutError:
-                        break
-
-                # Remove reactions after timeout
-                try:
-                    await message.clear_reactions()
-                except discord.Forbidden:
-                    pass
+            def zone_pages():
+                for i in range(0, len(zone_names), 10):
+                    yield discord.Embed(
+                        title="Zones in Cloudflare account",
+                        description="\n".join(zone_names[i:i + 10]),
+                        color=discord.Color.from_str("#2BBD8E")
+                    )
 
+            await Paginator(ctx.author, zone_pages, timeout=30.0).send(ctx)
 
     @commands.group(invoke_without_command=False)
     async def intel(self, ctx):
@@ -1316,7 +2453,7 @@ class Cloudflare(commands.Cog):
                 pages.append(page)
 
             # Create a view with buttons
-            view = discord.ui.View()
+            view = Paginator(ctx.author, lambda: iter(pages))
             if "administrative_referral_url" in whois_info:
                 button = discord.ui.Button(label="Admin", url=whois_info["administrative_referral_url"])
                 view.add_item(button)
@@ -1468,38 +2605,7 @@ class Cloudflare(commands.Cog):
             download_button.callback = download_report
             view.add_item(download_button)
 
-            message = await ctx.send(embed=pages[0], view=view)
-
-            current_page = 0
-            if len(pages) > 1:
-                await message.add_reaction("◀️")
-                await message.add_reaction("❌")
-                await message.add_reaction("▶️")
-
-                def check(reaction, user):
-                    return user == ctx.author and str(reaction.emoji) in ["◀️", "❌", "▶️"] and reaction.message.id == message.id
-
-                while True:
-                    try:
-                        reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
-
-                        if str(reaction.emoji) == "▶️" and current_page < len(pages) - 1:
-                            current_page += 1
-                            await message.edit(embed=pages[current_page])
-                            await message.remove_reaction(reaction, user)
-
-                        elif str(reaction.emoji) == "◀️" and current_page > 0:
-                            current_page -= 1
-                            await message.edit(embed=pages[current_page])
-                            await message.remove_reaction(reaction, user)
-
-                        elif str(reaction.emoji) == "❌":
-                            await message.delete()
-                            break
-
-                    except asyncio.TimeoutError:
-                        await message.clear_reactions()
-                        break
+            await view.send(ctx)
 
     @intel.command(name="domain")
     async def querydomain(self, ctx, domain: str):
@@ -1769,8 +2875,6 @@ class Cloudflare(commands.Cog):
                 if data["success"] and data["result"]:
                     result = data["result"][0]
                     categorizations = result.get("categorizations", [])
-                    pages = [categorizations[i:i + 5] for i in range(0, len(categorizations), 5)]
-                    current_page = 0
 
                     def create_embed(page):
                         embed = discord.Embed(title=f"Domain history for {domain}", color=0xFF6633)
@@ -1787,41 +2891,11 @@ class Cloudflare(commands.Cog):
                                 embed.add_field(name="Ending", value=f"{end_timestamp}", inline=True)
                         return embed
 
-                    message = await ctx.send(embed=create_embed(pages[current_page]))
-
-                    if len(pages) > 1:
-                        await message.add_reaction("◀️")
-                        await message.add_reaction("❌")
-                        await message.add_reaction("▶️")
-
-                        def check(reaction, user):
-                            return user == ctx.author and str(reaction.emoji) in ["◀️", "❌", "▶️"] and reaction.message.id == message.id
-
-                        while True:
-                            try:
-                                reaction, user = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
-
-                                if str(reaction.emoji) == "▶️" and current_page < len(pages) - 1:
-                                    current_page += 1
-                                    await message.edit(embed=create_embed(pages[current_page]))
-                                    await message.remove_reaction(reaction, user)
-
-                                elif str(reaction.emoji) == "◀️" and current_page > 0:
-                                    current_page -= 1
-                                    await message.edit(embed=create_embed(pages[current_page]))
-                                    await message.remove_reaction(reaction, user)
-
-                                elif str(reaction.emoji) == "❌":
-                                    await message.delete()
-                                    break
+                    def history_pages():
+                        for i in range(0, max(len(categorizations), 1), 5):
+                            yield create_embed(categorizations[i:i + 5])
 
-                            except asyncio.TimeoutError:
-                                break
-
-                        try:
-                            await message.clear_reactions()
-                        except discord.Forbidden:
-                            pass
+                    await Paginator(ctx.author, history_pages, timeout=30.0).send(ctx)
                 else:
                     embed = discord.Embed(title="No data available", description="There is no domain history available for this domain. Please try this query again later, as results are subject to update.", color=0xff4545)
                     await ctx.send(embed=embed)
@@ -1885,14 +2959,230 @@ class Cloudflare(commands.Cog):
                 embed = discord.Embed(title="Bad Request", description="The server could not understand the request due to invalid syntax.", color=0xff4545)
                 await ctx.send(embed=embed)
             else:
-                embed = discord.Embed(title="Failed to query Cloudflare API", description=f"Status code: {response.status}", color=0xff4545)
-                await ctx.send(embed=embed)
+                embed = discord.Embed(title="Failed to query Cloudflare API", description=f"Status code: {response.status}", color=0xff4545)
+                await ctx.send(embed=embed)
+
+    @intel.command(name="subnets")
+    async def asnsubnets(self, ctx, asn: int):
+        """
+        View information for ASN subnets
+        """
+        api_tokens = await self.bot.get_shared_api_tokens("cloudflare")
+        email = api_tokens.get("email")
+        api_key = api_tokens.get("api_key")
+        bearer_token = api_tokens.get("bearer_token")
+        account_id = api_tokens.get("account_id")
+
+        # Check if any required token is missing
+        if not all([email, api_key, bearer_token, account_id]):
+            embed = discord.Embed(title="Configuration Error", description="Missing one or more required API tokens. Please check your configuration.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/intel/asn/{asn}/subnets"
+        headers = {
+            "Authorization": f"Bearer {bearer_token}",
+            "X-Auth-Email": email,
+            "X-Auth-Key": api_key,
+            "Content-Type": "application/json",
+        }
+
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                if data["success"]:
+                    result = data["result"]
+                    subnets = result.get("subnets", [])
+                    
+                    if subnets:
+                        # Subnet lists can be huge, so only the pages the user actually visits are built
+                        def subnet_pages():
+                            for i in range(0, len(subnets), 10):
+                                embed = discord.Embed(title=f"Subnets for ASN#{asn}", color=0xFF6633)
+                                embed.add_field(name="Subnets", value="\n".join([f"- {subnet}" for subnet in subnets[i:i + 10]]), inline=False)
+                                yield embed
+
+                        await Paginator(ctx.author, subnet_pages, timeout=30.0).send(ctx)
+                    else:
+                        embed = discord.Embed(title=f"Subnets for ASN#{asn}", color=0xFF6633)
+                        embed.add_field(name="Subnets", value="No subnets found for this ASN.", inline=False)
+                        await ctx.send(embed=embed)
+                else:
+                    embed = discord.Embed(title="Error", description=f"Error: {data['errors']}", color=0xff4545)
+                    await ctx.send(embed=embed)
+            elif response.status == 400:
+                embed = discord.Embed(title="Bad Request", description="The server could not understand the request due to invalid syntax.", color=0xff4545)
+                await ctx.send(embed=embed)
+            else:
+                embed = discord.Embed(title="Failed to query Cloudflare API", description=f"Status code: {response.status}", color=0xff4545)
+                await ctx.send(embed=embed)
+
+    @intel.command(name="investigate")
+    async def investigate(self, ctx, domain: str):
+        """
+        Run a full investigation of a domain
+
+        WHOIS, domain intelligence, domain history and URL scans are queried at the same time and merged into one report.
+        """
+        try:
+            ipaddress.ip_address(domain)
+            embed = discord.Embed(title="Error", description="The input appears to be an IP address. Please use the `ip` subcommand for IP address queries.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        except ValueError:
+            pass  # Not an IP address, continue with query
+
+        api_tokens = await self.bot.get_shared_api_tokens("cloudflare")
+        email = api_tokens.get("email")
+        api_key = api_tokens.get("api_key")
+        bearer_token = api_tokens.get("bearer_token")
+        account_id = api_tokens.get("account_id")
+
+        # Check if any required token is missing
+        if not all([email, api_key, bearer_token, account_id]):
+            embed = discord.Embed(title="Configuration Error", description="Missing one or more required API tokens. Please check your configuration.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        headers = {
+            "Authorization": f"Bearer {bearer_token}",
+            "X-Auth-Email": email,
+            "X-Auth-Key": api_key,
+            "Content-Type": "application/json",
+        }
+
+        sources = {
+            "WHOIS": (self._account_get(account_id, headers, "intel/whois", {"domain": domain}), self._investigate_whois_page),
+            "Domain intelligence": (self._account_get(account_id, headers, "intel/domain", {"domain": domain}), self._investigate_domain_page),
+            "Domain history": (self._account_get(account_id, headers, "intel/domain-history", {"domain": domain}), self._investigate_history_page),
+            "URL scans": (self._account_get(account_id, headers, "urlscanner/scan", {"page_hostname": domain}), self._investigate_scans_page),
+        }
+        status = {name: ":hourglass: Waiting" for name in sources}
+        pages = {}
+        started = time.monotonic()
+
+        def summary():
+            embed = discord.Embed(title=f"Investigation for {domain}", color=0xFF6633)
+            for name, value in status.items():
+                embed.add_field(name=name, value=value, inline=False)
+            embed.set_footer(text="Intelligence provided by Cloudflare")
+            return embed
+
+        async def timed(name, request):
+            source_started = time.monotonic()
+            try:
+                return name, await request, None, time.monotonic() - source_started
+            except Exception as e:
+                return name, None, e, time.monotonic() - source_started
+
+        message = await ctx.send(embed=summary())
+        # Render each source into the summary as soon as it answers rather than waiting on the slowest one
+        for finished in asyncio.as_completed([timed(name, request) for name, (request, _) in sources.items()]):
+            name, result, error, elapsed = await finished
+            if error is None and result:
+                try:
+                    pages[name] = sources[name][1](domain, result)
+                except Exception as e:
+                    log.exception("Building the %s page for %s failed", name, domain)
+                    error = f"couldn't read the response ({type(e).__name__})"
+            if error is not None:
+                status[name] = f":x: Failed after `{elapsed:.2f}s` - {error}"[:1024]
+            elif not result:
+                status[name] = f":grey_question: No data (`{elapsed:.2f}s`)"
+            else:
+                status[name] = f":white_check_mark: Done in `{elapsed:.2f}s`"
+            await message.edit(embed=summary())
+
+        report = summary()
+        report.description = f"Finished all sources in `{time.monotonic() - started:.2f}s`"
+        pages = [report] + [pages[name] for name in sources if name in pages]
+        await Paginator(ctx.author, lambda: iter(pages)).send(ctx, message=message)
+
+    def _investigate_whois_page(self, domain, whois_info):
+        embed = discord.Embed(title=f"WHOIS for {domain}", color=0xFF6633)
+        if whois_info.get("found", True) is False:
+            embed.description = "The domain doesn't seem to be registered."
+            return embed
+        if whois_info.get("registrar"):
+            embed.add_field(name="Registered with", value=f"{whois_info['registrar']}", inline=True)
+        for key, label in (("created_date", "Created on"), ("updated_date", "Updated on"), ("expiration_date", "Expires on")):
+            value = whois_info.get(key)
+            if isinstance(value, str):
+                try:
+                    value = f"<t:{int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp())}:d>"
+                except ValueError:
+                    pass
+                embed.add_field(name=label, value=value, inline=True)
+        if "dnssec" in whois_info:
+            embed.add_field(name="DNSSEC", value=":white_check_mark: Enabled" if whois_info["dnssec"] else ":x: Disabled", inline=True)
+        if whois_info.get("nameservers"):
+            embed.add_field(name="Nameservers", value="\n".join(f"- {ns}" for ns in whois_info["nameservers"])[:1024], inline=False)
+        return embed
+
+    def _investigate_domain_page(self, domain, result):
+        embed = discord.Embed(title=f"Domain intelligence for {domain}", color=0xFF6633)
+        if result.get("risk_score") is not None:
+            embed.add_field(name="Risk score", value=f"{result['risk_score']}", inline=True)
+        if result.get("popularity_rank") is not None:
+            embed.add_field(name="Popularity rank", value=f"{result['popularity_rank']}", inline=True)
+        if result.get("application", {}).get("name"):
+            embed.add_field(name="Application", value=f"{result['application']['name']}", inline=True)
+        for key, label in (("content_categories", "Content categories"), ("risk_types", "Risk types"), ("inherited_risk_types", "Inherited risk types")):
+            if result.get(key):
+                embed.add_field(name=label, value=", ".join(item.get("name", "N/A") for item in result[key])[:1024], inline=False)
+        if result.get("resolves_to_refs"):
+            embed.add_field(name="Resolves to", value=", ".join(ref.get("value", "N/A") for ref in result["resolves_to_refs"])[:1024], inline=False)
+        return embed
+
+    def _investigate_history_page(self, domain, result):
+        embed = discord.Embed(title=f"Domain history for {domain}", color=0xFF6633)
+        categorizations = result[0].get("categorizations", []) if result else []
+        for categorization in categorizations[:25]:
+            categories = ", ".join(category.get("name", "N/A") for category in categorization.get("categories", []))
+            period = []
+            for key in ("start", "end"):
+                value = categorization.get(key)
+                if not value:
+                    continue
+                try:
+                    period.append(discord.utils.format_dt(discord.utils.parse_time(value), style="d"))
+                except (TypeError, ValueError):
+                    period.append(str(value))
+            embed.add_field(name=categories[:256] or "Uncategorized", value=" - ".join(period) or "Unknown period", inline=False)
+        return embed
+
+    def _investigate_scans_page(self, domain, result):
+        embed = discord.Embed(title=f"URL scans for {domain}", color=0xFF6633)
+        for task in result.get("tasks", [])[:10]:
+            field_name = task.get("url", "Unknown URL")
+            if len(field_name) > 256:
+                field_name = field_name[:253] + "..."
+            embed.add_field(
+                name=field_name,
+                value=f"**Time:** {task.get('time', 'Unknown')}\n**UUID:** {task.get('uuid', 'Unknown')}",
+                inline=False
+            )
+        if not embed.fields:
+            embed.description = "No URL scans found for this domain."
+        return embed
 
-    @intel.command(name="subnets")
-    async def asnsubnets(self, ctx, asn: int):
+    @intel.command(name="bulk")
+    async def bulkintel(self, ctx, *, indicators: str = ""):
         """
-        View information for ASN subnets
+        Enrich many IPs, CIDRs and ASNs at once
+
+        Paste indicators separated by spaces, commas or new lines, or attach a text/CSV file of them. Write ASNs as `AS13335`; bare numbers only count as ASNs in a one-per-line list or an `asn` CSV column. Duplicates are dropped, overlapping CIDRs are merged, and results are returned as CSV and JSON alongside a summary grouped by ASN and risk category.
         """
+        text = indicators
+        for attachment in ctx.message.attachments:
+            if attachment.filename.lower().endswith((".txt", ".csv", ".log")):
+                text += "\n" + (await attachment.read()).decode("utf-8", errors="ignore")
+
+        if not text.strip():
+            embed = discord.Embed(title="Error", description="Provide IPs, CIDRs or ASNs to enrich, or attach a text/CSV file containing them.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
         api_tokens = await self.bot.get_shared_api_tokens("cloudflare")
         email = api_tokens.get("email")
         api_key = api_tokens.get("api_key")
@@ -1905,7 +3195,6 @@ class Cloudflare(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/intel/asn/{asn}/subnets"
         headers = {
             "Authorization": f"Bearer {bearer_token}",
             "X-Auth-Email": email,
@@ -1913,69 +3202,108 @@ class Cloudflare(commands.Cog):
             "Content-Type": "application/json",
         }
 
-        async with self.session.get(url, headers=headers) as response:
-            if response.status == 200:
-                data = await response.json()
-                if data["success"]:
-                    result = data["result"]
-                    subnets = result.get("subnets", [])
-                    
-                    if subnets:
-                        pages = [subnets[i:i + 10] for i in range(0, len(subnets), 10)]
-                        current_page = 0
-                        embed = discord.Embed(title=f"Subnets for ASN#{asn}", color=0xFF6633)
-                        embed.add_field(name="Subnets", value="\n".join([f"- {subnet}" for subnet in pages[current_page]]), inline=False)
-                        message = await ctx.send(embed=embed)
-
-                        if len(pages) > 1:
-                            await message.add_reaction("◀️")
-                            await message.add_reaction("❌")
-                            await message.add_reaction("▶️")
-
-                            def check(reaction, user):
-                                return user == ctx.author and str(reaction.emoji) in ["◀️", "❌", "▶️"] and reaction.message.id == message.id
-
-                            while True:
-                                try:
-                                    reaction, user = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
-
-                                    if str(reaction.emoji) == "▶️" and current_page < len(pages) - 1:
-                                        current_page += 1
-                                        embed.clear_fields()
-                                        for subnet in pages[current_page]:
-                                            embed.add_field(name="Subnet", value=f"**`{subnet}`**", inline=False)
-                                        await message.edit(embed=embed)
-                                        await message.remove_reaction(reaction, user)
-
-                                    elif str(reaction.emoji) == "◀️" and current_page > 0:
-                                        current_page -= 1
-                                        embed.clear_fields()
-                                        for subnet in pages[current_page]:
-                                            embed.add_field(name="Subnet", value=f"**`{subnet}`**", inline=False)
-                                        await message.edit(embed=embed)
-                                        await message.remove_reaction(reaction, user)
-
-                                    elif str(reaction.emoji) == "❌":
-                                        await message.delete()
-                                        break
-
-                                except asyncio.TimeoutError:
-                                    await message.clear_reactions()
-                                    break
-                    else:
-                        embed = discord.Embed(title=f"Subnets for ASN#{asn}", color=0xFF6633)
-                        embed.add_field(name="Subnets", value="No subnets found for this ASN.", inline=False)
-                        await ctx.send(embed=embed)
-                else:
-                    embed = discord.Embed(title="Error", description=f"Error: {data['errors']}", color=0xff4545)
-                    await ctx.send(embed=embed)
-            elif response.status == 400:
-                embed = discord.Embed(title="Bad Request", description="The server could not understand the request due to invalid syntax.", color=0xff4545)
-                await ctx.send(embed=embed)
-            else:
-                embed = discord.Embed(title="Failed to query Cloudflare API", description=f"Status code: {response.status}", color=0xff4545)
-                await ctx.send(embed=embed)
-   
+        # Large pastes and files are parsed off the event loop
+        ips, networks, asns, duplicates, invalid = await self.bot.loop.run_in_executor(None, parse_indicators, text)
+        targets = [("ip", ip) for ip in ips] + [("network", network) for network in networks] + [("asn", asn) for asn in asns]
+        if not targets:
+            embed = discord.Embed(title="Error", description="No valid IPs, CIDRs or ASNs were found in your input.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        truncated = max(0, len(targets) - self.BULK_INTEL_LIMIT)
+        targets = targets[:self.BULK_INTEL_LIMIT]
+
+        started = time.monotonic()
+        progress = discord.Embed(
+            title="Bulk enrichment in progress",
+            description=f"Enriching **{len(targets)}** indicators, please wait patiently.",
+            color=0xFF6633
+        )
+        message = await ctx.send(embed=progress)
+
+        async def enrich(kind, value):
+            row = {"indicator": str(value), "kind": kind, "asn": None, "owner": None, "country": None, "type": None, "risk_types": [], "risk_score": None, "error": None}
+            try:
+                if kind == "asn":
+                    result = await self._cached_account_get(account_id, headers, f"intel/asn/{value}")
+                    row.update(asn=result.get("asn", value), owner=result.get("description"), country=result.get("country"), type=result.get("type"), risk_score=result.get("risk_score"))
+                    return row
+                # Networks are enriched through their first address, which shares the prefix's ownership
+                address = value.network_address if kind == "network" else value
+                if address.is_private:
+                    row["error"] = "Private address"
+                    return row
+                params = {"ipv4" if address.version == 4 else "ipv6": str(address)}
+                result = (await self._cached_account_get(account_id, headers, "intel/ip", params) or [{}])[0]
+                belongs_to = result.get("belongs_to_ref", {})
+                row.update(
+                    asn=belongs_to.get("value"),
+                    owner=belongs_to.get("description"),
+                    country=belongs_to.get("country"),
+                    type=belongs_to.get("type"),
+                    risk_types=[risk.get("name") for risk in result.get("risk_types", []) if risk.get("name")]
+                )
+            except Exception as e:
+                row["error"] = str(e)
+            return row
+
+        rows = []
+        last_update = time.monotonic()
+        for finished in asyncio.as_completed([enrich(kind, value) for kind, value in targets]):
+            rows.append(await finished)
+            if time.monotonic() - last_update > 5:
+                last_update = time.monotonic()
+                progress.description = f"Enriched **{len(rows)}** of **{len(targets)}** indicators, please wait patiently."
+                await message.edit(embed=progress)
+
+        order = {str(value): index for index, (_, value) in enumerate(targets)}
+        rows.sort(key=lambda row: order[row["indicator"]])
+        csv_bytes, json_bytes = await self.bot.loop.run_in_executor(None, self._bulk_intel_exports, rows)
+
+        by_asn = Counter()
+        owners = {}
+        by_risk = Counter()
+        for row in rows:
+            if row["error"]:
+                continue
+            if row["asn"] is not None:
+                by_asn[row["asn"]] += 1
+                owners.setdefault(row["asn"], row["owner"])
+            for risk in row["risk_types"] or ["No known risk"]:
+                by_risk[risk] += 1
+        errors = sum(1 for row in rows if row["error"])
+
+        embed = discord.Embed(
+            title="Bulk enrichment complete",
+            description=f"Enriched **{len(rows)}** indicators in `{time.monotonic() - started:.1f}s`",
+            color=0x2BBD8E
+        )
+        embed.add_field(name="IPs", value=f"**`{len(ips)}`**", inline=True)
+        embed.add_field(name="Networks", value=f"**`{len(networks)}`**", inline=True)
+        embed.add_field(name="ASNs", value=f"**`{len(asns)}`**", inline=True)
+        embed.add_field(name="Duplicates removed", value=f"**`{duplicates}`**", inline=True)
+        embed.add_field(name="Unrecognized", value=f"**`{len(invalid)}`**", inline=True)
+        embed.add_field(name="Failed", value=f"**`{errors}`**", inline=True)
+        if by_asn:
+            embed.add_field(name="Top ASNs", value="\n".join(f"- AS{asn} {owners.get(asn) or ''} - **{count}**" for asn, count in by_asn.most_common(10))[:1024], inline=False)
+        if by_risk:
+            embed.add_field(name="Risk categories", value="\n".join(f"- {risk} - **{count}**" for risk, count in by_risk.most_common(10))[:1024], inline=False)
+        if truncated:
+            embed.set_footer(text=f"{truncated} indicators were skipped, the limit is {self.BULK_INTEL_LIMIT} per request")
+        await message.delete()
+        await ctx.send(embed=embed, files=[
+            discord.File(io.BytesIO(csv_bytes), filename="enrichment.csv"),
+            discord.File(io.BytesIO(json_bytes), filename="enrichment.json"),
+        ])
+
+    @staticmethod
+    def _bulk_intel_exports(rows):
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, "risk_types": ";".join(row["risk_types"])})
+        return output.getvalue().encode("utf-8"), json.dumps(rows, indent=2).encode("utf-8")
+
     @commands.group()
     async def urlscanner(self, ctx):
         """
@@ -2032,72 +3360,42 @@ class Cloudflare(commands.Cog):
                     await ctx.send(embed=embed)
                     return
 
-                pages = []
-                current_page = discord.Embed(
-                    title="URL Scan Results",
-                    description=f"Search results for query: **`{query}`**",
-                    color=0xFF6633
-                )
-                total_size = len(current_page.description)
-                for result in results:
-                    field_value = (
-                        f"**Country:** {result.get('country', 'Unknown')}\n"
-                        f"**Success:** {result.get('success', False)}\n"
-                        f"**Time:** {result.get('time', 'Unknown')}\n"
-                        f"**UUID:** {result.get('uuid', 'Unknown')}\n"
-                        f"**Visibility:** {result.get('visibility', 'Unknown')}"
+                def result_pages():
+                    current_page = discord.Embed(
+                        title="URL Scan Results",
+                        description=f"Search results for query: **`{query}`**",
+                        color=0xFF6633
                     )
-                    field_name = result.get("url", "Unknown URL")
-                    if len(field_name) > 256:
-                        field_name = field_name[:253] + "..."
-                    field_size = len(field_name) + len(field_value)
-                    if len(current_page.fields) == 25 or (total_size + field_size) > 6000:
-                        pages.append(current_page)
-                        current_page = discord.Embed(
-                            title="URL Scan Results",
-                            description=f"Search results for query: **`{query}`** (cont.)",
-                            color=0x2BBD8E
+                    total_size = len(current_page.description)
+                    for result in results:
+                        field_value = (
+                            f"**Country:** {result.get('country', 'Unknown')}\n"
+                            f"**Success:** {result.get('success', False)}\n"
+                            f"**Time:** {result.get('time', 'Unknown')}\n"
+                            f"**UUID:** {result.get('uuid', 'Unknown')}\n"
+                            f"**Visibility:** {result.get('visibility', 'Unknown')}"
                         )
-                        total_size = len(current_page.description)
-                    current_page.add_field(
-                        name=field_name,
-                        value=field_value,
-                        inline=False
-                    )
-                    total_size += field_size
-                pages.append(current_page)
-
-                message = await ctx.send(embed=pages[0])
-                if len(pages) > 1:
-                    await message.add_reaction("◀️")
-                    await message.add_reaction("❌")
-                    await message.add_reaction("▶️")
-
-                    def check(reaction, user):
-                        return user == ctx.author and str(reaction.emoji) in ["◀️", "❌", "▶️"] and reaction.message.id == message.id
-
-                    current_page_index = 0
-                    while True:
-                        try:
-                            reaction, user = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
-
-                            if str(reaction.emoji) == "▶️" and current_page_index < len(pages) - 1:
-                                current_page_index += 1
-                                await message.edit(embed=pages[current_page_index])
-                                await message.remove_reaction(reaction, user)
-
-                            elif str(reaction.emoji) == "◀️" and current_page_index > 0:
-                                current_page_index -= 1
-                                await message.edit(embed=pages[current_page_index])
-                                await message.remove_reaction(reaction, user)
-
-                            elif str(reaction.emoji) == "❌":
-                                await message.delete()
-                                break
-
-                        except asyncio.TimeoutError:
-                            await message.clear_reactions()
-                            break
+                        field_name = result.get("url", "Unknown URL")
+                        if len(field_name) > 256:
+                            field_name = field_name[:253] + "..."
+                        field_size = len(field_name) + len(field_value)
+                        if len(current_page.fields) == 25 or (total_size + field_size) > 6000:
+                            yield current_page
+                            current_page = discord.Embed(
+                                title="URL Scan Results",
+                                description=f"Search results for query: **`{query}`** (cont.)",
+                                color=0x2BBD8E
+                            )
+                            total_size = len(current_page.description)
+                        current_page.add_field(
+                            name=field_name,
+                            value=field_value,
+                            inline=False
+                        )
+                        total_size += field_size
+                    yield current_page
+
+                await Paginator(ctx.author, result_pages, timeout=30.0).send(ctx)
         except Exception as e:
             await ctx.send(embed=discord.Embed(
                 title="Error",
@@ -2191,57 +3489,72 @@ class Cloudflare(commands.Cog):
 
         api_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan/{scan_id}"
 
-        try:
+        async def check_result():
             async with self.session.get(api_url, headers=headers) as response:
-                data = await response.json()
-                if not data.get("success", False):
-                    error_message = data.get("errors", [{"message": "Unknown error"}])[0].get("message")
-                    embed = discord.Embed(
-                        title="Failed to Retrieve URL Scan Result",
-                        description=f"**Error:** {error_message}",
-                        color=0xff4545
-                    )
-                    await ctx.send(embed=embed)
-                    return
-
-                result = data.get("result", {}).get("scan", {})
-                if not result:
-                    await ctx.send(embed=discord.Embed(
-                        title="No Data",
-                        description="No relevant data found in the scan result.",
-                        color=0xFF6633
-                    ))
-                    return
-
-                task = result.get('task', {})
-                verdicts = result.get('verdicts', {})
-                meta = result.get('meta', {})
-                processors = meta.get('processors', {})
-                tech = processors.get('tech', [])
-                task_url = task.get('url', 'Unknown')
-                task_domain = task_url.split('/')[2] if task_url != 'Unknown' else 'Unknown'
-                categories = []
-                domains = result.get('domains', {})
-                if task_domain in domains:
-                    domain_data = domains[task_domain]
-                    content_categories = domain_data.get('categories', {}).get('content', [])
-                    inherited_categories = domain_data.get('categories', {}).get('inherited', {}).get('content', [])
-                    categories.extend(content_categories + inherited_categories)
+                if response.status == 202:
+                    return None
+                return await response.json()
 
+        try:
+            data = await check_result()
+            if data is None:
+                # Still running, wait for it to finish instead of reporting an empty result
+                await ctx.typing()
+                data = await self.jobs.wait(check_result, on_pending=ctx.typing)
+            if not data.get("success", False):
+                error_message = data.get("errors", [{"message": "Unknown error"}])[0].get("message")
                 embed = discord.Embed(
-                    title="Scan results",
-                    description=f"### Scan result for ID\n```{scan_id}```",
-                    color=0x2BBD8E
+                    title="Failed to Retrieve URL Scan Result",
+                    description=f"**Error:** {error_message}",
+                    color=0xff4545
                 )
-                embed.add_field(name="Target URL", value=f"```{task_url}```", inline=False)
-                embed.add_field(name="Effective URL", value=f"```{task.get('effectiveUrl', 'Unknown')}```", inline=False)
-                embed.add_field(name="Status", value=f"**`{task.get('status', 'Unknown')}`**", inline=True)
-                embed.add_field(name="Visibility", value=f"**`{task.get('visibility', 'Unknown')}`**", inline=True)
-                malicious_result = verdicts.get('overall', {}).get('malicious', 'Unknown')
-                embed.add_field(name="Malicious", value=f"**`{malicious_result}`**", inline=True)
-                embed.add_field(name="Tech", value=f"**`{', '.join([tech_item['name'] for tech_item in tech])}`**", inline=True)
-                embed.add_field(name="Categories", value=f"**`{', '.join([category['name'] for category in categories])}`**", inline=True)
                 await ctx.send(embed=embed)
+                return
+
+            result = data.get("result", {}).get("scan", {})
+            if not result:
+                await ctx.send(embed=discord.Embed(
+                    title="No Data",
+                    description="No relevant data found in the scan result.",
+                    color=0xFF6633
+                ))
+                return
+
+            task = result.get('task', {})
+            verdicts = result.get('verdicts', {})
+            meta = result.get('meta', {})
+            processors = meta.get('processors', {})
+            tech = processors.get('tech', [])
+            task_url = task.get('url', 'Unknown')
+            task_domain = task_url.split('/')[2] if task_url != 'Unknown' else 'Unknown'
+            categories = []
+            domains = result.get('domains', {})
+            if task_domain in domains:
+                domain_data = domains[task_domain]
+                content_categories = domain_data.get('categories', {}).get('content', [])
+                inherited_categories = domain_data.get('categories', {}).get('inherited', {}).get('content', [])
+                categories.extend(content_categories + inherited_categories)
+
+            embed = discord.Embed(
+                title="Scan results",
+                description=f"### Scan result for ID\n```{scan_id}```",
+                color=0x2BBD8E
+            )
+            embed.add_field(name="Target URL", value=f"```{task_url}```", inline=False)
+            embed.add_field(name="Effective URL", value=f"```{task.get('effectiveUrl', 'Unknown')}```", inline=False)
+            embed.add_field(name="Status", value=f"**`{task.get('status', 'Unknown')}`**", inline=True)
+            embed.add_field(name="Visibility", value=f"**`{task.get('visibility', 'Unknown')}`**", inline=True)
+            malicious_result = verdicts.get('overall', {}).get('malicious', 'Unknown')
+            embed.add_field(name="Malicious", value=f"**`{malicious_result}`**", inline=True)
+            embed.add_field(name="Tech", value=f"**`{', '.join([tech_item['name'] for tech_item in tech])}`**", inline=True)
+            embed.add_field(name="Categories", value=f"**`{', '.join([category['name'] for category in categories])}`**", inline=True)
+            await ctx.send(embed=embed)
+        except JobTimeout:
+            await ctx.send(embed=discord.Embed(
+                title="Scan still running",
+                description="Cloudflare hasn't finished this scan yet, please try again later.",
+                color=0xff4545
+            ))
         except Exception as e:
             await ctx.send(embed=discord.Embed(
                 title="Error",
@@ -2387,6 +3700,12 @@ class Cloudflare(commands.Cog):
             "Content-Type": "application/json"
         }
 
+        cached = self.verdicts.get(url)
+        if cached is not None:
+            embed, view = self._verdict_embed(cached, cached=True)
+            await ctx.send(embed=embed, view=view)
+            return
+
         # Submit the URL for scanning
         submit_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan"
         payload = {"url": url}
@@ -2394,25 +3713,32 @@ class Cloudflare(commands.Cog):
         try:
             async with self.session.post(submit_url, headers=headers, json=payload) as response:
                 if response.status == 409:
-                    embed = discord.Embed(title="Domain on cooldown", description="The domain was too recently scanned. Please try again in a few minutes.", color=0xff4545)
-                    await ctx.send(embed=embed)
-                    return
+                    data = None
                 elif response.status != 200:
                     embed = discord.Embed(title="Error", description=f"Failed to submit URL for scanning: {response.status}", color=0xff4545)
                     await ctx.send(embed=embed)
                     return
+                else:
+                    data = await response.json()
+                    if not data.get("success", False):
+                        embed = discord.Embed(title="Error", description="Failed to submit URL for scanning.", color=0xff4545)
+                        await ctx.send(embed=embed)
+                        return
 
-                data = await response.json()
-                if not data.get("success", False):
-                    embed = discord.Embed(title="Error", description="Failed to submit URL for scanning.", color=0xff4545)
+            if data is None:
+                # The domain is on cooldown, so pick up the latest existing scan instead
+                scan_id = await self._find_latest_scan(url, account_id, headers)
+                if not scan_id:
+                    embed = discord.Embed(title="Domain on cooldown", description="The domain was too recently scanned. Please try again in a few minutes.", color=0xff4545)
                     await ctx.send(embed=embed)
                     return
-
+                embed = discord.Embed(title="Cloudflare recently scanned this URL", description="Fetching the verdict from the most recent scan, please wait patiently.", color=0xFF6633)
+            else:
                 scan_id = data["result"]["uuid"]
                 embed = discord.Embed(title="Cloudflare is scanning your URL", description=f"This scan may take a few moments to complete, please wait patiently.", color=0xFF6633)
-                embed.set_footer(text=f"{scan_id}")
-                await ctx.send(embed=embed)
-                await ctx.typing()
+            embed.set_footer(text=f"{scan_id}")
+            await ctx.send(embed=embed)
+            await ctx.typing()
 
         except Exception as e:
             await ctx.send(embed=discord.Embed(
@@ -2422,68 +3748,65 @@ class Cloudflare(commands.Cog):
             ))
             return
 
-        # Check the scan status every 10-15 seconds
         status_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan/{scan_id}"
-        while True:
-            await asyncio.sleep(15)
-            try:
-                async with self.session.get(status_url, headers=headers) as response:
-                    if response.status == 202:
-                        await ctx.typing()
-                        continue
-                    elif response.status != 200:
-                        embed = discord.Embed(title="Error", description=f"Failed to check scan status: {response.status}", color=0xff4545)
-                        await ctx.send(embed=embed)
-                        return
 
-                    data = await response.json()
-                    if not data.get("success", False):
-                        embed = discord.Embed(title="Error", description="Failed to check scan status.", color=0xff4545)
-                        await ctx.send(embed=embed)
-                        return
+        async def check_scan():
+            async with self.session.get(status_url, headers=headers) as response:
+                if response.status == 202:
+                    return None
+                if response.status != 200:
+                    return response.status, None
+                return response.status, await response.json()
 
-                    if response.status == 200:
-                        scan_result = data["result"]["scan"]
-                        verdict = scan_result["verdicts"]["overall"]
-                        malicious = verdict["malicious"]
-                        categories = ", ".join([cat["name"] for cat in verdict["categories"]])
-                        phishing = ", ".join(verdict.get("phishing", []))
+        try:
+            status, data = await self.jobs.wait(check_scan, on_pending=ctx.typing)
+        except JobTimeout:
+            embed = discord.Embed(title="Scan still running", description=f"Cloudflare hasn't finished this scan yet. Check on it later with `{ctx.clean_prefix}urlscanner results {scan_id}`.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        except Exception as e:
+            await ctx.send(embed=discord.Embed(
+                title="Error",
+                description=f"An error occurred while checking the scan status: {str(e)}",
+                color=0xff4545
+            ))
+            return
 
-                        if malicious:
-                            embed = discord.Embed(
-                                title="Cloudflare detected a threat",
-                                description=f"A URL scan has completed and Cloudflare has detected one or more threats",
-                                color=0xff4545
-                            )
-                            embed.set_footer(text=f"{scan_id}")
-                        else:
-                            embed = discord.Embed(
-                                title="Cloudflare detected no threats",
-                                description=f"A URL scan has finished with no detections to report.",
-                                color=0x2BBD8E
-                            )
-                            embed.set_footer(text=f"{scan_id}")
-
-                        if categories:
-                            embed.add_field(name="Categories", value=f"{categories}", inline=False)
-                        if phishing:
-                            embed.add_field(name="Phishing", value=f"{phishing}", inline=False)
-
-                        # Add a URL button to view the report
-                        view = discord.ui.View()
-                        report_url = f"https://radar.cloudflare.com/scan/{scan_id}"
-                        report_button = discord.ui.Button(label="View on Cloudflare Radar", url=report_url, style=discord.ButtonStyle.link)
-                        view.add_item(report_button)
-                        await ctx.send(embed=embed, view=view)
-                        return
+        if status != 200:
+            embed = discord.Embed(title="Error", description=f"Failed to check scan status: {status}", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        if not data.get("success", False):
+            embed = discord.Embed(title="Error", description="Failed to check scan status.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
 
-            except Exception as e:
-                await ctx.send(embed=discord.Embed(
-                    title="Error",
-                    description=f"An error occurred while checking the scan status: {str(e)}",
-                    color=0xff4545
-                ))
-                return
+        verdict = parse_scan_verdict(scan_id, data["result"]["scan"])
+        self.verdicts.put(url, verdict)
+        embed, view = self._verdict_embed(verdict)
+
+        # The scan is finished, so pull its artifacts alongside each other rather than one by one
+        har, screenshot = await asyncio.gather(
+            self._fetch_scan_har(scan_id, account_id, headers),
+            self._fetch_scan_screenshot(scan_id, account_id, headers),
+            return_exceptions=True
+        )
+        upload_limit = ctx.guild.filesize_limit if ctx.guild else DEFAULT_UPLOAD_LIMIT
+        # The verdict goes out on its own so an oversized artifact can't cost the user the result
+        files = []
+        if isinstance(screenshot, bytes) and len(screenshot) <= upload_limit:
+            files.append(discord.File(io.BytesIO(screenshot), filename=f"{scan_id}_screenshot.png"))
+            embed.set_image(url=f"attachment://{scan_id}_screenshot.png")
+        await ctx.send(embed=embed, view=view, files=files)
+
+        if isinstance(har, dict):
+            attachment = await self.bot.loop.run_in_executor(None, har_attachment, har, scan_id, upload_limit)
+            if attachment is None:
+                embed = discord.Embed(title="HAR not attached", description=f"This scan's HAR is over the upload limit here, even compressed. It's still available from Cloudflare under scan `{scan_id}`.", color=0xff4545)
+                await ctx.send(embed=embed)
+            else:
+                data, filename = attachment
+                await ctx.send(file=discord.File(io.BytesIO(data), filename=filename))
 
     @urlscanner.command(name="autoscan")
     @commands.has_permissions(administrator=True)
@@ -2500,6 +3823,28 @@ class Cloudflare(commands.Cog):
         )
         await ctx.send(embed=embed)
         
+    @urlscanner.command(name="cache")
+    @commands.is_owner()
+    async def verdict_cache(self, ctx, clear: bool = False):
+        """
+        Show how often scans are answered from the local verdict cache.
+
+        Pass `True` to clear every cached verdict.
+        """
+        if clear:
+            self.verdicts.clear()
+        embed = discord.Embed(
+            title="Verdict cache",
+            description="Recent URL scan verdicts are reused instead of resubmitting the URL to Cloudflare.",
+            color=0xFF6633
+        )
+        embed.add_field(name="Cached verdicts", value=f"**`{len(self.verdicts)}`**", inline=True)
+        embed.add_field(name="Hits", value=f"**`{self.verdicts.hits}`**", inline=True)
+        embed.add_field(name="Misses", value=f"**`{self.verdicts.misses}`**", inline=True)
+        embed.add_field(name="Hit rate", value=f"**`{self.verdicts.hit_rate:.0%}`**", inline=True)
+        embed.add_field(name="Lifetime", value=f"**`{self.verdicts.ttl // 60} minutes`**", inline=True)
+        await ctx.send(embed=embed)
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot:
@@ -2509,73 +3854,18 @@ class Cloudflare(commands.Cog):
         if message.guild is None:
             return
 
-        # Check if autoscan is enabled
-        auto_scan_enabled = await self.config.guild(message.guild).auto_scan()
-        if not auto_scan_enabled:
-            return
-
         urls = [word for word in message.content.split() if word.startswith("http://") or word.startswith("https://")]
         if not urls:
             return
 
-        api_tokens = await self.bot.get_shared_api_tokens("cloudflare")
-        account_id = api_tokens.get("account_id")
-        bearer_token = api_tokens.get("bearer_token")
-
-        if not account_id or not bearer_token:
+        # Check if autoscan is enabled
+        auto_scan_enabled = await self.config.guild(message.guild).auto_scan()
+        if not auto_scan_enabled:
             return
 
-        headers = {
-            "Authorization": f"Bearer {bearer_token}",
-            "Content-Type": "application/json"
-        }
-
+        # Hand off to the background scheduler so this listener never waits on a scan
         for url in urls:
-            payload = {"url": url}
-            api_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan"
-
-            try:
-                async with self.session.post(api_url, headers=headers, json=payload) as response:
-                    data = await response.json()
-                    if not data.get("success", False):
-                        continue
-
-                    scan_id = data.get("result", {}).get("uuid")
-                    if not scan_id:
-                        continue
-
-                    await asyncio.sleep(120)
-
-                    scan_result_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/urlscanner/scan/{scan_id}"
-                    async with self.session.get(scan_result_url, headers=headers) as scan_response:
-                        scan_data = await scan_response.json()
-                        if not scan_data.get("success", False):
-                            continue
-
-                        result = scan_data.get("result", {}).get("scan", {})
-                        verdicts = result.get("verdicts", {})
-                        malicious = verdicts.get("overall", {}).get("malicious", False)
-
-                        if malicious:
-                            await message.delete()
-                            embed = discord.Embed(
-                                title="Cloudflare detected a threat!",
-                                description=f"Cloudflare detected a threat in a message sent in this channel and removed it to safeguard the community.",
-                                color=0xFF6633
-                            )
-                            await message.channel.send(embed=embed)
-                            return
-
-            except Exception as e:
-                await message.channel.send(embed=discord.Embed(
-                    title="Error",
-                    description=f"An error occurred while processing the URL scan: {str(e)}",
-                    color=0xff4545
-                ))
-
-
-
-
+            self.url_scans.enqueue(url, message)
 
     @commands.is_owner()
     @commands.group(invoke_without_command=False)
@@ -2604,7 +3894,8 @@ class Cloudflare(commands.Cog):
             "Content-Type": "application/json"
         }
 
-        async with self.session.get(f"https://api.cloudflare.com/client/v4/accounts/{account_id}/email/routing/addresses", headers=headers) as response:
+        addresses_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/email/routing/addresses"
+        async with self.session.get(addresses_url, headers=headers, params={"page": 1, "per_page": 50}) as response:
             if response.status != 200:
                 embed = discord.Embed(title="Error", description=f"Failed to fetch Email Routing addresses: {response.status}", color=0xff4545)
                 await ctx.send(embed=embed)
@@ -2622,43 +3913,22 @@ class Cloudflare(commands.Cog):
                 await ctx.send(embed=embed)
                 return
 
-            pages = [addresses[i:i + 10] for i in range(0, len(addresses), 10)]
-            current_page = 0
-
-            embed = discord.Embed(title="Email Routing address list", description="\n".join([f"**`{addr['email']}`**" for addr in pages[current_page]]), color=0x2BBD8E)
-            message = await ctx.send(embed=embed)
-
-            if len(pages) > 1:
-                await message.add_reaction("◀️")
-                await message.add_reaction("❌")
-                await message.add_reaction("▶️")
+            total_pages = data.get("result_info", {}).get("total_pages", 1)
 
-                def check(reaction, user):
-                    return user == ctx.author and str(reaction.emoji) in ["◀️", "❌", "▶️"] and reaction.message.id == message.id
-
-                while True:
-                    try:
-                        reaction, user = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
-
-                        if str(reaction.emoji) == "▶️" and current_page < len(pages) - 1:
-                            current_page += 1
-                            embed.description = "\n".join([f"**`{addr['email']}`**" for addr in pages[current_page]])
-                            await message.edit(embed=embed)
-                            await message.remove_reaction(reaction, user)
-
-                        elif str(reaction.emoji) == "◀️" and current_page > 0:
-                            current_page -= 1
-                            embed.description = "\n".join([f"**`{addr['email']}`**" for addr in pages[current_page]])
-                            await message.edit(embed=embed)
-                            await message.remove_reaction(reaction, user)
-
-                        elif str(reaction.emoji) == "❌":
-                            await message.delete()
-                            break
+        async def address_pages():
+            # Further pages of addresses are only requested once the user pages past what's loaded
+            batch, api_page = addresses, 1
+            while batch:
+                for i in range(0, len(batch), 10):
+                    yield discord.Embed(title="Email Routing address list", description="\n".join([f"**`{addr['email']}`**" for addr in batch[i:i + 10]]), color=0x2BBD8E)
+                api_page += 1
+                if api_page > total_pages:
+                    return
+                async with self.session.get(addresses_url, headers=headers, params={"page": api_page, "per_page": 50}) as page_response:
+                    page_data = await page_response.json()
+                batch = page_data.get("result", []) if page_data.get("success", False) else []
 
-                    except asyncio.TimeoutError:
-                        await message.clear_reactions()
-                        break
+        await Paginator(ctx.author, address_pages, timeout=30.0).send(ctx)
 
     @commands.is_owner()
     @emailrouting.command(name="add")
@@ -3146,6 +4416,99 @@ class Cloudflare(commands.Cog):
 
             await ctx.send(embed=embed)
     
+    @commands.is_owner()
+    @emailrouting.command(name="apply")
+    async def apply_email_routing(self, ctx, dry_run: bool = False):
+        """
+        Apply a desired-state YAML or JSON file of destination addresses and routing rules.
+
+        Attach a file with an `addresses` list of emails and a `rules` list. Rules can be full rule objects or `source`/`destination` shorthand, and are matched to existing rules by their matchers. Only differences are applied, and nothing is deleted unless the file sets `prune: true`. Pass `True` for a dry run that only previews the changes.
+        """
+        api_tokens = await self.bot.get_shared_api_tokens("cloudflare")
+        email = api_tokens.get("email")
+        api_key = api_tokens.get("api_key")
+        bearer_token = api_tokens.get("bearer_token")
+        account_id = api_tokens.get("account_id")
+        zone_identifier = api_tokens.get("zone_id")
+
+        if not all([email, api_key, bearer_token, account_id, zone_identifier]):
+            embed = discord.Embed(title="Error", description="Missing one or more required API tokens. Please check your configuration.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        if not ctx.message.attachments:
+            embed = discord.Embed(title="Error", description="Please attach a YAML or JSON desired-state file.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        try:
+            attachment = ctx.message.attachments[0]
+            state = load_desired_state(await attachment.read(), attachment.filename)
+            prune = bool(state.get("prune", False))
+            desired_addresses = {}
+            for address in state.get("addresses") or []:
+                address = address if isinstance(address, str) else address.get("email", "")
+                desired_addresses[address.lower()] = {"email": address}
+            desired_rules = {}
+            for rule in state.get("rules") or []:
+                body = normalize_routing_rule(rule)
+                if not body.get("matchers") or not body.get("actions"):
+                    raise ValueError(f"Rule `{body.get('name', rule)}` needs matchers and actions, or a source and destination.")
+                desired_rules[routing_rule_key(body)] = body
+        except (ValueError, AttributeError, TypeError) as e:
+            embed = discord.Embed(title="Error", description=str(e) or "The desired-state file is not valid.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        headers = {
+            "X-Auth-Email": email,
+            "X-Auth-Key": api_key,
+            "Authorization": f"Bearer {bearer_token}",
+            "Content-Type": "application/json"
+        }
+        addresses_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/email/routing/addresses"
+        rules_url = f"https://api.cloudflare.com/client/v4/zones/{zone_identifier}/email/routing/rules"
+
+        try:
+            async with ctx.typing():
+                addresses, rules = await asyncio.gather(
+                    self._get_all_pages(addresses_url, headers, account_id),
+                    self._get_all_pages(rules_url, headers, zone_identifier)
+                )
+        except Exception as e:
+            embed = discord.Embed(title="Error", description=f"Failed to fetch current Email Routing state: {e}", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        current_addresses = {address["email"].lower(): address for address in addresses}
+        # The catch-all rule can't be created or deleted, only configured, so leave it out of the diff
+        current_rules = {
+            routing_rule_key(rule): rule for rule in rules
+            if not any(matcher.get("type") == "all" for matcher in rule.get("matchers", []))
+        }
+
+        def rule_label(rule):
+            sources = [str(matcher.get("value")) for matcher in rule.get("matchers", []) if matcher.get("value")]
+            return rule.get("name") or ", ".join(sources) or "unnamed rule"
+
+        address_creates, address_deletes, rule_changes = [], [], []
+        for action, key, existing, body in diff_resources(current_addresses, desired_addresses, prune=prune):
+            change = {"action": action, "kind": "address", "label": key, "payload": body}
+            if action == "create":
+                address_creates.append({**change, "method": "POST", "url": addresses_url})
+            elif action == "delete":
+                address_deletes.append({**change, "method": "DELETE", "url": f"{addresses_url}/{existing['id']}"})
+        read_only = ("id", "tag", "created", "modified")
+        for action, key, existing, body in diff_resources(current_rules, desired_rules, prune=prune, read_only=read_only):
+            change = {"action": action, "kind": "rule", "label": rule_label(body or existing), "payload": body}
+            if action == "create":
+                rule_changes.append({**change, "method": "POST", "url": rules_url})
+            else:
+                rule_changes.append({**change, "method": "PUT" if action == "update" else "DELETE", "url": f"{rules_url}/{existing.get('id') or existing.get('tag')}"})
+
+        # New destinations have to exist before rules forward to them, and rules are removed before their destinations
+        await self._apply_plan(ctx, "Email Routing", [address_creates, rule_changes, address_deletes], headers, dry_run)
+
     @commands.is_owner()
     @emailrouting.group(name="rules", invoke_without_command=True)
     async def email_routing_rules(self, ctx):
@@ -4,10 +4,156 @@ from datetime import datetime, timezone
 import os
 import tempfile
 import asyncio
-from collections import Counter
+from collections import Counter, OrderedDict
 import random
 import string
 
+class Paginator(discord.ui.View):
+    """
+    Button paginator that renders pages on demand.
+
+    `source` is a zero-argument callable returning an iterator or async iterator of pages, so
+    pages are only built when the user reaches them. A page is an embed, or an `(embed, items)`
+    tuple whose extra items (such as link buttons) are shown with that page only. Only the last
+    `window` rendered pages are kept; moving back past them restarts the source and skips
+    forward to the wanted page.
+    """
+
+    def __init__(self, author, source, *, timeout: float = 60.0, window: int = 10):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.source = source
+        self.window = window
+        self.message = None
+        self.index = 0
+        self.total = None
+        self._pages = OrderedDict()
+        self._iterator = None
+        self._produced = 0
+        self._page_items = []
+
+    async def send(self, destination, message: discord.Message = None):
+        """
+        Send the first page, attaching the page buttons only if there is more than one.
+
+        Pass `message` to turn an already sent message into the paginator instead.
+        """
+        first = await self._page(0)
+        if first is None:
+            return None
+        if await self._page(1) is None:
+            self._remove_navigation()
+        embed = self._show_items(first)
+        self._refresh_buttons()
+        if message is not None:
+            await message.edit(embed=embed, view=self if self.children else None)
+            self.message = message
+        else:
+            self.message = await destination.send(embed=embed, view=self if self.children else None)
+        if not self.children:
+            self.stop()
+        return self.message
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("Only the person who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self):
+        self._remove_navigation()
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self if self.children else None)
+            except discord.HTTPException:
+                pass
+
+    def _remove_navigation(self):
+        for item in (self.previous_page, self.page_label, self.next_page, self.close):
+            self.remove_item(item)
+
+    def _show_items(self, page):
+        """Swap in the extra items of `page` and return its embed."""
+        embed, items = page if isinstance(page, tuple) else (page, [])
+        for item in self._page_items:
+            self.remove_item(item)
+        self._page_items = list(items)
+        for item in self._page_items:
+            self.add_item(item)
+        return embed
+
+    async def _advance(self):
+        try:
+            if hasattr(self._iterator, "__anext__"):
+                page = await self._iterator.__anext__()
+            else:
+                page = next(self._iterator)
+        except (StopIteration, StopAsyncIteration):
+            self.total = self._produced
+            return None
+        self._pages[self._produced] = page
+        self._produced += 1
+        while len(self._pages) > self.window:
+            self._pages.popitem(last=False)
+        return page
+
+    async def _page(self, index: int):
+        if index in self._pages:
+            self._pages.move_to_end(index)
+            return self._pages[index]
+        if self.total is not None and index >= self.total:
+            return None
+        if self._iterator is None or index < self._produced:
+            source = self.source()
+            self._iterator = source.__aiter__() if hasattr(source, "__aiter__") else iter(source)
+            self._produced = 0
+            self._pages.clear()
+        page = None
+        while self._produced <= index:
+            page = await self._advance()
+            if page is None:
+                return None
+        return page
+
+    def _refresh_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.total is not None and self.index >= self.total - 1
+        total = self.total if self.total is not None else "?"
+        self.page_label.label = f"{self.index + 1}/{total}"
+
+    async def _show(self, interaction: discord.Interaction, index: int):
+        page = await self._page(index)
+        if page is None:
+            await interaction.response.defer()
+            return
+        self.index = index
+        # Look one page ahead so the next button is disabled on the last page
+        await self._page(index + 1)
+        if index in self._pages:
+            self._pages.move_to_end(index)
+        embed = self._show_items(page)
+        self._refresh_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.grey)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="1/?", style=discord.ButtonStyle.grey, disabled=True)
+    async def page_label(self, interaction: discord.Interaction, button: discord.ui.Button):
+        pass
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.grey)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index + 1)
+
+    @discord.ui.button(emoji="❌", style=discord.ButtonStyle.grey)
+    async def close(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.defer()
+        await interaction.message.delete()
+
+
 class ReportsPro(commands.Cog):
     """Cog to handle global user reports"""
 
@@ -322,68 +468,36 @@ class ReportsPro(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Create a list of embeds, one for each report
-        embeds = []
-        for report_id, report_info in filtered_reports:
-            reported_user = ctx.guild.get_member(int(report_info['reported_user']))
-            reporter = ctx.guild.get_member(int(report_info['reporter']))
-
-            embed = discord.Embed(title=f"Report {report_id}", color=discord.Color.from_rgb(255, 255, 254))
-            embed.add_field(
-                name="Reported User",
-                value=reported_user.mention if reported_user else 'Unknown User',
-                inline=False
-            )
-            embed.add_field(
-                name="Reported By",
-                value=reporter.mention if reporter else 'Unknown Reporter',
-                inline=False
-            )
-            embed.add_field(
-                name="Reason",
-                value=f"{report_info['reason']}: {report_info.get('description', 'No description available')}",
-                inline=False
-            )
-            embed.add_field(
-                name="Timestamp",
-                value=f"<t:{int(datetime.fromisoformat(report_info.get('timestamp', '1970-01-01T00:00:00+00:00')).timestamp())}:R>",
-                inline=False
-            )
-            embeds.append(embed)
-
-        # Function to handle pagination
-        async def send_paginated_embeds(ctx, embeds):
-            current_page = 0
-            message = await ctx.send(embed=embeds[current_page])
-
-            # Add reaction controls
-            await message.add_reaction("⬅️")
-            await message.add_reaction("➡️")
-            await message.add_reaction("❌")  # Add close emoji
-
-            def check(reaction, user):
-                return user == ctx.author and str(reaction.emoji) in ["⬅️", "➡️", "❌"] and reaction.message.id == message.id
-
-            while True:
-                try:
-                    reaction, user = await self.bot.wait_for('reaction_add', timeout=60.0, check=check)
-
-                    if str(reaction.emoji) == "➡️" and current_page < len(embeds) - 1:
-                        current_page += 1
-                        await message.edit(embed=embeds[current_page])
-                    elif str(reaction.emoji) == "⬅️" and current_page > 0:
-                        current_page -= 1
-                        await message.edit(embed=embeds[current_page])
-                    elif str(reaction.emoji) == "❌":
-                        await message.delete()
-                        break
-
-                    await message.remove_reaction(reaction, user)
-                except asyncio.TimeoutError:
-                    await message.clear_reactions()
-                    break
+        # Build each report's embed only when it is paged to
+        def report_pages():
+            for report_id, report_info in filtered_reports:
+                reported_user = ctx.guild.get_member(int(report_info['reported_user']))
+                reporter = ctx.guild.get_member(int(report_info['reporter']))
+
+                embed = discord.Embed(title=f"Report {report_id}", color=discord.Color.from_rgb(255, 255, 254))
+                embed.add_field(
+                    name="Reported User",
+                    value=reported_user.mention if reported_user else 'Unknown User',
+                    inline=False
+                )
+                embed.add_field(
+                    name="Reported By",
+                    value=reporter.mention if reporter else 'Unknown Reporter',
+                    inline=False
+                )
+                embed.add_field(
+                    name="Reason",
+                    value=f"{report_info['reason']}: {report_info.get('description', 'No description available')}",
+                    inline=False
+                )
+                embed.add_field(
+                    name="Timestamp",
+                    value=f"<t:{int(datetime.fromisoformat(report_info.get('timestamp', '1970-01-01T00:00:00+00:00')).timestamp())}:R>",
+                    inline=False
+                )
+                yield embed
 
-        await send_paginated_embeds(ctx, embeds)
+        await Paginator(ctx.author, report_pages).send(ctx)
 
     @reports.command(name="clear")
     @checks.admin_or_permissions(manage_guild=True)
@@ -1,48 +1,1151 @@
 import discord #type: ignore
 import aiohttp #type: ignore
+import numpy as np #type: ignore
+from matplotlib.figure import Figure #type: ignore
 import re
 import asyncio
+import bisect
+import codecs
 import urllib
 import os
 import io
 import tempfile
 import csv
+import html
 import datetime
+import fnmatch
+import json
+import math
+import sqlite3
+import time
+import zipfile
+from collections import OrderedDict
 from urllib.parse import quote_plus
 from discord.ext import tasks, commands #type: ignore
 from redbot.core import commands, Config #type: ignore
+from redbot.core.data_manager import bundled_data_path, cog_data_path #type: ignore
 from reportlab.lib.pagesizes import letter, landscape, A4 #type: ignore
 from reportlab.pdfgen import canvas #type: ignore 
 from reportlab.lib import colors #type: ignore
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle #type: ignore
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle #type: ignore
+from reportlab.lib.styles import getSampleStyleSheet #type: ignore
+from reportlab.platypus import SimpleDocTemplate, Paragraph, PageBreak, Table, TableStyle #type: ignore
 
 import skysearch #type: ignore
-from .icao_codes import law_enforcement_icao_set, military_icao_set, medical_icao_set, suspicious_icao_set, newsagency_icao_set, balloons_icao_set, global_prior_known_accident_set, ukr_conflict_set, agri_utility_set
+
+EMERGENCY_SQUAWKS = ('7500', '7600', '7700')
+KM_PER_NM = 1.852
+HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+AUTO_ICAO_DEBOUNCE = 60  # Seconds before the same hex is looked up again in a channel
+
+# Embed text for each tag in data/icao_tags.json, in display order
+ASSET_INTELLIGENCE = (
+    ('law_enforcement', ":police_officer: Known for use by **state law enforcement**"),
+    ('military', ":military_helmet: Known for use in **military** and **government**"),
+    ('medical', ":hospital: Known for use in **medical response** and **transport**"),
+    ('suspicious', ":warning: Exhibits suspicious flight or **surveillance** activity"),
+    ('prior_accident', ":boom: Prior involved in one or more **documented accidents**"),
+    ('ukr_conflict', ":flag_ua: Utilized within the **[Russo-Ukrainian conflict](https://en.wikipedia.org/wiki/Russian-occupied_territories_of_Ukraine)**"),
+    ('news_agency', ":newspaper: Used by **news** or **media** organization"),
+    ('balloon', ":balloon: Aircraft is a **balloon**"),
+    ('agri_utility', ":corn: Used for **agriculture surveys, easement validation, or land inspection**"),
+)
+
+TAG_STATISTICS = (
+    ('law_enforcement', "Law enforcement aircraft", "tagged"),
+    ('military', "Military & government aircraft", "tagged"),
+    ('medical', "Medical aircraft", "tagged"),
+    ('news_agency', "Media aircraft", "known"),
+    ('prior_accident', "Damaged aircraft", "known"),
+    ('ukr_conflict', "Wartime aircraft", "observed"),
+    ('agri_utility', "Utility aircraft", "spotted"),
+    ('balloon', "Balloons", "known"),
+    ('suspicious', "Suspicious aircraft", "identifiers"),
+)
+
+class Paginator(discord.ui.View):
+    """
+    Button paginator that renders pages on demand.
+
+    `source` is a zero-argument callable returning an iterator or async iterator of pages, so
+    pages are only built when the user reaches them. A page is an embed, or an `(embed, items)`
+    tuple whose extra items (such as link buttons) are shown with that page only. Only the last
+    `window` rendered pages are kept; moving back past them restarts the source and skips
+    forward to the wanted page.
+    """
+
+    def __init__(self, author, source, *, timeout: float = 60.0, window: int = 10):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.source = source
+        self.window = window
+        self.message = None
+        self.index = 0
+        self.total = None
+        self._pages = OrderedDict()
+        self._iterator = None
+        self._produced = 0
+        self._page_items = []
+
+    async def send(self, destination, message: discord.Message = None):
+        """
+        Send the first page, attaching the page buttons only if there is more than one.
+
+        Pass `message` to turn an already sent message into the paginator instead.
+        """
+        first = await self._page(0)
+        if first is None:
+            return None
+        if await self._page(1) is None:
+            self._remove_navigation()
+        embed = self._show_items(first)
+        self._refresh_buttons()
+        if message is not None:
+            await message.edit(embed=embed, view=self if self.children else None)
+            self.message = message
+        else:
+            self.message = await destination.send(embed=embed, view=self if self.children else None)
+        if not self.children:
+            self.stop()
+        return self.message
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("Only the person who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self):
+        self._remove_navigation()
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self if self.children else None)
+            except discord.HTTPException:
+                pass
+
+    def _remove_navigation(self):
+        for item in (self.previous_page, self.page_label, self.next_page, self.close):
+            self.remove_item(item)
+
+    def _show_items(self, page):
+        """Swap in the extra items of `page` and return its embed."""
+        embed, items = page if isinstance(page, tuple) else (page, [])
+        for item in self._page_items:
+            self.remove_item(item)
+        self._page_items = list(items)
+        for item in self._page_items:
+            self.add_item(item)
+        return embed
+
+    async def _advance(self):
+        try:
+            if hasattr(self._iterator, "__anext__"):
+                page = await self._iterator.__anext__()
+            else:
+                page = next(self._iterator)
+        except (StopIteration, StopAsyncIteration):
+            self.total = self._produced
+            return None
+        self._pages[self._produced] = page
+        self._produced += 1
+        while len(self._pages) > self.window:
+            self._pages.popitem(last=False)
+        return page
+
+    async def _page(self, index: int):
+        if index in self._pages:
+            self._pages.move_to_end(index)
+            return self._pages[index]
+        if self.total is not None and index >= self.total:
+            return None
+        if self._iterator is None or index < self._produced:
+            source = self.source()
+            self._iterator = source.__aiter__() if hasattr(source, "__aiter__") else iter(source)
+            self._produced = 0
+            self._pages.clear()
+        page = None
+        while self._produced <= index:
+            page = await self._advance()
+            if page is None:
+                return None
+        return page
+
+    def _refresh_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.total is not None and self.index >= self.total - 1
+        total = self.total if self.total is not None else "?"
+        self.page_label.label = f"{self.index + 1}/{total}"
+
+    async def _show(self, interaction: discord.Interaction, index: int):
+        page = await self._page(index)
+        if page is None:
+            await interaction.response.defer()
+            return
+        self.index = index
+        # Look one page ahead so the next button is disabled on the last page
+        await self._page(index + 1)
+        if index in self._pages:
+            self._pages.move_to_end(index)
+        embed = self._show_items(page)
+        self._refresh_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.grey)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="1/?", style=discord.ButtonStyle.grey, disabled=True)
+    async def page_label(self, interaction: discord.Interaction, button: discord.ui.Button):
+        pass
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.grey)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index + 1)
+
+    @discord.ui.button(emoji="❌", style=discord.ButtonStyle.grey)
+    async def close(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.defer()
+        await interaction.message.delete()
+
+
+class RateLimiter:
+    """Token bucket that allows `rate` acquisitions every `per` seconds."""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+
+
+class EmergencyTracker:
+    """
+    Tracks active emergencies per ICAO hex between sweeps and decides which changes warrant an alert.
+
+    An aircraft alerts when its emergency starts, its squawk changes, it lands, or it clears, and
+    again after `realert_interval` seconds while it keeps squawking in the air (0 turns that off).
+    """
+
+    # Consecutive sweeps an aircraft has to be missing from before its emergency counts as cleared
+    CLEAR_AFTER = 2
+
+    def __init__(self, state=None):
+        self.active = dict(state or {})
+
+    def update(self, emergencies: dict, realert_interval: float, now: float = None):
+        """Fold one sweep into the tracked state and return `(event, hex, aircraft, previous_state)` tuples."""
+        now = now or time.time()
+        events = []
+        for hex_id, aircraft in emergencies.items():
+            squawk = aircraft.get('squawk')
+            on_ground = aircraft.get('alt_baro') == 'ground'
+            previous = self.active.get(hex_id)
+            if previous is None:
+                event = 'new'
+            elif previous['squawk'] != squawk:
+                event = 'squawk'
+            elif on_ground and not previous['on_ground']:
+                event = 'landed'
+            elif realert_interval and not on_ground and now - previous['alerted_at'] >= realert_interval:
+                event = 'reminder'
+            else:
+                event = None
+            self.active[hex_id] = {
+                'squawk': squawk,
+                'on_ground': on_ground,
+                'flight': aircraft.get('flight', '').strip(),
+                'desc': aircraft.get('desc'),
+                'first_seen': previous['first_seen'] if previous else now,
+                'alerted_at': now if event else previous['alerted_at'],
+                'missed': 0,
+            }
+            if event:
+                events.append((event, hex_id, aircraft, previous))
+
+        for hex_id in [hex_id for hex_id in self.active if hex_id not in emergencies]:
+            state = self.active[hex_id]
+            state['missed'] += 1
+            if state['missed'] >= self.CLEAR_AFTER:
+                del self.active[hex_id]
+                events.append(('cleared', hex_id, None, state))
+        return events
+
+
+WATCH_KINDS = ('hex', 'callsign', 'reg', 'type')
+WATCHLIST_LIMIT = 250  # Targets per guild
+WATCH_BATCH_SIZE = 100  # Values per batched lookup
+WATCH_BATCH_CHARS = 1500  # Keeps batched lookup URLs well under common length limits
+WATCH_AIRCRAFT_FIELDS = {'hex': 'hex', 'callsign': 'flight', 'reg': 'r', 'type': 't'}
+
+
+def is_callsign_pattern(kind: str, value: str):
+    return kind == 'callsign' and any(char in value for char in '*?')
+
+
+class WatchIndex:
+    """
+    Every guild's watchlist merged into one index, so each target is queried once however many guilds watch it.
+
+    Callsigns containing `*` or `?` are patterns. The API can't search by pattern, so instead they narrow
+    the same guild's type watches: a guild with patterns only hears about aircraft found by its type
+    watches when their callsign matches one of its patterns. Other guilds' watches never feed them.
+    """
+
+    def __init__(self, watchlists: dict):
+        self.exact = {kind: {} for kind in WATCH_KINDS}
+        self.patterns = {}
+        for guild_id, watchlist in watchlists.items():
+            for target in watchlist:
+                kind, value = target['kind'], target['value']
+                if is_callsign_pattern(kind, value):
+                    self.patterns.setdefault(guild_id, []).append(re.compile(fnmatch.translate(value)))
+                else:
+                    self.exact[kind].setdefault(value, set()).add(guild_id)
+
+    def __len__(self):
+        return sum(len(values) for values in self.exact.values())
+
+    def queries(self):
+        """Deduplicated values to look up upstream, by watch kind."""
+        return {kind: sorted(values) for kind, values in self.exact.items() if values}
+
+    def match(self, aircraft: dict):
+        """Ids of every guild watching this aircraft."""
+        guilds = set()
+        for kind, field in WATCH_AIRCRAFT_FIELDS.items():
+            value = (aircraft.get(field) or '').strip().upper()
+            if value and kind != 'type':
+                guilds |= self.exact[kind].get(value, set())
+        aircraft_type = (aircraft.get('t') or '').strip().upper()
+        callsign = (aircraft.get('flight') or '').strip().upper()
+        for guild_id in self.exact['type'].get(aircraft_type, set()) if aircraft_type else ():
+            patterns = self.patterns.get(guild_id)
+            if not patterns or any(pattern.match(callsign) for pattern in patterns):
+                guilds.add(guild_id)
+        return guilds
+
+
+class WatchTracker:
+    """
+    Remembers the last state of each watched aircraft and turns changes between sweeps into events.
+
+    Events are takeoff, landing, a squawk change, and entering a guild's geofence. An aircraft's
+    first sighting (or its first after `FORGET_AFTER` seconds unseen) only records a baseline.
+    """
+
+    FORGET_AFTER = 30 * 60
+
+    def __init__(self):
+        self.state = {}
+
+    def update(self, aircraft_by_hex: dict, watchers: dict, geofences: dict, now: float = None):
+        """
+        Fold one sweep into the tracked state and return `(event, hex, aircraft, previous, guild_ids)` tuples.
+
+        `watchers` maps each hex to the ids of guilds watching it, and `geofences` maps guild ids to
+        `(lat, lon, radius_km)`. Geofence events name the guilds whose fence was entered; the rest go
+        to every watcher.
+        """
+        now = now or time.time()
+        events = []
+        for hex_id, aircraft in aircraft_by_hex.items():
+            previous = self.state.get(hex_id)
+            if previous is not None and now - previous['seen'] > self.FORGET_AFTER:
+                previous = None
+            on_ground = aircraft.get('alt_baro') == 'ground'
+            squawk = aircraft.get('squawk')
+            lat, lon = aircraft.get('lat'), aircraft.get('lon')
+            inside = set()
+            if lat is not None and lon is not None:
+                for guild_id in watchers.get(hex_id, ()):
+                    fence = geofences.get(guild_id)
+                    if fence and float(haversine_km(fence[0], fence[1], float(lat), float(lon))) <= fence[2]:
+                        inside.add(guild_id)
+            elif previous is not None:
+                inside = previous['inside']  # No position this sweep, so assume it hasn't moved
+            if previous is not None:
+                guilds = watchers.get(hex_id, set())
+                if previous['on_ground'] and not on_ground:
+                    events.append(('takeoff', hex_id, aircraft, previous, guilds))
+                elif on_ground and not previous['on_ground']:
+                    events.append(('landing', hex_id, aircraft, previous, guilds))
+                if squawk and previous['squawk'] and squawk != previous['squawk']:
+                    events.append(('squawk', hex_id, aircraft, previous, guilds))
+                entered = inside - previous['inside']
+                if entered:
+                    events.append(('geofence', hex_id, aircraft, previous, entered))
+            self.state[hex_id] = {'on_ground': on_ground, 'squawk': squawk or (previous or {}).get('squawk'), 'inside': inside, 'seen': now}
+
+        for hex_id in [hex_id for hex_id, state in self.state.items() if now - state['seen'] > self.FORGET_AFTER]:
+            del self.state[hex_id]
+        return events
+
+
+TRACK_POINT = np.dtype([('ts', 'f8'), ('lat', 'f4'), ('lon', 'f4'), ('alt', 'f4')])
+
+
+class TrackHistory:
+    """
+    Fixed-size ring buffer of recent positions per hex, stored as compact numpy records.
+
+    Altitude is NaN for aircraft on the ground. The least recently updated aircraft are dropped
+    once more than `max_aircraft` are tracked.
+    """
+
+    def __init__(self, capacity: int = 720, max_aircraft: int = 5000):
+        self.capacity = capacity
+        self.max_aircraft = max_aircraft
+        self._tracks = OrderedDict()
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def __contains__(self, hex_id):
+        return hex_id in self._tracks
+
+    def add(self, hex_id: str, aircraft: dict, now: float = None):
+        """Record an aircraft's position if it has one that's newer than the last recorded point."""
+        lat, lon = aircraft.get('lat'), aircraft.get('lon')
+        if lat is None or lon is None:
+            return
+        ts = (now or time.time()) - float(aircraft.get('seen_pos') or 0)
+        alt = aircraft.get('alt_baro')
+        alt = float(alt) if isinstance(alt, (int, float)) else float('nan')
+        track = self._tracks.get(hex_id)
+        if track is None:
+            track = self._tracks[hex_id] = [np.zeros(self.capacity, dtype=TRACK_POINT), 0]
+            if len(self._tracks) > self.max_aircraft:
+                self._tracks.popitem(last=False)
+        else:
+            self._tracks.move_to_end(hex_id)
+        points, count = track
+        if count and ts <= points[(count - 1) % self.capacity]['ts']:
+            return
+        points[count % self.capacity] = (ts, lat, lon, alt)
+        track[1] = count + 1
+
+    def points(self, hex_id: str):
+        """Recorded points for a hex in time order, oldest first."""
+        track = self._tracks.get(hex_id)
+        if track is None:
+            return np.zeros(0, dtype=TRACK_POINT)
+        points, count = track
+        if count <= self.capacity:
+            return points[:count].copy()
+        return np.roll(points, -(count % self.capacity))
+
+
+def rdp_mask(xs, ys, epsilon: float):
+    """Ramer–Douglas–Peucker simplification of a polyline, returning a mask of the points to keep."""
+    keep = np.zeros(len(xs), dtype=bool)
+    if len(xs) < 3:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, len(xs) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        dx, dy = xs[end] - xs[start], ys[end] - ys[start]
+        px, py = xs[start + 1:end] - xs[start], ys[start + 1:end] - ys[start]
+        length = math.hypot(dx, dy)
+        distances = np.abs(dx * py - dy * px) / length if length else np.hypot(px, py)
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > epsilon:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+
+def render_track(points, title: str, max_points: int = 400):
+    """
+    Draw a track as PNG bytes, colored by altitude.
+
+    Blocking, so run it in an executor. Long tracks are simplified with RDP first, loosening the
+    tolerance until at most `max_points` remain.
+    """
+    lats, lons, alts = points['lat'].astype(float), points['lon'].astype(float), points['alt'].astype(float)
+    # Unwrap longitudes so tracks over the antimeridian don't streak across the map
+    lons = np.degrees(np.unwrap(np.radians(lons)))
+    xs, ys = lons * math.cos(math.radians(float(np.mean(lats)))), lats
+    span = max(float(np.ptp(xs)), float(np.ptp(ys)), 1e-6)
+    keep = np.ones(len(xs), dtype=bool)
+    epsilon = span / 2000
+    while keep.sum() > max_points:
+        keep = rdp_mask(xs, ys, epsilon)
+        epsilon *= 2
+    lats, lons, alts = lats[keep], lons[keep], alts[keep]
+
+    figure = Figure(figsize=(8, 6), dpi=100)
+    axes = figure.add_subplot()
+    axes.plot(lons, lats, color='#999999', linewidth=1, zorder=1)
+    scatter = axes.scatter(lons, lats, c=np.nan_to_num(alts, nan=0.0), cmap='viridis', s=8, zorder=2)
+    axes.scatter(lons[:1], lats[:1], marker='o', color='#2BBD8E', s=60, zorder=3, label='First seen')
+    axes.scatter(lons[-1:], lats[-1:], marker='^', color='#ff4545', s=80, zorder=3, label='Latest')
+    figure.colorbar(scatter, ax=axes, label='Altitude (ft)')
+    axes.set_aspect(1 / math.cos(math.radians(float(np.mean(lats)))), adjustable='datalim')
+    axes.set_title(title)
+    axes.set_xlabel('Longitude')
+    axes.xaxis.set_major_formatter(lambda value, position: f"{(value + 180) % 360 - 180:g}")
+    axes.set_ylabel('Latitude')
+    axes.grid(True, linewidth=0.3)
+    axes.legend(loc='best', fontsize='small')
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', bbox_inches='tight')
+    return buffer.getvalue()
+
+
+class PhotoCache:
+    """
+    LRU cache of planespotters photos with a TTL, persisted as JSON between restarts.
+
+    Lookups that found no photo are cached too, for a shorter `negative_ttl`; lookups that failed
+    (`fetch` returning None) aren't cached at all. Concurrent lookups of the same aircraft share one
+    in-flight request.
+    """
+
+    def __init__(self, path, maxsize: int = 5000, ttl: float = 7 * 86400, negative_ttl: float = 6 * 3600):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, (stored_at, url, photographer) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if now - stored_at < (self.ttl if url else self.negative_ttl):
+                self._entries[key] = (stored_at, url, photographer)
+
+    def snapshot(self):
+        """Copy the entries for saving and mark the cache clean. Call it on the event loop, alongside the lookups."""
+        self.dirty = False
+        return dict(self._entries)
+
+    @staticmethod
+    def write(path, entries):
+        """Write a `snapshot()` to disk. Blocking, so call it from an executor while the bot is running."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(entries, file)
+        os.replace(temp_path, path)
+
+    def save(self):
+        self.write(self.path, self.snapshot())
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, url, photographer = entry
+        if time.time() - stored_at >= (self.ttl if url else self.negative_ttl):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return url, photographer
+
+    def _store(self, keys, url, photographer):
+        now = time.time()
+        for key in keys:
+            self._entries[key] = (now, url, photographer)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self.dirty = True
+
+    async def get(self, keys, fetch):
+        """
+        Return `(url, photographer)` for the first of `keys` with a cached photo, calling `fetch` on a miss.
+
+        A cached "no photo" only counts once every key has one, so a lookup that adds a registration
+        still gets a chance to find a photo the hex alone didn't. `fetch` returns `(url, photographer)`,
+        `(None, None)` when there's no photo, or None when the lookup failed and shouldn't be cached.
+        """
+        cached = [self._lookup(key) for key in keys]
+        for entry in cached:
+            if entry is not None and entry[0]:
+                self.hits += 1
+                return entry
+        if all(entry is not None for entry in cached):
+            self.hits += 1
+            return None, None
+
+        self.misses += 1
+        inflight = self._inflight.get(keys[0])
+        if inflight is None:
+            inflight = self._inflight[keys[0]] = asyncio.ensure_future(fetch())
+            try:
+                photo = await inflight
+            finally:
+                self._inflight.pop(keys[0], None)
+            if photo is None:
+                return None, None
+            self._store(keys, *photo)
+            return photo
+        return await asyncio.shield(inflight) or (None, None)
+
+
+class AirportDatabase:
+    """
+    Local SQLite copy of the OurAirports dataset (airports, runways and navaids).
+
+    Airports are indexed by ICAO, IATA, lowercase name (for prefix search) and a one degree
+    lat/lon grid cell, and lookups return dicts shaped like the airport-data.com and airportdb.io
+    responses the commands already render.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS airports (ident TEXT PRIMARY KEY, icao TEXT, iata TEXT, name TEXT, name_lower TEXT, "
+        "type TEXT, lat REAL, lon REAL, elevation_ft INTEGER, country_code TEXT, country TEXT, municipality TEXT, "
+        "home_link TEXT, wikipedia_link TEXT, cell_lat INTEGER, cell_lon INTEGER)",
+        "CREATE INDEX IF NOT EXISTS airports_icao ON airports (icao)",
+        "CREATE INDEX IF NOT EXISTS airports_iata ON airports (iata)",
+        "CREATE INDEX IF NOT EXISTS airports_name ON airports (name_lower)",
+        "CREATE INDEX IF NOT EXISTS airports_cell ON airports (cell_lat, cell_lon)",
+        "CREATE TABLE IF NOT EXISTS runways (airport_ident TEXT, length_ft INTEGER, width_ft INTEGER, surface TEXT, "
+        "lighted INTEGER, closed INTEGER, le_ident TEXT, he_ident TEXT, le_heading REAL, he_heading REAL)",
+        "CREATE INDEX IF NOT EXISTS runways_airport ON runways (airport_ident)",
+        "CREATE TABLE IF NOT EXISTS navaids (ident TEXT, name TEXT, type TEXT, frequency_khz INTEGER, lat REAL, lon REAL, "
+        "elevation_ft INTEGER, country_code TEXT, usage_type TEXT, power TEXT, associated_airport TEXT)",
+        "CREATE INDEX IF NOT EXISTS navaids_airport ON navaids (associated_airport)",
+        "CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)",
+    )
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._db = sqlite3.connect(self.path)
+        self._db.row_factory = sqlite3.Row
+        for statement in self.SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM airports").fetchone()[0]
+
+    @property
+    def imported_at(self):
+        row = self._db.execute("SELECT value FROM metadata WHERE key = 'imported_at'").fetchone()
+        return float(row[0]) if row else None
+
+    def close(self):
+        self._db.close()
+
+    def import_ourairports(self, airports_csv: str, runways_csv: str = "", navaids_csv: str = "", countries_csv: str = ""):
+        """
+        Replace the database contents with an OurAirports CSV export and return the row counts.
+
+        Blocking, so run it in an executor. It writes through its own connection in one transaction,
+        which keeps the bot's lookups on the old data until the import commits.
+        """
+        def number(value, kind=float):
+            try:
+                return kind(float(value))
+            except (TypeError, ValueError):
+                return None
+
+        countries = {row["code"]: row["name"] for row in csv.DictReader(io.StringIO(countries_csv))} if countries_csv else {}
+        airports = []
+        for row in csv.DictReader(io.StringIO(airports_csv)):
+            if row.get("type") == "closed":
+                continue
+            lat, lon = number(row.get("latitude_deg")), number(row.get("longitude_deg"))
+            icao = (row.get("icao_code") or row.get("gps_code") or "").upper()
+            if not icao and len(row["ident"]) == 4 and row["ident"].isalpha():
+                icao = row["ident"].upper()
+            airports.append((
+                row["ident"].upper(), icao or None, (row.get("iata_code") or "").upper() or None, row.get("name"),
+                (row.get("name") or "").lower(), row.get("type"), lat, lon, number(row.get("elevation_ft"), int),
+                row.get("iso_country"), countries.get(row.get("iso_country")), row.get("municipality"),
+                row.get("home_link") or None, row.get("wikipedia_link") or None,
+                math.floor(lat) if lat is not None else None, math.floor(lon) if lon is not None else None,
+            ))
+        runways = [
+            (
+                row["airport_ident"].upper(), number(row.get("length_ft"), int), number(row.get("width_ft"), int),
+                row.get("surface"), number(row.get("lighted"), int), number(row.get("closed"), int),
+                row.get("le_ident"), row.get("he_ident"),
+                number(row.get("le_heading_degT")), number(row.get("he_heading_degT")),
+            )
+            for row in csv.DictReader(io.StringIO(runways_csv))
+        ] if runways_csv else []
+        navaids = [
+            (
+                row.get("ident"), row.get("name"), row.get("type"), number(row.get("frequency_khz"), int),
+                number(row.get("latitude_deg")), number(row.get("longitude_deg")), number(row.get("elevation_ft"), int),
+                row.get("iso_country"), row.get("usageType"), row.get("power"), (row.get("associated_airport") or "").upper() or None,
+            )
+            for row in csv.DictReader(io.StringIO(navaids_csv))
+        ] if navaids_csv else []
+
+        db = sqlite3.connect(self.path)
+        try:
+            with db:
+                db.execute("DELETE FROM airports")
+                db.execute("DELETE FROM runways")
+                db.execute("DELETE FROM navaids")
+                db.executemany(f"INSERT OR REPLACE INTO airports VALUES ({', '.join('?' * 16)})", airports)
+                db.executemany(f"INSERT INTO runways VALUES ({', '.join('?' * 10)})", runways)
+                db.executemany(f"INSERT INTO navaids VALUES ({', '.join('?' * 11)})", navaids)
+                db.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('imported_at', ?)", (str(time.time()),))
+        finally:
+            db.close()
+        return {"airports": len(airports), "runways": len(runways), "navaids": len(navaids)}
+
+    def _airport_row(self, code: str):
+        code = code.upper()
+        if len(code) == 3:
+            row = self._db.execute("SELECT * FROM airports WHERE iata = ? ORDER BY type = 'large_airport' DESC LIMIT 1", (code,)).fetchone()
+        else:
+            row = self._db.execute("SELECT * FROM airports WHERE icao = ? LIMIT 1", (code,)).fetchone()
+        return row or self._db.execute("SELECT * FROM airports WHERE ident = ?", (code,)).fetchone()
+
+    @staticmethod
+    def _airport_dict(row):
+        airport = {
+            "name": row["name"], "icao": row["icao"] or row["ident"], "ident": row["ident"],
+            "latitude": row["lat"], "longitude": row["lon"], "country_code": row["country_code"],
+            "type": row["type"], "elevation_ft": row["elevation_ft"],
+        }
+        if row["iata"]:
+            airport["iata"] = row["iata"]
+        if row["municipality"]:
+            airport["location"] = row["municipality"]
+        if row["country"]:
+            airport["country"] = row["country"]
+        if row["home_link"] or row["wikipedia_link"]:
+            airport["link"] = row["home_link"] or row["wikipedia_link"]
+        return airport
+
+    def airport(self, code: str):
+        """Look up an airport by ICAO (4 characters) or IATA (3 characters) code, or None."""
+        row = self._airport_row(code)
+        return self._airport_dict(row) if row else None
+
+    def search(self, prefix: str, limit: int = 25):
+        """Airports whose name starts with `prefix`, larger airports first."""
+        prefix = prefix.lower().replace("%", "").replace("_", "")
+        rows = self._db.execute(
+            "SELECT * FROM airports WHERE name_lower >= ? AND name_lower < ? "
+            "ORDER BY CASE type WHEN 'large_airport' THEN 0 WHEN 'medium_airport' THEN 1 WHEN 'small_airport' THEN 2 ELSE 3 END, name LIMIT ?",
+            (prefix, prefix + "\uffff", limit)
+        ).fetchall()
+        return [self._airport_dict(row) for row in rows]
+
+    def geo_points(self):
+        """
+        `(lat, lon, kind, payload)` for every airport and navaid, for building an in-memory `GeoIndex`.
+
+        Airport kinds are the OurAirports type (e.g. `large_airport`); navaids use `navaid`.
+        Blocking, so run it in an executor; like the import, it reads through its own connection
+        since the shared one can only be used from the thread that opened it.
+        """
+        db = sqlite3.connect(self.path)
+        db.row_factory = sqlite3.Row
+        try:
+            points = [
+                (row["lat"], row["lon"], row["type"], self._airport_dict(row))
+                for row in db.execute("SELECT * FROM airports WHERE lat IS NOT NULL AND lon IS NOT NULL")
+            ]
+            points.extend(
+                (row["lat"], row["lon"], "navaid", {"ident": row["ident"], "name": row["name"], "type": row["type"], "frequency_khz": row["frequency_khz"], "latitude": row["lat"], "longitude": row["lon"]})
+                for row in db.execute("SELECT ident, name, type, frequency_khz, lat, lon FROM navaids WHERE lat IS NOT NULL AND lon IS NOT NULL")
+            )
+        finally:
+            db.close()
+        return points
+
+    def airport_details(self, code: str):
+        """
+        Airport with its runways and navaids attached, shaped like an airportdb.io response, or None.
+        """
+        row = self._airport_row(code)
+        if row is None:
+            return None
+        airport = self._airport_dict(row)
+        airport["runways"] = [
+            {
+                "id": "/".join(ident for ident in (runway["le_ident"], runway["he_ident"]) if ident),
+                "surface": runway["surface"], "length_ft": runway["length_ft"], "width_ft": runway["width_ft"],
+                "le_ident": runway["le_ident"], "he_ident": runway["he_ident"],
+                "lighted": runway["lighted"] or 0, "closed": runway["closed"] or 0,
+            }
+            for runway in self._db.execute("SELECT * FROM runways WHERE airport_ident = ?", (row["ident"],))
+        ]
+        airport["navaids"] = [
+            {
+                "ident": navaid["ident"], "name": navaid["name"], "type": navaid["type"],
+                "frequency_khz": navaid["frequency_khz"], "latitude_deg": navaid["lat"], "longitude_deg": navaid["lon"],
+                "elevation_ft": navaid["elevation_ft"], "usageType": navaid["usage_type"], "power": navaid["power"],
+                "associated_airport": navaid["associated_airport"],
+            }
+            for navaid in self._db.execute("SELECT * FROM navaids WHERE associated_airport = ?", (row["ident"],))
+        ]
+        return airport
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distances in km from one point to arrays of points, all in degrees."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * 6371.0088 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def compass_point(lat1, lon1, lat2, lon2):
+    """Eight-wind compass direction of the second point as seen from the first."""
+    lat1, lat2, d_lon = math.radians(lat1), math.radians(lat2), math.radians(lon2 - lon1)
+    x = math.sin(d_lon) * math.cos(lat2)
+    y = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(d_lon)
+    bearing = (math.degrees(math.atan2(x, y)) + 360) % 360
+    return ("N", "NE", "E", "SE", "S", "SW", "W", "NW")[int((bearing + 22.5) // 45) % 8]
+
+
+class GeoIndex:
+    """
+    In-memory grid index of points bucketed by one degree cells, queried with vectorized haversine.
+
+    Each point carries a payload dict and a `kind`, so queries can be limited to e.g. airports that
+    aren't heliports.
+    """
+
+    def __init__(self, points):
+        points = [point for point in points if point[0] is not None and point[1] is not None]
+        self.lats = np.array([point[0] for point in points], dtype=np.float64)
+        self.lons = np.array([point[1] for point in points], dtype=np.float64)
+        self.kinds = np.array([point[2] or "" for point in points], dtype=object)
+        self.payloads = [point[3] for point in points]
+        cells = {}
+        for index, (lat, lon) in enumerate(zip(self.lats, self.lons)):
+            cells.setdefault((math.floor(lat), math.floor(lon)), []).append(index)
+        self._cells = {cell: np.array(indices, dtype=np.int64) for cell, indices in cells.items()}
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def _candidates(self, lat, lon, radius_km):
+        d_lat = radius_km / 111.0
+        cos_lat = math.cos(math.radians(min(abs(lat) + d_lat, 89.9)))
+        d_lon = min(radius_km / (111.320 * cos_lat), 180)
+        lat_cells = range(math.floor(max(lat - d_lat, -90)), math.floor(min(lat + d_lat, 89.999)) + 1)
+        if d_lon >= 180:
+            lon_cells = range(-180, 180)
+        else:
+            lon_cells = {((cell + 180) % 360) - 180 for cell in range(math.floor(lon - d_lon), math.floor(lon + d_lon) + 1)}
+        found = [self._cells[(lat_cell, lon_cell)] for lat_cell in lat_cells for lon_cell in lon_cells if (lat_cell, lon_cell) in self._cells]
+        return np.concatenate(found) if found else np.array([], dtype=np.int64)
+
+    def within(self, lat, lon, radius_km, kinds=None):
+        """`(distance_km, payload)` for every point within `radius_km`, nearest first."""
+        candidates = self._candidates(lat, lon, radius_km)
+        if kinds is not None and len(candidates):
+            candidates = candidates[np.isin(self.kinds[candidates], list(kinds))]
+        if not len(candidates):
+            return []
+        distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances)
+        return [(float(distances[i]), self.payloads[candidates[i]]) for i in order]
+
+    def nearest(self, lat, lon, count=1, kinds=None, max_km=2000):
+        """Up to `count` nearest points within `max_km`, growing the search radius until enough are found."""
+        radius = 50
+        while True:
+            found = self.within(lat, lon, min(radius, max_km), kinds)
+            if len(found) >= count or radius >= max_km:
+                return found[:count]
+            radius *= 4
+
+
+class TagIndex:
+    """
+    Hex to tag lookup, with each aircraft's tags packed into one bitmask.
+
+    The data file maps tag names to lists of entries, where an entry is a full six character hex,
+    a shorter hex prefix (`"AE"` covers `AE0000` to `AEFFFF`) or an inclusive `"START-END"` range
+    for address blocks like a country's military allocation.
+    """
+
+    def __init__(self, tags=None):
+        tags = tags or {}
+        self.names = tuple(tags)
+        self.exact = {}
+        self.counts = {}
+        self.blocks = {}
+        bounds = []
+        for bit, (name, entries) in enumerate(tags.items()):
+            mask = 1 << bit
+            self.counts[name] = 0
+            self.blocks[name] = 0
+            for entry in entries:
+                entry = str(entry).strip().upper()
+                if "-" in entry:
+                    start, end = entry.split("-", 1)
+                    start, end = int(start.strip().ljust(6, "0"), 16), int(end.strip().ljust(6, "F"), 16)
+                elif len(entry) < 6:
+                    start, end = int(entry.ljust(6, "0"), 16), int(entry.ljust(6, "F"), 16)
+                else:
+                    hex_id = int(entry, 16)
+                    if not self.exact.get(hex_id, 0) & mask:
+                        self.counts[name] += 1
+                    self.exact[hex_id] = self.exact.get(hex_id, 0) | mask
+                    continue
+                bounds.append((start, end, mask))
+                self.blocks[name] += 1
+        # Flatten overlapping blocks into disjoint intervals so one bisect finds every block tag
+        edges = sorted({start for start, _, _ in bounds} | {end + 1 for _, end, _ in bounds})
+        self._starts, self._masks = [], []
+        for start, next_start in zip(edges, edges[1:]):
+            mask = 0
+            for block_start, block_end, block_mask in bounds:
+                if block_start <= start and next_start - 1 <= block_end:
+                    mask |= block_mask
+            self._starts.append(start)
+            self._masks.append(mask)
+        if edges:
+            self._starts.append(edges[-1])
+            self._masks.append(0)
+
+    @classmethod
+    def load(cls, path):
+        """Build an index from a JSON data file, raising ValueError if it's malformed."""
+        with open(path, encoding="utf-8") as file:
+            tags = json.load(file)
+        if not isinstance(tags, dict) or not all(isinstance(entries, list) for entries in tags.values()):
+            raise ValueError("The tag file must map tag names to lists of hex codes")
+        return cls(tags)
+
+    def mask(self, hex_id: str) -> int:
+        """Bitmask of every tag applying to a hex, 0 if it isn't tagged."""
+        try:
+            value = int(hex_id, 16)
+        except (TypeError, ValueError):
+            return 0
+        mask = self.exact.get(value, 0)
+        position = bisect.bisect_right(self._starts, value) - 1
+        if position >= 0:
+            mask |= self._masks[position]
+        return mask
+
+    def tags(self, hex_id: str):
+        """Names of every tag applying to a hex."""
+        mask = self.mask(hex_id)
+        return {name for bit, name in enumerate(self.names) if mask >> bit & 1}
+
+
+EXPORT_FORMATS = ("csv", "txt", "html", "jsonl", "parquet", "pdf")
+EXPORT_SPOOL_BYTES = 4 * 1024 * 1024  # Exports smaller than this never touch the disk
+EXPORT_COMPRESS_BYTES = 8 * 1024 * 1024  # Zip anything bigger, so /mil sized exports fit Discord's upload limit
+EXPORT_PDF_COLUMNS = ("hex", "flight", "r", "t", "desc", "squawk", "alt_baro", "gs", "track", "lat", "lon", "seen")
+EXPORT_PDF_ROWS_PER_PAGE = 30
+
+
+def _export_header(aircraft):
+    """Union of every aircraft's keys, in the order they're first seen."""
+    header = {}
+    for entry in aircraft:
+        header.update(dict.fromkeys(entry))
+    return list(header)
+
+
+def _export_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def _export_parquet(aircraft, header, file):
+    # Heavy and optional (not in info.json), so only imported when someone actually asks for Parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = []
+    for key in header:
+        values = [entry.get(key) for entry in aircraft if entry.get(key) is not None]
+        if values and all(isinstance(value, bool) for value in values):
+            kind = pa.bool_()
+        elif values and all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+            kind = pa.int64()
+        elif values and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            kind = pa.float64()
+        else:
+            kind = pa.string()
+        fields.append(pa.field(key, kind))
+    schema = pa.schema(fields)
+    with pq.ParquetWriter(file, schema, compression="zstd") as writer:
+        for start in range(0, len(aircraft), 10000):
+            chunk = aircraft[start:start + 10000]
+            columns = []
+            for field in schema:
+                values = [entry.get(field.name) for entry in chunk]
+                if field.type == pa.string():
+                    values = [None if value is None else _export_cell(value) for value in values]
+                columns.append(pa.array(values, type=field.type))
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+def _export_pdf(aircraft, header, title, file):
+    columns = [key for key in EXPORT_PDF_COLUMNS if key in header] or header[:10]
+    doc = SimpleDocTemplate(file, pagesize=landscape(A4), title=title)
+    styles = getSampleStyleSheet()
+    style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.whitesmoke]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ])
+    flowables = [Paragraph(f"<u>{html.escape(title)}</u>", styles['Title'])]
+    pages = range(0, len(aircraft), EXPORT_PDF_ROWS_PER_PAGE)
+    for page_index, start in enumerate(pages):
+        rows = [[key.upper() for key in columns]]
+        rows.extend([_export_cell(entry.get(key))[:40] for key in columns] for entry in aircraft[start:start + EXPORT_PDF_ROWS_PER_PAGE])
+        flowables.append(Table(rows, style=style))
+        flowables.append(Paragraph(f"Page {page_index + 1} of {len(pages)}", styles['Normal']))
+        if page_index + 1 < len(pages):
+            flowables.append(PageBreak())
+    doc.build(flowables)
+
+
+def write_aircraft_export(aircraft, file_format: str, file_name: str, title: str):
+    """
+    Write aircraft to a spooled temp file in the given format, returning `(file, file_name)`.
+
+    Blocking, so run it in an executor. Rows use the union of every aircraft's keys, and text
+    exports bigger than `EXPORT_COMPRESS_BYTES` come back zipped. The caller closes the file.
+    """
+    header = _export_header(aircraft)
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    if file_format == "parquet":
+        _export_parquet(aircraft, header, spool)
+    elif file_format == "pdf":
+        _export_pdf(aircraft, header, title, spool)
+    else:
+        text = codecs.getwriter("utf-8")(spool)
+        if file_format == "csv":
+            writer = csv.writer(text)
+            writer.writerow([key.upper() for key in header])
+            writer.writerows([_export_cell(entry.get(key)) for key in header] for entry in aircraft)
+        elif file_format == "txt":
+            text.write(' '.join(key.upper() for key in header) + '\n')
+            for entry in aircraft:
+                text.write(' '.join(_export_cell(entry.get(key)) or '-' for key in header) + '\n')
+        elif file_format == "html":
+            text.write('<table>\n<tr>\n')
+            text.writelines(f'<th>{html.escape(key.upper())}</th>\n' for key in header)
+            text.write('</tr>\n')
+            for entry in aircraft:
+                text.write('<tr>' + ''.join(f'<td>{html.escape(_export_cell(entry.get(key)))}</td>' for key in header) + '</tr>\n')
+            text.write('</table>\n')
+        elif file_format == "jsonl":
+            text.writelines(json.dumps(entry, separators=(",", ":")) + '\n' for entry in aircraft)
+
+    if file_format != "parquet" and spool.tell() > EXPORT_COMPRESS_BYTES:
+        spool.seek(0)
+        compressed = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+        with zipfile.ZipFile(compressed, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            with archive.open(file_name, "w") as member:
+                while chunk := spool.read(1024 * 1024):
+                    member.write(chunk)
+        spool.close()
+        spool, file_name = compressed, f"{file_name}.zip"
+    spool.seek(0)
+    return spool, file_name
+
 
 class Skysearch(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=492089091320446976)  
-        self.config.register_global(airplanesliveapi=None)  # Change the API key name here
+        self.config.register_global(airplanesliveapi=None, active_emergencies={}, emergency_realert_minutes=60)  # Change the API key name here
+        self.config.register_guild(alert_channel=None, alert_role=None, last_emergency_squawk_time=None, auto_icao=False, watchlist=[], watch_channel=None, geofence=None)
         self.api_url = "https://api.airplanes.live/v2"
         self.max_requests_per_user = 10
         self.EMBED_COLOR = discord.Color(0xfffffe)
+        self.alert_limiter = RateLimiter(10, 1.0)
+        self.emergency_tracker = EmergencyTracker()
+        self.photo_cache = PhotoCache(cog_data_path(self) / "photos.json")
+        self.airports = AirportDatabase(cog_data_path(self) / "airports.sqlite3")
+        self.airport_index = GeoIndex([])
+        self._photo_cache_saver = None
+        self.watch_tracker = WatchTracker()
+        self.track_history = TrackHistory()
+        self.auto_icao_guilds = set()
+        self._auto_icao_recent = OrderedDict()
         self.check_emergency_squawks.start()
-        self.law_enforcement_icao_set = law_enforcement_icao_set
-        self.military_icao_set = military_icao_set
-        self.medical_icao_set = medical_icao_set
-        self.suspicious_icao_set = suspicious_icao_set
-        self.newsagency_icao_set = newsagency_icao_set
-        self.balloons_icao_set = balloons_icao_set
-        self.global_prior_known_accident_set = global_prior_known_accident_set
-        self.ukr_conflict_set = ukr_conflict_set
-        self.agri_utility_set = agri_utility_set
-        
-    async def cog_unload(self):
-        if hasattr(self, '_http_client'):
-            await self._http_client.close()
+        self.poll_watchlists.start()
+        self.tags = self._load_tags()
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=10, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=30, connect=10)
+        )
+        # Per-upstream request budgets, so bursts of commands or alerts can't exhaust our API keys
+        self.limiters = {
+            "api.airplanes.live": RateLimiter(1, 1.0),
+            "api.planespotters.net": RateLimiter(2, 1.0),
+            "airport-data.com": RateLimiter(2, 1.0),
+            "airportdb.io": RateLimiter(1, 1.0),
+            "api.weather.gov": RateLimiter(5, 1.0),
+            "maps.googleapis.com": RateLimiter(10, 1.0),
+        }
+
+    def _load_tags(self):
+        """Load the tag index, preferring an uploaded override over the bundled data file."""
+        override = cog_data_path(self) / "icao_tags.json"
+        if override.exists():
+            try:
+                return TagIndex.load(override)
+            except (OSError, ValueError) as e:
+                print(f"Error loading {override}, using the bundled tags: {e}")
+        return TagIndex.load(bundled_data_path(self) / "icao_tags.json")
+
+    async def cog_load(self):
+        self.auto_icao_guilds = {guild_id for guild_id, settings in (await self.config.all_guilds()).items() if settings.get('auto_icao')}
+        await self._rebuild_airport_index()
+
+    async def _rebuild_airport_index(self):
+        """Load airports and navaids from the local database into the in-memory spatial index."""
+        points = await self.bot.loop.run_in_executor(None, self.airports.geo_points)
+        self.airport_index = await self.bot.loop.run_in_executor(None, GeoIndex, points)
+
+    def _nearest_airport(self, lat, lon):
+        """`(distance_km, airport)` for the closest public airport to a position, or None."""
+        nearest = self.airport_index.nearest(lat, lon, kinds=("large_airport", "medium_airport", "small_airport"), max_km=500)
+        return nearest[0] if nearest else None
+
+    async def _throttle(self, url):
+        """Wait for a request slot on the upstream that serves `url`."""
+        limiter = self.limiters.get(urllib.parse.urlsplit(str(url)).hostname)
+        if limiter is not None:
+            await limiter.acquire()
 
     async def _get_headers(self):
         """Return headers with API key for requests, if available."""
@@ -53,199 +1156,20 @@ class Skysearch(commands.Cog):
         return headers
 
     async def _make_request(self, url):
-        if not hasattr(self, '_http_client'):
-            self._http_client = aiohttp.ClientSession()
         try:
             headers = await self._get_headers()  # Get headers with API key if available
-            async with self._http_client.get(url, headers=headers) as response:
+            await self._throttle(url)
+            async with self.session.get(url, headers=headers) as response:
                 response.raise_for_status()
                 return await response.json()
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Error making request: {e}")
             return None
 
     async def _send_aircraft_info(self, ctx, response):
         if 'ac' in response and response['ac']:
             await ctx.typing()
-            aircraft_data = response['ac'][0]
-            emergency_squawk_codes = ['7500', '7600', '7700']
-            hex_id = aircraft_data.get('hex', '')                                      
-            image_url, photographer = await self._get_photo_by_hex(hex_id)
-            registration = aircraft_data.get('reg', '')  # Get the registration for image fetching
-            link = f"https://globe.airplanes.live/?icao={hex_id}"
-            squawk_code = aircraft_data.get('squawk', 'N/A')
-            description = f"{aircraft_data.get('desc', 'N/A')}"
-            if aircraft_data.get('year', None) is not None:
-                description += f" ({aircraft_data.get('year')})"
-            if squawk_code == '7500':
-                embed = discord.Embed(title=description, color=0xff4545)
-                emergency_status = "Aircraft reports it's been hijacked"
-            elif squawk_code == '7600':
-                embed = discord.Embed(title=description, color=0xff4545)
-                emergency_status = "Aircraft has lost radio contact"
-            elif squawk_code == '7700':
-                embed = discord.Embed(title=description, color=0xff4545)
-                emergency_status = "Aircraft has declared a general emergency"
-            else:
-                embed = discord.Embed(title=description, color=0xfffffe)
-                emergency_status = "Aircraft reports normal conditions"
-            callsign = aircraft_data.get('flight', 'N/A').strip()
-            if not callsign or callsign == 'N/A':
-                callsign = 'BLOCKED'
-            embed.add_field(name="Callsign", value=f"{callsign}", inline=True)
-            registration = aircraft_data.get('reg', None)
-            if registration is not None:
-                registration = registration.upper()
-                embed.add_field(name="Registration", value=f"{registration}", inline=True)
-            icao = aircraft_data.get('hex', 'N/A').upper()
-            embed.add_field(name="ICAO", value=f"{icao}", inline=True)
-            altitude = aircraft_data.get('alt_baro', 'N/A')
-            if altitude == 'ground':
-                embed.add_field(name="Status", value="On ground", inline=True)
-            elif altitude != 'N/A':
-                if isinstance(altitude, int):
-                    altitude = "{:,}".format(altitude)
-                altitude_feet = f"{altitude} ft"
-                embed.add_field(name="Altitude", value=f"{altitude_feet}", inline=True)
-            heading = aircraft_data.get('true_heading', None)
-            if heading is not None:
-                if 0 <= heading < 45:
-                    emoji = ":arrow_upper_right:"
-                elif 45 <= heading < 90:
-                    emoji = ":arrow_right:"
-                elif 90 <= heading < 135:
-                    emoji = ":arrow_lower_right:"
-                elif 135 <= heading < 180:
-                    emoji = ":arrow_down:"
-                elif 180 <= heading < 225:
-                    emoji = ":arrow_lower_left:"
-                elif 225 <= heading < 270:
-                    emoji = ":arrow_left:"
-                elif 270 <= heading < 315:
-                    emoji = ":arrow_upper_left:"
-                else:
-                    emoji = ":arrow_up:"
-                embed.add_field(name="Heading", value=f"{emoji} {heading}°", inline=True)
-            lat = aircraft_data.get('lat', 'N/A')
-            lon = aircraft_data.get('lon', 'N/A')
-            if lat != 'N/A':
-                lat = round(float(lat), 2)
-                lat_dir = "N" if lat >= 0 else "S"
-                lat = f"{abs(lat)}{lat_dir}"
-            if lon != 'N/A':
-                lon = round(float(lon), 2)
-                lon_dir = "E" if lon >= 0 else "W"
-                lon = f"{abs(lon)}{lon_dir}"
-            if lat != 'N/A' and lon != 'N/A':
-                embed.add_field(name="Position", value=f"- {lat}\n- {lon}", inline=True)
-            embed.add_field(name="Squawk", value=f"{aircraft_data.get('squawk', 'BLOCKED')}", inline=True)
-            
-            aircraft_model = aircraft_data.get('t', None)
-            if aircraft_model is not None:
-                embed.add_field(name="Model", value=f"{aircraft_model}", inline=True)
-            ground_speed_knots = aircraft_data.get('gs', 'N/A')
-            if ground_speed_knots != 'N/A':
-                ground_speed_mph = round(float(ground_speed_knots) * 1.15078)
-                embed.add_field(name="Speed", value=f"{ground_speed_mph} mph", inline=True)
-            category_code_to_label = {
-                "A0": "No info available",
-                "A1": "Light aircraft",
-                "A2": "Small aircraft",
-                "A3": "Large aircraft",
-                "A4": "High vortex large aircraft",
-                "A5": "Heavy aircraft",
-                "A6": "High performance aircraft",
-                "A7": "Rotorcraft",
-                "B0": "No info available",
-                "B1": "Glider / sailplane",
-                "B2": "Lighter-than-air",
-                "B3": "Parachutist / skydiver",
-                "B4": "Ultralight / hang-glider / paraglider",
-                "B5": "Reserved",
-                "B6": "UAV",
-                "B7": "Space / trans-atmospheric vehicle",
-                "C0": "No info available",
-                "C1": "Emergency vehicle",
-                "C2": "Service vehicle",
-                "C3": "Point obstacle",
-                "C4": "Cluster obstacle",
-                "C5": "Line obstacle",
-                "C6": "Reserved",
-                "C7": "Reserved"
-            }
-            category = aircraft_data.get('category', None)
-            if category is not None:
-                category_label = category_code_to_label.get(category, "Unknown category")
-                embed.add_field(name="Category", value=f"{category_label}", inline=True)
-
-            operator = aircraft_data.get('ownOp', None)
-            if operator is not None:
-                operator_encoded = quote_plus(operator)
-                embed.add_field(name="Operated by", value=f"[{operator}](https://www.google.com/search?q={operator_encoded})", inline=True)
-            
-            last_seen = aircraft_data.get('seen', 'N/A')
-            if last_seen != 'N/A':
-                last_seen_text = "Just now" if float(last_seen) < 1 else f"{int(float(last_seen))} seconds ago"
-                embed.add_field(name="Last signal", value=last_seen_text, inline=True)
-            
-            last_seen_pos = aircraft_data.get('seen_pos', 'N/A')
-            if last_seen_pos != 'N/A':
-                last_seen_pos_text = "Just now" if float(last_seen_pos) < 1 else f"{int(float(last_seen_pos))} seconds ago"
-                embed.add_field(name="Last position", value=last_seen_pos_text, inline=True)
-            
-            baro_rate = aircraft_data.get('baro_rate', 'N/A')
-            if baro_rate == 'N/A':
-                embed.add_field(name="Altitude trend", value="Altitude trends unavailable, **not enough data**", inline=True)
-            else:
-                baro_rate_fps = round(int(baro_rate) / 60, 2)  # Convert feet per minute to feet per second
-                if abs(baro_rate_fps) < 50/60:
-                    embed.add_field(name="Altitude data", value="Maintaining consistent altitude", inline=True)
-                elif baro_rate_fps > 0:
-                    embed.add_field(name="Altitude data", value=" **Climbing** " + f"{baro_rate_fps} feet/sec", inline=True)
-                else:
-                    embed.add_field(name="Altitude data", value=" **Descending** " + f"{abs(baro_rate_fps)} feet/sec", inline=True)
-
-            embed.add_field(name="Flight status", value=emergency_status, inline=True)
-
-
-            icao = aircraft_data.get('hex', None).upper()
-            if icao and icao.upper() in self.law_enforcement_icao_set:
-                embed.add_field(name="Asset intelligence", value=":police_officer: Known for use by **state law enforcement**", inline=False)
-            if icao and icao.upper() in self.military_icao_set:
-                embed.add_field(name="Asset intelligence", value=":military_helmet: Known for use in **military** and **government**", inline=False)
-            if icao and icao.upper() in self.medical_icao_set:
-                embed.add_field(name="Asset intelligence", value=":hospital: Known for use in **medical response** and **transport**", inline=False)
-            if icao and icao.upper() in self.suspicious_icao_set:
-                embed.add_field(name="Asset intelligence", value=":warning: Exhibits suspicious flight or **surveillance** activity", inline=False)
-            if icao and icao.upper() in self.global_prior_known_accident_set:
-                embed.add_field(name="Asset intelligence", value=":boom: Prior involved in one or more **documented accidents**", inline=False)
-            if icao and icao.upper() in self.ukr_conflict_set:
-                embed.add_field(name="Asset intelligence", value=":flag_ua: Utilized within the **[Russo-Ukrainian conflict](https://en.wikipedia.org/wiki/Russian-occupied_territories_of_Ukraine)**", inline=False)
-            if icao and icao.upper() in self.newsagency_icao_set:
-                embed.add_field(name="Asset intelligence", value=":newspaper: Used by **news** or **media** organization", inline=False)
-            if icao and icao.upper() in self.balloons_icao_set:
-                embed.add_field(name="Asset intelligence", value=":balloon: Aircraft is a **balloon**", inline=False)
-            if icao and icao.upper() in self.agri_utility_set:
-                embed.add_field(name="Asset intelligence", value=":corn: Used for **agriculture surveys, easement validation, or land inspection**", inline=False)
-
-            image_url, photographer = await self._get_photo_by_hex(icao)
-            if image_url and photographer:
-                embed.set_thumbnail(url=image_url)
-                embed.set_footer(text=f"Photo by {photographer}")
-
-            view = discord.ui.View()
-            view.add_item(discord.ui.Button(label="View on airplanes.live", emoji="🗺️", url=f"{link}", style=discord.ButtonStyle.link))
-            ground_speed_mph = ground_speed_mph if 'ground_speed_mph' in locals() else 'unknown'
-            squawk_code = aircraft_data.get('squawk', 'N/A')
-            if squawk_code in emergency_squawk_codes:
-                tweet_text = f"Spotted an aircraft declaring an emergency! #Squawk #{squawk_code}, flight {aircraft_data.get('flight', '')} at position {lat}, {lon} with speed {ground_speed_mph} mph. #SkySearch #Emergency\n\nJoin via Discord to search and discuss planes with your friends for free - https://discord.gg/X8huyaeXrA"
-            else:
-                tweet_text = f"Tracking flight {aircraft_data.get('flight', '')} at position {lat}, {lon} with speed {ground_speed_mph} mph using #SkySearch\n\nJoin via Discord to search and discuss planes with your friends for free - https://discord.gg/X8huyaeXrA"
-            tweet_url = f"https://twitter.com/intent/tweet?text={urllib.parse.quote_plus(tweet_text)}"
-            view.add_item(discord.ui.Button(label=f"Post on 𝕏", emoji="📣", url=tweet_url, style=discord.ButtonStyle.link))
-            whatsapp_text = f"Check out this aircraft! Flight {aircraft_data.get('flight', '')} at position {lat}, {lon} with speed {ground_speed_mph} mph. Track live @ https://globe.airplanes.live/?icao={icao} #SkySearch"
-            whatsapp_url = f"https://api.whatsapp.com/send?text={urllib.parse.quote_plus(whatsapp_text)}"
-            view.add_item(discord.ui.Button(label="Send on WhatsApp", emoji="📱", url=whatsapp_url, style=discord.ButtonStyle.link))
+            embed, view = await self._build_aircraft_embed(response['ac'][0])
             await ctx.send(embed=embed, view=view)
 
         else:
@@ -262,38 +1186,217 @@ class Skysearch(commands.Cog):
             except discord.errors.Forbidden:
                 pass
 
-    async def _get_photo_by_hex(self, hex_id, registration=None):
-        if not hasattr(self, '_http_client'):
-            self._http_client = aiohttp.ClientSession()
+    async def _build_aircraft_embed(self, aircraft_data):
+        """Build the aircraft info embed and its link buttons for one aircraft from the API."""
+        hex_id = aircraft_data.get('hex', '')
+        link = f"https://globe.airplanes.live/?icao={hex_id}"
+        squawk_code = aircraft_data.get('squawk', 'N/A')
+        description = f"{aircraft_data.get('desc', 'N/A')}"
+        if aircraft_data.get('year', None) is not None:
+            description += f" ({aircraft_data.get('year')})"
+        if squawk_code == '7500':
+            embed = discord.Embed(title=description, color=0xff4545)
+            emergency_status = "Aircraft reports it's been hijacked"
+        elif squawk_code == '7600':
+            embed = discord.Embed(title=description, color=0xff4545)
+            emergency_status = "Aircraft has lost radio contact"
+        elif squawk_code == '7700':
+            embed = discord.Embed(title=description, color=0xff4545)
+            emergency_status = "Aircraft has declared a general emergency"
+        else:
+            embed = discord.Embed(title=description, color=0xfffffe)
+            emergency_status = "Aircraft reports normal conditions"
+        callsign = aircraft_data.get('flight', 'N/A').strip()
+        if not callsign or callsign == 'N/A':
+            callsign = 'BLOCKED'
+        embed.add_field(name="Callsign", value=f"{callsign}", inline=True)
+        registration = aircraft_data.get('reg', None)
+        if registration is not None:
+            registration = registration.upper()
+            embed.add_field(name="Registration", value=f"{registration}", inline=True)
+        icao = aircraft_data.get('hex', 'N/A').upper()
+        embed.add_field(name="ICAO", value=f"{icao}", inline=True)
+        altitude = aircraft_data.get('alt_baro', 'N/A')
+        if altitude == 'ground':
+            embed.add_field(name="Status", value="On ground", inline=True)
+        elif altitude != 'N/A':
+            if isinstance(altitude, int):
+                altitude = "{:,}".format(altitude)
+            altitude_feet = f"{altitude} ft"
+            embed.add_field(name="Altitude", value=f"{altitude_feet}", inline=True)
+        heading = aircraft_data.get('true_heading', None)
+        if heading is not None:
+            if 0 <= heading < 45:
+                emoji = ":arrow_upper_right:"
+            elif 45 <= heading < 90:
+                emoji = ":arrow_right:"
+            elif 90 <= heading < 135:
+                emoji = ":arrow_lower_right:"
+            elif 135 <= heading < 180:
+                emoji = ":arrow_down:"
+            elif 180 <= heading < 225:
+                emoji = ":arrow_lower_left:"
+            elif 225 <= heading < 270:
+                emoji = ":arrow_left:"
+            elif 270 <= heading < 315:
+                emoji = ":arrow_upper_left:"
+            else:
+                emoji = ":arrow_up:"
+            embed.add_field(name="Heading", value=f"{emoji} {heading}°", inline=True)
+        lat = aircraft_data.get('lat', 'N/A')
+        lon = aircraft_data.get('lon', 'N/A')
+        if lat != 'N/A':
+            lat = round(float(lat), 2)
+            lat_dir = "N" if lat >= 0 else "S"
+            lat = f"{abs(lat)}{lat_dir}"
+        if lon != 'N/A':
+            lon = round(float(lon), 2)
+            lon_dir = "E" if lon >= 0 else "W"
+            lon = f"{abs(lon)}{lon_dir}"
+        if lat != 'N/A' and lon != 'N/A':
+            embed.add_field(name="Position", value=f"- {lat}\n- {lon}", inline=True)
+            nearest = self._nearest_airport(float(aircraft_data['lat']), float(aircraft_data['lon']))
+            if nearest is not None:
+                distance, airport = nearest
+                direction = compass_point(airport['latitude'], airport['longitude'], float(aircraft_data['lat']), float(aircraft_data['lon']))
+                code = airport.get('iata') or airport['icao'] or airport['ident']
+                embed.add_field(name="Nearest airport", value=f"{airport['name']} (**`{code}`**)\n{distance:,.0f} km {direction}", inline=True)
+        embed.add_field(name="Squawk", value=f"{aircraft_data.get('squawk', 'BLOCKED')}", inline=True)
         
-        # Fetch photo by hex ICAO
-        try:
-            async with self._http_client.get(f'https://api.planespotters.net/pub/photos/reg/{hex_id}') as response:
-                if response.status == 200:
+        aircraft_model = aircraft_data.get('t', None)
+        if aircraft_model is not None:
+            embed.add_field(name="Model", value=f"{aircraft_model}", inline=True)
+        ground_speed_knots = aircraft_data.get('gs', 'N/A')
+        if ground_speed_knots != 'N/A':
+            ground_speed_mph = round(float(ground_speed_knots) * 1.15078)
+            embed.add_field(name="Speed", value=f"{ground_speed_mph} mph", inline=True)
+        category_code_to_label = {
+            "A0": "No info available",
+            "A1": "Light aircraft",
+            "A2": "Small aircraft",
+            "A3": "Large aircraft",
+            "A4": "High vortex large aircraft",
+            "A5": "Heavy aircraft",
+            "A6": "High performance aircraft",
+            "A7": "Rotorcraft",
+            "B0": "No info available",
+            "B1": "Glider / sailplane",
+            "B2": "Lighter-than-air",
+            "B3": "Parachutist / skydiver",
+            "B4": "Ultralight / hang-glider / paraglider",
+            "B5": "Reserved",
+            "B6": "UAV",
+            "B7": "Space / trans-atmospheric vehicle",
+            "C0": "No info available",
+            "C1": "Emergency vehicle",
+            "C2": "Service vehicle",
+            "C3": "Point obstacle",
+            "C4": "Cluster obstacle",
+            "C5": "Line obstacle",
+            "C6": "Reserved",
+            "C7": "Reserved"
+        }
+        category = aircraft_data.get('category', None)
+        if category is not None:
+            category_label = category_code_to_label.get(category, "Unknown category")
+            embed.add_field(name="Category", value=f"{category_label}", inline=True)
+
+        operator = aircraft_data.get('ownOp', None)
+        if operator is not None:
+            operator_encoded = quote_plus(operator)
+            embed.add_field(name="Operated by", value=f"[{operator}](https://www.google.com/search?q={operator_encoded})", inline=True)
+        
+        last_seen = aircraft_data.get('seen', 'N/A')
+        if last_seen != 'N/A':
+            last_seen_text = "Just now" if float(last_seen) < 1 else f"{int(float(last_seen))} seconds ago"
+            embed.add_field(name="Last signal", value=last_seen_text, inline=True)
+        
+        last_seen_pos = aircraft_data.get('seen_pos', 'N/A')
+        if last_seen_pos != 'N/A':
+            last_seen_pos_text = "Just now" if float(last_seen_pos) < 1 else f"{int(float(last_seen_pos))} seconds ago"
+            embed.add_field(name="Last position", value=last_seen_pos_text, inline=True)
+        
+        baro_rate = aircraft_data.get('baro_rate', 'N/A')
+        if baro_rate == 'N/A':
+            embed.add_field(name="Altitude trend", value="Altitude trends unavailable, **not enough data**", inline=True)
+        else:
+            baro_rate_fps = round(int(baro_rate) / 60, 2)  # Convert feet per minute to feet per second
+            if abs(baro_rate_fps) < 50/60:
+                embed.add_field(name="Altitude data", value="Maintaining consistent altitude", inline=True)
+            elif baro_rate_fps > 0:
+                embed.add_field(name="Altitude data", value=" **Climbing** " + f"{baro_rate_fps} feet/sec", inline=True)
+            else:
+                embed.add_field(name="Altitude data", value=" **Descending** " + f"{abs(baro_rate_fps)} feet/sec", inline=True)
+
+        embed.add_field(name="Flight status", value=emergency_status, inline=True)
+
+
+        icao = aircraft_data.get('hex', None).upper()
+        tags = self.tags.tags(icao)
+        for tag, intelligence in ASSET_INTELLIGENCE:
+            if tag in tags:
+                embed.add_field(name="Asset intelligence", value=intelligence, inline=False)
+
+        image_url, photographer = await self._get_photo_by_hex(icao, registration)
+        if image_url and photographer:
+            embed.set_thumbnail(url=image_url)
+            embed.set_footer(text=f"Photo by {photographer}")
+
+        view = discord.ui.View()
+        view.add_item(discord.ui.Button(label="View on airplanes.live", emoji="🗺️", url=f"{link}", style=discord.ButtonStyle.link))
+        ground_speed_mph = ground_speed_mph if 'ground_speed_mph' in locals() else 'unknown'
+        squawk_code = aircraft_data.get('squawk', 'N/A')
+        if squawk_code in EMERGENCY_SQUAWKS:
+            tweet_text = f"Spotted an aircraft declaring an emergency! #Squawk #{squawk_code}, flight {aircraft_data.get('flight', '')} at position {lat}, {lon} with speed {ground_speed_mph} mph. #SkySearch #Emergency\n\nJoin via Discord to search and discuss planes with your friends for free - https://discord.gg/X8huyaeXrA"
+        else:
+            tweet_text = f"Tracking flight {aircraft_data.get('flight', '')} at position {lat}, {lon} with speed {ground_speed_mph} mph using #SkySearch\n\nJoin via Discord to search and discuss planes with your friends for free - https://discord.gg/X8huyaeXrA"
+        tweet_url = f"https://twitter.com/intent/tweet?text={urllib.parse.quote_plus(tweet_text)}"
+        view.add_item(discord.ui.Button(label=f"Post on 𝕏", emoji="📣", url=tweet_url, style=discord.ButtonStyle.link))
+        whatsapp_text = f"Check out this aircraft! Flight {aircraft_data.get('flight', '')} at position {lat}, {lon} with speed {ground_speed_mph} mph. Track live @ https://globe.airplanes.live/?icao={icao} #SkySearch"
+        whatsapp_url = f"https://api.whatsapp.com/send?text={urllib.parse.quote_plus(whatsapp_text)}"
+        view.add_item(discord.ui.Button(label="Send on WhatsApp", emoji="📱", url=whatsapp_url, style=discord.ButtonStyle.link))
+        return embed, view
+
+    async def _get_photo_by_hex(self, hex_id, registration=None):
+        keys = [f"hex:{hex_id.upper()}"]
+        if registration:
+            keys.append(f"reg:{registration.upper()}")
+        photo = await self.photo_cache.get(keys, lambda: self._fetch_photo(hex_id, registration))
+        if self.photo_cache.dirty and (self._photo_cache_saver is None or self._photo_cache_saver.done()):
+            self._photo_cache_saver = self.bot.loop.create_task(self._save_photo_cache())
+        return photo
+
+    async def _save_photo_cache(self):
+        # Batch writes: new photos from the next minute of lookups land in the same save
+        await asyncio.sleep(60)
+        # Snapshot on the loop so lookups stored while the file is being written keep the cache dirty
+        entries = self.photo_cache.snapshot()
+        await self.bot.loop.run_in_executor(None, PhotoCache.write, self.photo_cache.path, entries)
+
+    async def _fetch_photo(self, hex_id, registration=None):
+        """
+        `(url, photographer)` from planespotters by hex ICAO, then by registration. `(None, None)` means
+        planespotters has no photo; None means a request failed, so the answer isn't known yet.
+        """
+        failed = False
+        paths = [f'hex/{hex_id}'] + ([f'reg/{registration}'] if registration else [])
+        for path in paths:
+            try:
+                await self._throttle('https://api.planespotters.net')
+                async with self.session.get(f'https://api.planespotters.net/pub/photos/{path}') as response:
+                    if response.status != 200:
+                        failed = True
+                        continue
                     json_out = await response.json()
-                    if 'photos' in json_out and json_out['photos']:
+                    if json_out.get('photos'):
                         photo = json_out['photos'][0]
                         url = photo.get('thumbnail_large', {}).get('src', '')
                         photographer = photo.get('photographer', '')
-                        return url, photographer  # Return photo for hex ICAO
-        except (KeyError, IndexError, aiohttp.ClientError):
-            pass
+                        return url, photographer
+            except (KeyError, IndexError, ValueError, aiohttp.ClientError, asyncio.TimeoutError):
+                failed = True
 
-        # Fetch photo by registration if provided
-        if registration:
-            try:
-                async with self._http_client.get(f'https://api.planespotters.net/pub/photos/reg/{registration}') as response:
-                    if response.status == 200:
-                        json_out = await response.json()
-                        if 'photos' in json_out and json_out['photos']:
-                            photo = json_out['photos'][0]
-                            url = photo.get('thumbnail_large', {}).get('src', '')
-                            photographer = photo.get('photographer', '')
-                            return url, photographer  # Return photo for registration
-            except (KeyError, IndexError, aiohttp.ClientError):
-                pass
-
-        return None, None  # Return None if no photo found for both
+        return None if failed else (None, None)
 
     @commands.guild_only()
     @commands.group(name='skysearch', help='Core menu for the cog', invoke_without_command=True)
@@ -310,9 +1413,8 @@ class Skysearch(commands.Cog):
         url = "https://api.airplanes.live/stats"
 
         try:
-            if not hasattr(self, '_http_client'):
-                self._http_client = aiohttp.ClientSession()
-            async with self._http_client.get(url) as response:
+            await self._throttle(url)
+            async with self.session.get(url) as response:
                 if response.status == 200:
                     data = await response.json()
                 else:
@@ -332,19 +1434,19 @@ class Skysearch(commands.Cog):
 
             embed.add_field(name="This data appears in the following commands", value="`callsign` `icao` `reg` `squawk` `type` `radius` `pia` `mil` `ladd` `export`", inline=False)
 
-            embed.add_field(name="Law enforcement aircraft", value="**{:,}** tagged".format(len(self.law_enforcement_icao_set)), inline=True)
-            embed.add_field(name="Military & government aircraft", value="**{:,}** tagged".format(len(self.military_icao_set)), inline=True)
-            embed.add_field(name="Medical aircraft", value="**{:,}** tagged".format(len(self.medical_icao_set)), inline=True)
-            embed.add_field(name="Media aircraft", value="**{:,}** known".format(len(self.newsagency_icao_set)), inline=True)
-            embed.add_field(name="Damaged aircraft", value="**{:,}** known".format(len(self.global_prior_known_accident_set)), inline=True)
-            embed.add_field(name="Wartime aircraft", value="**{:,}** observed".format(len(self.ukr_conflict_set)), inline=True)
-            embed.add_field(name="Utility aircraft", value="**{:,}** spotted".format(len(self.agri_utility_set)), inline=True)
-            embed.add_field(name="Balloons", value="**{:,}** known".format(len(self.balloons_icao_set)), inline=True)
-            embed.add_field(name="Suspicious aircraft", value="**{:,}** identifiers".format(len(self.suspicious_icao_set)), inline=True)
+            for tag, name, unit in TAG_STATISTICS:
+                blocks = self.tags.blocks.get(tag, 0)
+                value = "**{:,}** {}".format(self.tags.counts.get(tag, 0), unit)
+                if blocks:
+                    value += f" + {blocks:,} address block{'s' if blocks != 1 else ''}"
+                embed.add_field(name=name, value=value, inline=True)
             embed.add_field(name="This data appears in the following commands", value="`callsign` `icao` `reg` `squawk` `type` `radius` `pia` `mil` `ladd`", inline=False)
             embed.add_field(name="Other services", value="Additional data used in this cog is shown below", inline=False)
-            embed.add_field(name="Photography", value="Photos are powered by community contributions at [planespotters.net](https://www.planespotters.net/)", inline=True)
-            embed.add_field(name="Airport data", value="Airport data is powered by the [airport-data.com](https://airport-data.com/) API service", inline=True)
+            lookups = self.photo_cache.hits + self.photo_cache.misses
+            hit_rate = f"{self.photo_cache.hits / lookups:.0%}" if lookups else "n/a"
+            embed.add_field(name="Photography", value=f"Photos are powered by community contributions at [planespotters.net](https://www.planespotters.net/)\n-# {hit_rate} of lookups served from cache", inline=True)
+            airport_source = f"a local copy of [OurAirports](https://ourairports.com/) ({len(self.airports):,} airports), falling back to " if len(self.airports) else ""
+            embed.add_field(name="Airport data", value=f"Airport data is powered by {airport_source}the [airport-data.com](https://airport-data.com/) API service", inline=True)
             embed.add_field(name="Runway data", value="Runway data is powered by the [airportdb.io](https://airportdb.io) API service", inline=True)
             embed.add_field(name="Mapping and imagery", value="Mapping and ground imagery powered by [Google Maps](https://maps.google.com) and the [Maps Static API](https://developers.google.com/maps/documentation/maps-static)", inline=False)
 
@@ -427,10 +1529,8 @@ class Skysearch(commands.Cog):
         if response:
             aircraft_list = response['ac']
             if aircraft_list:
-                page_index = 0
-
-                async def create_embed(aircraft):
-                    embed = discord.Embed(title=f"Live military aircraft ({page_index + 1} of {len(aircraft_list)})", color=0xfffffe)
+                async def create_embed(aircraft, position):
+                    embed = discord.Embed(title=f"Live military aircraft ({position + 1} of {len(aircraft_list)})", color=0xfffffe)
                     embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/airplane.png")
                     aircraft_description = aircraft.get('desc', 'N/A')  # Aircraft Description
                     aircraft_squawk = aircraft.get('squawk', 'N/A')  # Squawk
@@ -454,43 +1554,14 @@ class Skysearch(commands.Cog):
                     if photographer:
                         embed.set_footer(text=f"Photo by {photographer}")
 
-                    view = discord.ui.View()
-                    view.add_item(discord.ui.Button(label=f"Track {aircraft_hex} live", url=f"https://globe.airplanes.live/?icao={aircraft_hex}"))
-
-                    return embed, view
-
-                async def update_message(message, page_index):
-                    embed, view = await create_embed(aircraft_list[page_index])
-                    await message.edit(embed=embed, view=view)
-
-                embed, view = await create_embed(aircraft_list[page_index])
-                message = await ctx.send(embed=embed, view=view)
+                    return embed, [discord.ui.Button(label=f"Track {aircraft_hex} live", url=f"https://globe.airplanes.live/?icao={aircraft_hex}")]
 
-                await message.add_reaction("⬅️")
-                await message.add_reaction("❌")
-                await message.add_reaction("➡️")
-                
-                def check(reaction, user):
-                    return user == ctx.author and str(reaction.emoji) in ["⬅️", "❌", "➡️"]
+                async def aircraft_pages():
+                    # Each page needs a photo lookup, so only build the ones that are actually viewed
+                    for position, aircraft in enumerate(aircraft_list):
+                        yield await create_embed(aircraft, position)
 
-                while True:
-                    try:
-                        reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
-
-                        if str(reaction.emoji) == "⬅️" and page_index > 0:
-                            page_index -= 1
-                            await update_message(message, page_index)
-                        elif str(reaction.emoji) == "➡️" and page_index < len(aircraft_list) - 1:
-                            page_index += 1
-                            await update_message(message, page_index)
-                        elif str(reaction.emoji) == "❌":
-                            await message.delete()
-                            break
-
-                        await message.remove_reaction(reaction, user)
-                    except asyncio.TimeoutError:
-                        await message.clear_reactions()
-                        break
+                await Paginator(ctx.author, aircraft_pages).send(ctx)
             else:
                 await self._send_aircraft_info(ctx, response)
         else:
@@ -505,44 +1576,30 @@ class Skysearch(commands.Cog):
         if response:
             if len(response['ac']) > 1:
                 pages = [response['ac'][i:i + 10] for i in range(0, len(response['ac']), 10)]  # Split aircraft list into pages of 10
-                for page_index, page in enumerate(pages):
-                    embed = discord.Embed(title=f"Limited Aircraft Data Displayed (Page {page_index + 1}/{len(pages)})", color=0xfffffe)
-                    embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/airplane.png")
-                    for aircraft in page:
-                        aircraft_description = aircraft.get('desc', 'N/A')  # Aircraft Description
-                        aircraft_squawk = aircraft.get('squawk', 'N/A')  # Squawk
-                        aircraft_lat = aircraft.get('lat', 'N/A')  # Latitude
-                        aircraft_lon = aircraft.get('lon', 'N/A')  # Longitude
-                        aircraft_heading = aircraft.get('heading', 'N/A')  # Heading
-                        aircraft_speed = aircraft.get('spd', 'N/A')  # Speed
-                        aircraft_hex = aircraft.get('hex', 'N/A')  # Hex
-
-                        aircraft_info = f"**Squawk:** {aircraft_squawk}\n"
-                        aircraft_info += f"**Coordinates:** Lat: {aircraft_lat}, Lon: {aircraft_lon}\n"
-                        aircraft_info += f"**Heading:** {aircraft_heading}\n"
-                        aircraft_info += f"**Speed:** {aircraft_speed}\n"
-                        aircraft_info += f"**ICAO:** {aircraft_hex}"
-
-                        embed.add_field(name=aircraft_description, value=aircraft_info, inline=False)
 
-                    message = await ctx.send(embed=embed)
-                    await message.add_reaction("⬅️")  # Adding a reaction to scroll to the previous page
-                    await message.add_reaction("➡️")  # Adding a reaction to scroll to the next page
-
-                    def check(reaction, user):
-                        return user == ctx.author and str(reaction.emoji) in ['⬅️', '➡️']
-
-                    try:
-                        reaction, user = await self.bot.wait_for('reaction_add', timeout=60.0, check=check)
-                        if str(reaction.emoji) == '⬅️' and page_index > 0:  # Check if the previous page reaction was added and it's not the first page
-                            await message.delete()
-                            page_index -= 1
-                        elif str(reaction.emoji) == '➡️' and page_index < len(pages) - 1:  # Check if the next page reaction was added and it's not the last page
-                            await message.delete()
-                            page_index += 1
-                    except asyncio.TimeoutError:
-                        await message.delete()
-                        break
+                def aircraft_pages():
+                    for page_index, page in enumerate(pages):
+                        embed = discord.Embed(title=f"Limited Aircraft Data Displayed (Page {page_index + 1}/{len(pages)})", color=0xfffffe)
+                        embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/airplane.png")
+                        for aircraft in page:
+                            aircraft_description = aircraft.get('desc', 'N/A')  # Aircraft Description
+                            aircraft_squawk = aircraft.get('squawk', 'N/A')  # Squawk
+                            aircraft_lat = aircraft.get('lat', 'N/A')  # Latitude
+                            aircraft_lon = aircraft.get('lon', 'N/A')  # Longitude
+                            aircraft_heading = aircraft.get('heading', 'N/A')  # Heading
+                            aircraft_speed = aircraft.get('spd', 'N/A')  # Speed
+                            aircraft_hex = aircraft.get('hex', 'N/A')  # Hex
+
+                            aircraft_info = f"**Squawk:** {aircraft_squawk}\n"
+                            aircraft_info += f"**Coordinates:** Lat: {aircraft_lat}, Lon: {aircraft_lon}\n"
+                            aircraft_info += f"**Heading:** {aircraft_heading}\n"
+                            aircraft_info += f"**Speed:** {aircraft_speed}\n"
+                            aircraft_info += f"**ICAO:** {aircraft_hex}"
+
+                            embed.add_field(name=aircraft_description, value=aircraft_info, inline=False)
+                        yield embed
+
+                await Paginator(ctx.author, aircraft_pages).send(ctx)
             else:
                 await self._send_aircraft_info(ctx, response)
         else:
@@ -557,44 +1614,30 @@ class Skysearch(commands.Cog):
         if response:
             if len(response['ac']) > 1:
                 pages = [response['ac'][i:i + 10] for i in range(0, len(response['ac']), 10)]  # Split aircraft list into pages of 10
-                for page_index, page in enumerate(pages):
-                    embed = discord.Embed(title=f"Private ICAO Aircraft Data Displayed (Page {page_index + 1}/{len(pages)})", color=0xfffffe)
-                    embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/airplane.png")
-                    for aircraft in page:
-                        aircraft_description = aircraft.get('desc', 'N/A')  # Aircraft Description
-                        aircraft_squawk = aircraft.get('squawk', 'N/A')  # Squawk
-                        aircraft_lat = aircraft.get('lat', 'N/A')  # Latitude
-                        aircraft_lon = aircraft.get('lon', 'N/A')  # Longitude
-                        aircraft_heading = aircraft.get('heading', 'N/A')  # Heading
-                        aircraft_speed = aircraft.get('spd', 'N/A')  # Speed
-                        aircraft_hex = aircraft.get('hex', 'N/A')  # Hex
-
-                        aircraft_info = f"**Squawk:** {aircraft_squawk}\n"
-                        aircraft_info += f"**Coordinates:** Lat: {aircraft_lat}, Lon: {aircraft_lon}\n"
-                        aircraft_info += f"**Heading:** {aircraft_heading}\n"
-                        aircraft_info += f"**Speed:** {aircraft_speed}\n"
-                        aircraft_info += f"**ICAO:** {aircraft_hex}"
-
-                        embed.add_field(name=aircraft_description, value=aircraft_info, inline=False)
 
-                    message = await ctx.send(embed=embed)
-                    await message.add_reaction("⬅️")  # Adding a reaction to scroll to the previous page
-                    await message.add_reaction("➡️")  # Adding a reaction to scroll to the next page
-
-                    def check(reaction, user):
-                        return user == ctx.author and str(reaction.emoji) in ['⬅️', '➡️']
-
-                    try:
-                        reaction, user = await self.bot.wait_for('reaction_add', timeout=60.0, check=check)
-                        if str(reaction.emoji) == '⬅️' and page_index > 0:  # Check if the previous page reaction was added and it's not the first page
-                            await message.delete()
-                            page_index -= 1
-                        elif str(reaction.emoji) == '➡️' and page_index < len(pages) - 1:  # Check if the next page reaction was added and it's not the last page
-                            await message.delete()
-                            page_index += 1
-                    except asyncio.TimeoutError:
-                        await message.delete()
-                        break
+                def aircraft_pages():
+                    for page_index, page in enumerate(pages):
+                        embed = discord.Embed(title=f"Private ICAO Aircraft Data Displayed (Page {page_index + 1}/{len(pages)})", color=0xfffffe)
+                        embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/airplane.png")
+                        for aircraft in page:
+                            aircraft_description = aircraft.get('desc', 'N/A')  # Aircraft Description
+                            aircraft_squawk = aircraft.get('squawk', 'N/A')  # Squawk
+                            aircraft_lat = aircraft.get('lat', 'N/A')  # Latitude
+                            aircraft_lon = aircraft.get('lon', 'N/A')  # Longitude
+                            aircraft_heading = aircraft.get('heading', 'N/A')  # Heading
+                            aircraft_speed = aircraft.get('spd', 'N/A')  # Speed
+                            aircraft_hex = aircraft.get('hex', 'N/A')  # Hex
+
+                            aircraft_info = f"**Squawk:** {aircraft_squawk}\n"
+                            aircraft_info += f"**Coordinates:** Lat: {aircraft_lat}, Lon: {aircraft_lon}\n"
+                            aircraft_info += f"**Heading:** {aircraft_heading}\n"
+                            aircraft_info += f"**Speed:** {aircraft_speed}\n"
+                            aircraft_info += f"**ICAO:** {aircraft_hex}"
+
+                            embed.add_field(name=aircraft_description, value=aircraft_info, inline=False)
+                        yield embed
+
+                await Paginator(ctx.author, aircraft_pages).send(ctx)
             else:
                 await self._send_aircraft_info(ctx, response)
         else:
@@ -607,97 +1650,90 @@ class Skysearch(commands.Cog):
         url = f"{self.api_url}/point/{lat}/{lon}/{radius}"
         response = await self._make_request(url)
         if response:
-            await self._send_aircraft_info(ctx, response)
+            aircraft_list = [aircraft for aircraft in response.get('ac') or [] if aircraft.get('lat') is not None and aircraft.get('lon') is not None]
+            if len(aircraft_list) > 1:
+                try:
+                    origin_lat, origin_lon = float(lat), float(lon)
+                except ValueError:
+                    await self._send_aircraft_info(ctx, response)
+                    return
+                # airplanes.live takes the radius in nautical miles, so distances are shown in nm too
+                distances = haversine_km(origin_lat, origin_lon, np.array([float(aircraft['lat']) for aircraft in aircraft_list]), np.array([float(aircraft['lon']) for aircraft in aircraft_list])) / KM_PER_NM
+                ranked = sorted(zip(distances.tolist(), aircraft_list), key=lambda item: item[0])
+                pages = [ranked[i:i + 10] for i in range(0, len(ranked), 10)]  # Split aircraft list into pages of 10, nearest first
+
+                def aircraft_pages():
+                    for page_index, page in enumerate(pages):
+                        embed = discord.Embed(title=f"Aircraft within {radius} nm of {lat}, {lon} (Page {page_index + 1}/{len(pages)})", color=0xfffffe)
+                        embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/airplane.png")
+                        for distance, aircraft in page:
+                            aircraft_description = aircraft.get('desc', 'N/A')  # Aircraft Description
+                            callsign = (aircraft.get('flight') or '').strip() or 'BLOCKED'  # Callsign
+                            aircraft_info = f"**Distance:** {distance:,.1f} nm {compass_point(origin_lat, origin_lon, float(aircraft['lat']), float(aircraft['lon']))}\n"
+                            aircraft_info += f"**Callsign:** {callsign}\n"
+                            aircraft_info += f"**Altitude:** {aircraft.get('alt_baro', 'N/A')}\n"
+                            aircraft_info += f"**Squawk:** {aircraft.get('squawk', 'N/A')}\n"
+                            aircraft_info += f"**ICAO:** {aircraft.get('hex', 'N/A')}"
+                            embed.add_field(name=aircraft_description, value=aircraft_info, inline=False)
+                        yield embed
+
+                await Paginator(ctx.author, aircraft_pages).send(ctx)
+            else:
+                await self._send_aircraft_info(ctx, response)
         else:
             embed = discord.Embed(title="Error", description="Error retrieving aircraft information for aircraft within the specified radius.", color=0xff4545)
             await ctx.send(embed=embed)
 
     @commands.guild_only()
-    @aircraft_group.command(name='export', help='Search aircraft by ICAO, callsign, squawk, or type and export the results.')
-    async def export_aircraft(self, ctx, search_type: str, search_value: str, file_format: str):
-        if search_type not in ["icao", "callsign", "squawk", "type"]:
-            embed = discord.Embed(title="Error", description="Invalid search type specified. Use one of: icao, callsign, squawk, or type.", color=0xfa4545)
+    @aircraft_group.command(name='export', help='Search aircraft by ICAO, callsign, squawk, or type, or pick the mil, ladd or pia feed, and export the results.')
+    async def export_aircraft(self, ctx, search_type: str, search_value: str, file_format: str = None):
+        feeds = ["mil", "ladd", "pia"]
+        if search_type not in ["icao", "callsign", "squawk", "type"] + feeds:
+            embed = discord.Embed(title="Error", description="Invalid search type specified. Use one of: icao, callsign, squawk, type, mil, ladd or pia.", color=0xfa4545)
+            await ctx.send(embed=embed)
+            return
+        if search_type in feeds and file_format is None:
+            # Feeds don't take a search value, so `export mil csv` works
+            search_value, file_format = search_type, search_value
+        file_format = (file_format or "").lower()
+        if file_format not in EXPORT_FORMATS:
+            embed = discord.Embed(title="Error", description=f"Invalid file format specified. Use one of: {', '.join(EXPORT_FORMATS)}.", color=0xfa4545)
             await ctx.send(embed=embed)
             return
 
         if search_type == "icao":
             search_type = "hex"
 
-        url = f"{self.api_url}/{search_type}/{search_value}"
+        url = f"{self.api_url}/{search_type}" if search_type in feeds else f"{self.api_url}/{search_type}/{search_value}"
         response = await self._make_request(url)
         if response:
-            if file_format not in ["csv", "pdf", "txt", "html"]:
-                embed = discord.Embed(title="Error", description="Invalid file format specified. Use one of: csv, pdf, txt, or html.", color=0xfa4545)
-                await ctx.send(embed=embed)
-                return
-
-            if not response['ac']:
+            if not response.get('ac'):
                 embed = discord.Embed(title="Error", description="No aircraft data found.", color=0xfa4545)
                 await ctx.send(embed=embed)
                 return
 
-            file_name = f"{search_type}_{search_value}.{file_format.lower()}"
-            file_path = os.path.join(tempfile.gettempdir(), file_name)
-
+            file_name = f"{search_type}_{search_value}.{file_format}" if search_type not in feeds else f"{search_type}.{file_format}"
+            title = f"{search_type.capitalize()} {search_value}" if search_type not in feeds else f"{search_type.upper()} feed"
             try:
-                if file_format.lower() == "csv":
-                    with open(file_path, "w", newline='', encoding='utf-8') as file:
-                        writer = csv.writer(file)
-                        aircraft_keys = list(response['ac'][0].keys())
-                        writer.writerow([key.upper() for key in aircraft_keys])
-                        for aircraft in response['ac']:
-                            aircraft_values = list(map(str, aircraft.values()))
-                            writer.writerow(aircraft_values)
-                elif file_format.lower() == "pdf":
-                    doc = SimpleDocTemplate(file_path, pagesize=landscape(A4)) 
-                    styles = getSampleStyleSheet()
-                    styles.add(ParagraphStyle(name='Normal-Bold', fontName='Helvetica-Bold', fontSize=14, leading=16, alignment=1)) 
-                    flowables = []
-
-                    flowables.append(Paragraph(f"<u>{search_type.capitalize()} {search_value}</u>", styles['Normal-Bold'])) 
-                    flowables.append(Spacer(1, 24)) 
-
-                    aircraft_keys = list(response['ac'][0].keys())
-                    data = [Paragraph(f"<b>{key}</b>", styles['Normal-Bold']) for key in aircraft_keys]
-                    flowables.extend(data)
-
-                    for aircraft in response['ac']:
-                        aircraft_values = list(map(str, aircraft.values()))
-                        data = [Paragraph(value, styles['Normal']) for value in aircraft_values]
-                        flowables.extend(data)
-                        flowables.append(PageBreak())
-
-                    doc.build(flowables)
-                elif file_format.lower() in ["txt"]:
-                    with open(file_path, "w", newline='', encoding='utf-8') as file:
-                        aircraft_keys = list(response['ac'][0].keys())
-                        file.write(' '.join([key.upper() for key in aircraft_keys]) + '\n')
-                        for aircraft in response['ac']:
-                            aircraft_values = list(map(str, aircraft.values()))
-                            file.write(' '.join(aircraft_values) + '\n')
-                elif file_format.lower() == "html":
-                    with open(file_path, "w", newline='', encoding='utf-8') as file:
-                        aircraft_keys = list(response['ac'][0].keys())
-                        file.write('<table>\n')
-                        file.write('<tr>\n')
-                        for key in aircraft_keys:
-                            file.write(f'<th>{key.upper()}</th>\n')
-                        file.write('</tr>\n')
-                        for aircraft in response['ac']:
-                            aircraft_values = list(map(str, aircraft.values()))
-                            file.write('<tr>\n')
-                            for value in aircraft_values:
-                                file.write(f'<td>{value}</td>\n')
-                            file.write('</tr>\n')
-                        file.write('</table>\n')
-            except PermissionError as e:
-                embed = discord.Embed(title="Error", description="I do not have permission to write to the file system.", color=0xff4545)
+                async with ctx.typing():
+                    fp, file_name = await self.bot.loop.run_in_executor(None, write_aircraft_export, response['ac'], file_format, file_name, title)
+            except ImportError:
+                embed = discord.Embed(title="Error", description=f"Parquet exports need the `pyarrow` package, which isn't installed. The bot owner can add it with `{ctx.clean_prefix}pipinstall pyarrow`.", color=0xff4545)
                 await ctx.send(embed=embed)
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+                return
+            except (OSError, ValueError) as e:
+                embed = discord.Embed(title="Error", description=f"Exporting the aircraft failed: {e}", color=0xff4545)
+                await ctx.send(embed=embed)
+                return
 
-            with open(file_path, 'rb') as fp:
-                await ctx.send(file=discord.File(fp, filename=os.path.basename(file_path)))
+            with fp:
+                size = fp.seek(0, os.SEEK_END)
+                fp.seek(0)
+                if ctx.guild and size > ctx.guild.filesize_limit:
+                    embed = discord.Embed(title="Error", description=f"The export is {size / 1024 / 1024:.1f} MB, which is over this server's upload limit. Try a narrower search or the `parquet` format.", color=0xff4545)
+                    await ctx.send(embed=embed)
+                    return
+                await ctx.send(file=discord.File(fp, filename=file_name))
         else:
             embed = discord.Embed(title="Error", description="Error retrieving aircraft information.", color=0xff4545)
             await ctx.send(embed=embed)
@@ -770,6 +1806,7 @@ class Skysearch(commands.Cog):
                     embed.add_field(name="Last Emergency Squawk", value=f"Time: {last_emergency_squawk_time_formatted}", inline=False)
                 else:
                     embed.add_field(name="Last Emergency Squawk", value="No emergency squawks yet.", inline=False)
+                embed.add_field(name="Active emergencies", value=f"**{len(self.emergency_tracker.active)}** aircraft", inline=False)
             else:
                 embed.add_field(name="Status", value="No alert channel set.", inline=False)
         else:
@@ -819,6 +1856,187 @@ class Skysearch(commands.Cog):
                 await ctx.send(embed=embed)
 
 
+    @commands.is_owner()
+    @aircraft_group.command(name='alertinterval', help='Set how many minutes pass before an ongoing emergency is alerted again. 0 disables repeat alerts.')
+    async def set_alert_interval(self, ctx, minutes: int = None):
+        if minutes is None:
+            minutes = await self.config.emergency_realert_minutes()
+            state = f"every **{minutes}** minutes" if minutes else "never"
+            embed = discord.Embed(description=f"Ongoing emergencies are re-alerted {state}. New emergencies, squawk changes, landings and clearances always alert.", color=0xfffffe)
+            await ctx.send(embed=embed)
+            return
+        if minutes < 0:
+            embed = discord.Embed(description="The interval can't be negative.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        await self.config.emergency_realert_minutes.set(minutes)
+        state = f"every **{minutes}** minutes" if minutes else "never"
+        embed = discord.Embed(description=f"Ongoing emergencies will now be re-alerted {state}.", color=0xfffffe)
+        await ctx.send(embed=embed)
+
+    @commands.is_owner()
+    @aircraft_group.command(name='reloadtags', help='Reload the aircraft tag data, optionally from an attached JSON file.')
+    async def reload_tags(self, ctx):
+        """
+        Reload the asset intelligence tags without reloading the cog.
+
+        Attach an `icao_tags.json` file to replace the tag data; it maps tag names to lists of hex codes, hex prefixes or `START-END` ranges.
+        """
+        override = cog_data_path(self) / "icao_tags.json"
+        try:
+            if ctx.message.attachments:
+                data = await ctx.message.attachments[0].read()
+                tags = json.loads(data)
+                if not isinstance(tags, dict) or not all(isinstance(entries, list) for entries in tags.values()):
+                    raise ValueError("The tag file must map tag names to lists of hex codes")
+                index = await self.bot.loop.run_in_executor(None, TagIndex, tags)
+                with open(override, "wb") as file:
+                    file.write(data)
+            else:
+                index = await self.bot.loop.run_in_executor(None, self._load_tags)
+        except (OSError, ValueError) as e:
+            embed = discord.Embed(title="Error", description=f"The tag data couldn't be loaded: {e}", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        self.tags = index
+        summary = ", ".join(f"{name} ({index.counts[name]:,})" for name in index.names)
+        embed = discord.Embed(title="Tags reloaded", description=f"Loaded **{len(index.exact):,}** tagged aircraft and **{sum(index.blocks.values()):,}** address blocks.\n-# {summary}", color=0x2BBD8E)
+        await ctx.send(embed=embed)
+
+    @commands.guild_only()
+    @aircraft_group.command(name='track', help='Draw the recent track of a watched or emergency aircraft.')
+    async def aircraft_track(self, ctx, hex_id: str):
+        """
+        Draw the recent track of an aircraft by its 24-bit ICAO Address.
+
+        Positions are recorded for aircraft on a watchlist or squawking an emergency, for up to the last 720 sightings.
+        """
+        hex_id = hex_id.strip().upper()
+        points = self.track_history.points(hex_id)
+        if len(points) < 2:
+            embed = discord.Embed(title="Error", description=f"Not enough positions recorded for **{hex_id}** yet. Tracks are kept for watched aircraft and emergencies.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        async with ctx.typing():
+            image = await self.bot.loop.run_in_executor(None, render_track, points, f"{hex_id} track")
+        embed = discord.Embed(title=f"Track for {hex_id}", description=f"**{len(points):,}** positions from <t:{int(points['ts'][0])}:R> to <t:{int(points['ts'][-1])}:R>.", color=0xfffffe)
+        embed.set_image(url=f"attachment://{hex_id.lower()}_track.png")
+        view = discord.ui.View()
+        view.add_item(discord.ui.Button(label="View on airplanes.live", emoji="🗺️", url=f"https://globe.airplanes.live/?icao={hex_id.lower()}", style=discord.ButtonStyle.link))
+        await ctx.send(embed=embed, file=discord.File(io.BytesIO(image), filename=f"{hex_id.lower()}_track.png"), view=view)
+
+    @commands.guild_only()
+    @aircraft_group.group(name='watch', help="Show this server's aircraft watchlist.", invoke_without_command=True)
+    async def watch_group(self, ctx):
+        """
+        Show this server's aircraft watchlist.
+
+        Watched aircraft are checked every minute, and takeoffs, landings, squawk changes and geofence entries are posted to the watch channel (or the alert channel if no watch channel is set).
+        """
+        settings = await self.config.guild(ctx.guild).all()
+        watchlist = settings['watchlist']
+        channel_id = settings['watch_channel'] or settings['alert_channel']
+        channel = f"<#{channel_id}>" if channel_id else "not set, so updates aren't posted"
+        fence = settings['geofence']
+        fence_text = f"{fence['radius_km']:,} km around {fence['lat']}, {fence['lon']}" if fence else "not set"
+        if not watchlist:
+            embed = discord.Embed(title="Watchlist", description=f"Nothing is being watched. Add aircraft with `aircraft watch add <hex|callsign|reg|type> <value>`.\n\n**Updates:** {channel}\n**Geofence:** {fence_text}", color=0xfffffe)
+            await ctx.send(embed=embed)
+            return
+
+        def watch_pages():
+            for start in range(0, len(watchlist), 20):
+                lines = [f"`{target['kind']}` **{target['value']}**" for target in watchlist[start:start + 20]]
+                embed = discord.Embed(title=f"Watchlist ({len(watchlist)}/{WATCHLIST_LIMIT})", description="\n".join(lines) + f"\n\n**Updates:** {channel}\n**Geofence:** {fence_text}", color=0xfffffe)
+                yield embed
+
+        await Paginator(ctx.author, watch_pages, timeout=30.0).send(ctx)
+
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_guild=True)
+    @watch_group.command(name='add', help='Watch an aircraft by hex, callsign, registration or type. Callsign wildcards narrow your type watches.')
+    async def watch_add(self, ctx, kind: str, value: str):
+        kind, value = kind.lower(), value.strip().upper()
+        if kind == 'icao':
+            kind = 'hex'
+        if kind not in WATCH_KINDS:
+            embed = discord.Embed(description="Watch by one of: hex, callsign, reg or type.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        if kind == 'hex' and not re.fullmatch(r'[0-9A-F]{6}', value):
+            embed = discord.Embed(description="A hex is the aircraft's six character ICAO address, like `A1B2C3`.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        if not re.fullmatch(r'[0-9A-Z*?-]{1,10}', value):
+            embed = discord.Embed(description="That doesn't look like a valid value to watch.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        async with self.config.guild(ctx.guild).watchlist() as watchlist:
+            target = {'kind': kind, 'value': value}
+            if target in watchlist:
+                embed = discord.Embed(description=f"`{kind}` **{value}** is already on the watchlist.", color=0xfffffe)
+                await ctx.send(embed=embed)
+                return
+            if len(watchlist) >= WATCHLIST_LIMIT:
+                embed = discord.Embed(description=f"The watchlist is full ({WATCHLIST_LIMIT} targets). Remove something first.", color=0xff4545)
+                await ctx.send(embed=embed)
+                return
+            pattern = is_callsign_pattern(kind, value)
+            if pattern and not any(existing['kind'] == 'type' for existing in watchlist):
+                embed = discord.Embed(description="airplanes.live can't search by callsign pattern, so patterns only narrow this server's `type` watches. Add a type watch first.", color=0xff4545)
+                await ctx.send(embed=embed)
+                return
+            watchlist.append(target)
+        note = " Aircraft found by this server's `type` watches are now only reported when their callsign matches one of its patterns." if pattern else ""
+        embed = discord.Embed(description=f"Now watching `{kind}` **{value}**.{note}", color=0x2BBD8E)
+        await ctx.send(embed=embed)
+
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_guild=True)
+    @watch_group.command(name='remove', help='Stop watching an aircraft.')
+    async def watch_remove(self, ctx, kind: str, value: str):
+        kind, value = kind.lower(), value.strip().upper()
+        if kind == 'icao':
+            kind = 'hex'
+        async with self.config.guild(ctx.guild).watchlist() as watchlist:
+            target = {'kind': kind, 'value': value}
+            if target not in watchlist:
+                embed = discord.Embed(description=f"`{kind}` **{value}** isn't on the watchlist.", color=0xff4545)
+                await ctx.send(embed=embed)
+                return
+            watchlist.remove(target)
+        embed = discord.Embed(description=f"Stopped watching `{kind}` **{value}**.", color=0xfffffe)
+        await ctx.send(embed=embed)
+
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_guild=True)
+    @watch_group.command(name='channel', help='Set or clear a channel for watchlist updates. Clear with no channel to use the alert channel.')
+    async def watch_channel(self, ctx, channel: discord.TextChannel = None):
+        if channel:
+            await self.config.guild(ctx.guild).watch_channel.set(channel.id)
+            embed = discord.Embed(description=f"Watchlist updates will be sent to {channel.mention}", color=0xfffffe)
+        else:
+            await self.config.guild(ctx.guild).watch_channel.clear()
+            embed = discord.Embed(description="Watch channel cleared. Watchlist updates will go to the alert channel.", color=0xfffffe)
+        await ctx.send(embed=embed)
+
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_guild=True)
+    @watch_group.command(name='geofence', help='Set or clear a circle that watched aircraft alert on entering. Clear with no arguments.')
+    async def watch_geofence(self, ctx, lat: float = None, lon: float = None, radius_km: float = None):
+        if lat is None:
+            await self.config.guild(ctx.guild).geofence.clear()
+            embed = discord.Embed(description="Geofence cleared.", color=0xfffffe)
+            await ctx.send(embed=embed)
+            return
+        if lon is None or radius_km is None or not (-90 <= lat <= 90 and -180 <= lon <= 180 and 0 < radius_km <= 2000):
+            embed = discord.Embed(description="Give a latitude, longitude and a radius between 0 and 2,000 km.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        await self.config.guild(ctx.guild).geofence.set({'lat': lat, 'lon': lon, 'radius_km': radius_km})
+        embed = discord.Embed(description=f"Watched aircraft will alert when they enter **{radius_km:,} km** around **{lat}, {lon}**.", color=0xfffffe)
+        await ctx.send(embed=embed)
+
     @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
     @aircraft_group.command(name='autoicao')
@@ -834,6 +2052,10 @@ class Skysearch(commands.Cog):
                 await ctx.send(embed=embed)
         else:
             await self.config.guild(ctx.guild).auto_icao.set(state)
+            if state:
+                self.auto_icao_guilds.add(ctx.guild.id)
+            else:
+                self.auto_icao_guilds.discard(ctx.guild.id)
             if state:
                 embed = discord.Embed(title="ICAO Lookup Status", description="Automatic ICAO lookup has been enabled.", color=0x2BBD8E)
                 await ctx.send(embed=embed)
@@ -867,9 +2089,11 @@ class Skysearch(commands.Cog):
 
         try:
             async with ctx.typing():
-                url1 = f"https://airport-data.com/api/ap_info.json?{code_type}={code}"
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url1) as response1:
+                data1 = self.airports.airport(code)
+                if data1 is None:
+                    url1 = f"https://airport-data.com/api/ap_info.json?{code_type}={code}"
+                    await self._throttle(url1)
+                    async with self.session.get(url1) as response1:
                         data1 = await response1.json()
                 
                 if 'error' in data1 or not data1 or 'name' not in data1:
@@ -901,13 +2125,12 @@ class Skysearch(commands.Cog):
                         "Content-Type": "application/json",
                         "Authorization": f"Bearer {openai_api_key}"
                     }
-                    async with aiohttp.ClientSession() as session:
-                        async with session.post("https://api.openai.com/v1/chat/completions", headers=headers, json=openai_payload) as openai_response:
-                            if openai_response.status == 200:
-                                openai_data = await openai_response.json()
-                                summary = openai_data.get('choices', [{}])[0].get('message', {}).get('content', '')
-                                embed.description = summary
-                                embed.set_footer(text="Summary generated using AI, check factual accuracy")
+                    async with self.session.post("https://api.openai.com/v1/chat/completions", headers=headers, json=openai_payload) as openai_response:
+                        if openai_response.status == 200:
+                            openai_data = await openai_response.json()
+                            summary = openai_data.get('choices', [{}])[0].get('message', {}).get('content', '')
+                            embed.description = summary
+                            embed.set_footer(text="Summary generated using AI, check factual accuracy")
 
                 googlemaps_tokens = await self.bot.get_shared_api_tokens("googlemaps")
                 google_street_view_api_key = googlemaps_tokens.get("api_key", "YOUR_API_KEY")
@@ -923,17 +2146,17 @@ class Skysearch(commands.Cog):
                         "maptype": "hybrid",
                         "key": google_street_view_api_key
                     }
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(street_view_base_url, params=street_view_params) as street_view_response:
-                            if street_view_response.status == 200:
-                                # Save the raw binary that the API returns as an image to set in embed.set_image
-                                street_view_image_url = "attachment://street_view_image.png"
-                                embed.set_image(url=street_view_image_url)
-                                street_view_image_stream = io.BytesIO(await street_view_response.read())
-                                file = discord.File(fp=street_view_image_stream, filename="street_view_image.png")
-                            else:
-                                # Handle the error accordingly, e.g., log it or send a message to the user
-                                pass
+                    await self._throttle(street_view_base_url)
+                    async with self.session.get(street_view_base_url, params=street_view_params) as street_view_response:
+                        if street_view_response.status == 200:
+                            # Save the raw binary that the API returns as an image to set in embed.set_image
+                            street_view_image_url = "attachment://street_view_image.png"
+                            embed.set_image(url=street_view_image_url)
+                            street_view_image_stream = io.BytesIO(await street_view_response.read())
+                            file = discord.File(fp=street_view_image_stream, filename="street_view_image.png")
+                        else:
+                            # Handle the error accordingly, e.g., log it or send a message to the user
+                            pass
 
                 view = discord.ui.View(timeout=180)  # Initialize view outside of the else block
                 if 'icao' in data1:
@@ -970,211 +2193,177 @@ class Skysearch(commands.Cog):
     @airport_group.command(name='runway')
     async def runwayinfo(self, ctx, code: str):
         """Query runway information by ICAO code."""
-        if len(code) != 4:
-            if len(code) == 3:
-                code_type = 'iata'
-            else:
-                embed = discord.Embed(title="Error", description="Invalid ICAO or IATA code. ICAO codes are 4 characters long and IATA codes are 3 characters long.", color=0xff4545)
+        if len(code) not in (3, 4):
+            embed = discord.Embed(title="Error", description="Invalid ICAO or IATA code. ICAO codes are 4 characters long and IATA codes are 3 characters long.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        try:
+            data2, error_message = await self._airport_details(code)
+            if error_message:
+                embed = discord.Embed(title="Error", description=error_message, color=0xff4545)
                 await ctx.send(embed=embed)
                 return
-        else:
-            code_type = 'icao'
+            code = data2.get('ident') or code
 
-        try:
-            if code_type == 'iata':
-                url1 = f"https://airport-data.com/api/ap_info.json?iata={code}"
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url1) as response1:
-                        data1 = await response1.json()
-                        if 'icao' in data1:
-                            code = data1['icao']
-                        else:
-                            embed = discord.Embed(title="Error", description="No ICAO code found for the provided IATA code.", color=0xff4545)
-                            await ctx.send(embed=embed)
-                            return
-
-            api_token = await self.bot.get_shared_api_tokens("airportdbio")
-            if api_token and 'api_token' in api_token:
-                url2 = f"https://airportdb.io/api/v1/airport/{code}?apiToken={api_token['api_token']}"
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url2) as response2:
-                        data2 = await response2.json()
-
-                if 'error' in data2:
-                    error_message = data2['error']
-                    if len(error_message) > 1024:
-                        error_message = error_message[:1021] + "..."
-                    embed = discord.Embed(title="Error", description=error_message, color=0xff4545)
-                    await ctx.send(embed=embed)
-                elif not data2 or 'name' not in data2:
-                    embed = discord.Embed(title="Error", description="No airport found with the provided code.", color=0xff4545)
-                    await ctx.send(embed=embed)
-                else:
-                    combined_pages = []
-                    if 'runways' in data2:
+            if 'error' in data2:
+                error_message = data2['error']
+                if len(error_message) > 1024:
+                    error_message = error_message[:1021] + "..."
+                embed = discord.Embed(title="Error", description=error_message, color=0xff4545)
+                await ctx.send(embed=embed)
+            elif not data2 or 'name' not in data2:
+                embed = discord.Embed(title="Error", description="No airport found with the provided code.", color=0xff4545)
+                await ctx.send(embed=embed)
+            else:
+                combined_pages = []
+                if 'runways' in data2:
+                    embed = discord.Embed(title=f"Runway information for {code.upper()}", color=0xfffffe)
+                    embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/layers.png")
+                    runways = data2['runways']
+                    for runway in runways:
+                        # Local OurAirports runways carry every key, but some with no value
+                        embed.add_field(name="Runway ID", value=f"**`{runway.get('id') or 'Unknown'}`**", inline=True)
+
+                        if runway.get('surface'):
+                            embed.add_field(name="Surface", value=f"**`{runway['surface']}`**", inline=True)
+
+                        length = f"{runway['length_ft']}ft" if runway.get('length_ft') else "Unknown length"
+                        width = f"{runway['width_ft']}ft" if runway.get('width_ft') else "Unknown width"
+                        embed.add_field(name="Dimensions", value=f"**`{length} long`\n`{width} wide`**" if runway.get('length_ft') or runway.get('width_ft') else "**`Unknown`**", inline=True)
+
+                        if runway.get('le_ident') or runway.get('he_ident'):
+                            ils_value = ""
+                            for end in ('le', 'he'):
+                                if not runway.get(f'{end}_ident'):
+                                    continue
+                                ils_info = runway.get(f'{end}_ils') or {}
+                                if ils_info:
+                                    ils_value += f"**{runway[f'{end}_ident']}** *`{ils_info.get('freq', 'N/A')} MHz @ {ils_info.get('course', 'N/A')}°`*\n"
+                                else:
+                                    ils_value += f"**{runway[f'{end}_ident']}** *`No ILS data`*\n"
+                            embed.add_field(name="Landing assistance", value=ils_value.strip(), inline=True)
+
+                        runway_status = ":white_check_mark: **`Open`**" if str(runway.get('closed', 0)) == '0' else ":x: **`Closed`**"
+                        embed.add_field(name="Runway status", value=runway_status, inline=True)
+
+                        lighted_status = ":bulb: **`Lighted`**" if str(runway.get('lighted', 0)) == '1' else ":x: **`Not Lighted`**"
+                        embed.add_field(name="Lighting", value=lighted_status, inline=True)
+
+                        combined_pages.append(embed)
                         embed = discord.Embed(title=f"Runway information for {code.upper()}", color=0xfffffe)
                         embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/layers.png")
-                        runways = data2['runways']
-                        for runway in runways:
-                            if 'id' in runway:
-                                embed.add_field(name="Runway ID", value=f"**`{runway['id']}`**", inline=True)
-
-                            if 'surface' in runway:
-                                embed.add_field(name="Surface", value=f"**`{runway['surface']}`**", inline=True)
-
-                            if 'length_ft' in runway and 'width_ft' in runway:
-                                embed.add_field(name="Dimensions", value=f"**`{runway['length_ft']}ft long`\n`{runway['width_ft']}ft wide`**", inline=True)
-
-                            if 'le_ident' in runway or 'he_ident' in runway:
-                                ils_value = ""
-                                if 'le_ident' in runway:
-                                    ils_info = runway.get('le_ils', {})
-                                    ils_freq = ils_info.get('freq', 'N/A')
-                                    ils_course = ils_info.get('course', 'N/A')
-                                    ils_value += f"**{runway['le_ident']}** *`{ils_freq} MHz @ {ils_course}°`*\n"
-                                if 'he_ident' in runway:
-                                    ils_info = runway.get('he_ils', {})
-                                    ils_freq = ils_info.get('freq', 'N/A')
-                                    ils_course = ils_info.get('course', 'N/A')
-                                    ils_value += f"**{runway['he_ident']}** *`{ils_freq} MHz @ {ils_course}°`*\n"
-                                embed.add_field(name="Landing assistance", value=ils_value.strip(), inline=True)
-
-                            runway_status = ":white_check_mark: **`Open`**" if str(runway.get('closed', 0)) == '0' else ":x: **`Closed`**"
-                            embed.add_field(name="Runway status", value=runway_status, inline=True)
-
-                            lighted_status = ":bulb: **`Lighted`**" if str(runway.get('lighted', 0)) == '1' else ":x: **`Not Lighted`**"
-                            embed.add_field(name="Lighting", value=lighted_status, inline=True)
-
-                            combined_pages.append(embed)
-                            embed = discord.Embed(title=f"Runway information for {code.upper()}", color=0xfffffe)
-                            embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/layers.png")
-
-                    await self.paginate_embed(ctx, combined_pages)
-            else:
-                embed = discord.Embed(title="Error", description="API token for airportdb.io not configured.", color=0xff4545)
-                await ctx.send(embed=embed)
+
+                if not combined_pages:
+                    embed = discord.Embed(title="Error", description=f"No runway information found for {code.upper()}.", color=0xff4545)
+                    await ctx.send(embed=embed)
+                    return
+                await self.paginate_embed(ctx, combined_pages)
         except Exception as e:
             embed = discord.Embed(title="Error", description=str(e), color=0xff4545)
             await ctx.send(embed=embed)
 
-    async def paginate_embed(self, ctx, pages):
-        message = await ctx.send(embed=pages[0])
-        await message.add_reaction("⬅️")
-        await message.add_reaction("❌")
-        await message.add_reaction("➡️")
-
-        def check(reaction, user):
-            return user == ctx.author and str(reaction.emoji) in ["⬅️", "❌", "➡️"]
+    async def _airport_details(self, code):
+        """
+        Airport with its runways and navaids, from the local database when it knows them and from
+        airportdb.io otherwise. Returns `(data, error_message)`.
+        """
+        local = self.airports.airport_details(code)
+        if local is not None and (local['runways'] or local['navaids']):
+            return local, None
+        if local is not None:
+            code = local['icao']
+        elif len(code) == 3:
+            url1 = f"https://airport-data.com/api/ap_info.json?iata={code}"
+            await self._throttle(url1)
+            async with self.session.get(url1) as response1:
+                data1 = await response1.json()
+            if 'icao' not in data1:
+                return None, "No ICAO code found for the provided IATA code."
+            code = data1['icao']
+
+        api_token = await self.bot.get_shared_api_tokens("airportdbio")
+        if not api_token or 'api_token' not in api_token:
+            return None, "API token for airportdb.io not configured."
+        url = f"https://airportdb.io/api/v1/airport/{code}?apiToken={api_token['api_token']}"
+        await self._throttle(url)
+        async with self.session.get(url) as response:
+            return await response.json(), None
 
-        i = 0
-        reaction = None
-        while True:
-            if str(reaction) == "⬅️":
-                if i > 0:
-                    i -= 1
-                    await message.edit(embed=pages[i])
-            elif str(reaction) == "➡️":
-                if i < len(pages) - 1:
-                    i += 1
-                    await message.edit(embed=pages[i])
-            elif str(reaction) == "❌":
-                await message.delete()
-                break
-            try:
-                reaction, user = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
-                await asyncio.sleep(1)
-                await message.remove_reaction(reaction, user)
-            except asyncio.TimeoutError:
-                await message.clear_reactions()
-                break
+    async def paginate_embed(self, ctx, pages):
+        await Paginator(ctx.author, lambda: iter(pages), timeout=30.0).send(ctx)
 
     @commands.guild_only()
     @airport_group.command(name='navaid')
     async def navaidinfo(self, ctx, code: str):
         """Query navaid information by ICAO code."""
-        if len(code) != 4:
-            if len(code) == 3:
-                code_type = 'iata'
-            else:
-                embed = discord.Embed(title="Error", description="Invalid ICAO or IATA code. ICAO codes are 4 characters long and IATA codes are 3 characters long.", color=0xff4545)
+        if len(code) not in (3, 4):
+            embed = discord.Embed(title="Error", description="Invalid ICAO or IATA code. ICAO codes are 4 characters long and IATA codes are 3 characters long.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        try:
+            data, error_message = await self._airport_details(code)
+            if error_message:
+                embed = discord.Embed(title="Error", description=error_message, color=0xff4545)
                 await ctx.send(embed=embed)
                 return
-        else:
-            code_type = 'icao'
+            code = data.get('ident') or code
 
-        try:
-            if code_type == 'iata':
-                url1 = f"https://airport-data.com/api/ap_info.json?iata={code}"
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url1) as response1:
-                        data1 = await response1.json()
-                        if 'icao' in data1:
-                            code = data1['icao']
-                        else:
-                            embed = discord.Embed(title="Error", description="No ICAO code found for the provided IATA code.", color=0xff4545)
-                            await ctx.send(embed=embed)
-                            return
-
-            api_token = await self.bot.get_shared_api_tokens("airportdbio")
-            if api_token and 'api_token' in api_token:
-                url = f"https://airportdb.io/api/v1/airport/{code}?apiToken={api_token['api_token']}"
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url) as response:
-                        data = await response.json()
-
-                if 'error' in data:
-                    error_message = data['error']
-                    if len(error_message) > 1024:
-                        error_message = error_message[:1021] + "..."
-                    embed = discord.Embed(title="Error", description=error_message, color=0xff4545)
-                    await ctx.send(embed=embed)
-                elif not data or 'name' not in data:
-                    embed = discord.Embed(title="Error", description="No airport found with the provided code.", color=0xff4545)
-                    await ctx.send(embed=embed)
-                else:
-                    combined_pages = []
-                    if 'navaids' in data:
-                        embed = discord.Embed(title=f"Navigational aids at {code.upper()}", color=0xfffffe)
-                        embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/navigate.png")
-                        navaids = data['navaids']
-                        for navaid in navaids:
-                            if 'ident' in navaid and navaid['ident']:
-                                embed.add_field(name="Ident", value=f"**`{navaid['ident']}`**", inline=True)
+            if 'error' in data:
+                error_message = data['error']
+                if len(error_message) > 1024:
+                    error_message = error_message[:1021] + "..."
+                embed = discord.Embed(title="Error", description=error_message, color=0xff4545)
+                await ctx.send(embed=embed)
+            elif not data or 'name' not in data:
+                embed = discord.Embed(title="Error", description="No airport found with the provided code.", color=0xff4545)
+                await ctx.send(embed=embed)
+            else:
+                combined_pages = []
+                if 'navaids' in data:
+                    embed = discord.Embed(title=f"Navigational aids at {code.upper()}", color=0xfffffe)
+                    embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/navigate.png")
+                    navaids = data['navaids']
+                    for navaid in navaids:
+                        if 'ident' in navaid and navaid['ident']:
+                            embed.add_field(name="Ident", value=f"**`{navaid['ident']}`**", inline=True)
 
-                            if 'name' in navaid and navaid['name']:
-                                embed.add_field(name="Name", value=f"**`{navaid['name']}`**", inline=True)
+                        if 'name' in navaid and navaid['name']:
+                            embed.add_field(name="Name", value=f"**`{navaid['name']}`**", inline=True)
 
-                            if 'type' in navaid and navaid['type']:
-                                embed.add_field(name="Type", value=f"**`{navaid['type']}`**", inline=True)
+                        if 'type' in navaid and navaid['type']:
+                            embed.add_field(name="Type", value=f"**`{navaid['type']}`**", inline=True)
 
-                            if 'frequency_khz' in navaid and navaid['frequency_khz']:
-                                embed.add_field(name="Frequency", value=f"**`{navaid['frequency_khz']}khz`**", inline=True)
+                        if 'frequency_khz' in navaid and navaid['frequency_khz']:
+                            embed.add_field(name="Frequency", value=f"**`{navaid['frequency_khz']}khz`**", inline=True)
 
-                            if 'latitude_deg' in navaid and 'longitude_deg' in navaid and navaid['latitude_deg'] and navaid['longitude_deg']:
-                                latitude = "{:.6f}".format(float(navaid['latitude_deg']))
-                                longitude = "{:.6f}".format(float(navaid['longitude_deg']))
-                                embed.add_field(name="Coordinates", value="**`{}°, {}°`**".format(latitude, longitude), inline=True)
+                        if 'latitude_deg' in navaid and 'longitude_deg' in navaid and navaid['latitude_deg'] and navaid['longitude_deg']:
+                            latitude = "{:.6f}".format(float(navaid['latitude_deg']))
+                            longitude = "{:.6f}".format(float(navaid['longitude_deg']))
+                            embed.add_field(name="Coordinates", value="**`{}°, {}°`**".format(latitude, longitude), inline=True)
 
-                            if 'elevation_ft' in navaid and navaid['elevation_ft']:
-                                embed.add_field(name="Elevation", value=f"**`{navaid['elevation_ft']}ft`**", inline=True)
+                        if 'elevation_ft' in navaid and navaid['elevation_ft']:
+                            embed.add_field(name="Elevation", value=f"**`{navaid['elevation_ft']}ft`**", inline=True)
 
-                            if 'usageType' in navaid and navaid['usageType']:
-                                embed.add_field(name="Usage", value=f"**`{navaid['usageType']}`**", inline=True)
+                        if 'usageType' in navaid and navaid['usageType']:
+                            embed.add_field(name="Usage", value=f"**`{navaid['usageType']}`**", inline=True)
 
-                            if 'power' in navaid and navaid['power']:
-                                embed.add_field(name="Signal power", value=f"**`{navaid['power']}`**", inline=True)
+                        if 'power' in navaid and navaid['power']:
+                            embed.add_field(name="Signal power", value=f"**`{navaid['power']}`**", inline=True)
 
-                            if 'associated_airport' in navaid and navaid['associated_airport']:
-                                embed.add_field(name="Airport", value=f"**`{navaid['associated_airport']}`**", inline=True)
+                        if 'associated_airport' in navaid and navaid['associated_airport']:
+                            embed.add_field(name="Airport", value=f"**`{navaid['associated_airport']}`**", inline=True)
 
-                            combined_pages.append(embed)
-                            embed = discord.Embed(title=f"Navaid information for {code.upper()}", color=0xfffffe)
-                            embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/navigate.png")
+                        combined_pages.append(embed)
+                        embed = discord.Embed(title=f"Navaid information for {code.upper()}", color=0xfffffe)
+                        embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/navigate.png")
 
-                    await self.paginate_embed(ctx, combined_pages)
-            else:
-                embed = discord.Embed(title="Error", description="API token for airportdb.io not configured.", color=0xff4545)
-                await ctx.send(embed=embed)
+                if not combined_pages:
+                    embed = discord.Embed(title="Error", description=f"No navaid information found for {code.upper()}.", color=0xff4545)
+                    await ctx.send(embed=embed)
+                    return
+                await self.paginate_embed(ctx, combined_pages)
         except Exception as e:
             embed = discord.Embed(title="Error", description=str(e), color=0xff4545)
             await ctx.send(embed=embed)
@@ -1189,30 +2378,36 @@ class Skysearch(commands.Cog):
             return
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"https://airport-data.com/api/ap_info.json?{code_type}={code}") as response1:
+            data1 = self.airports.airport(code)
+            if data1 is None:
+                info_url = f"https://airport-data.com/api/ap_info.json?{code_type}={code}"
+                await self._throttle(info_url)
+                async with self.session.get(info_url) as response1:
                     data1 = await response1.json()
-                    latitude, longitude = data1.get('latitude'), data1.get('longitude')
-                    if not latitude or not longitude:
-                        await ctx.send(embed=discord.Embed(title="Error", description="Could not fetch latitude and longitude for the provided code.", color=0xff4545))
-                        return
-                    if data1.get('country_code') != 'US':
-                        await ctx.send(embed=discord.Embed(title="Error", description="Weather forecasts are currently only available for airports in the United States.", color=0xff4545))
-                        return
-
-                async with session.get(f"https://api.weather.gov/points/{latitude},{longitude}") as response2:
-                    data2 = await response2.json()
-                    forecast_url = data2.get('properties', {}).get('forecast')
-                    if not forecast_url:
-                        await ctx.send(embed=discord.Embed(title="Error", description="Could not fetch forecast URL.", color=0xff4545))
-                        return
-
-                async with session.get(forecast_url) as response3:
-                    data3 = await response3.json()
-                    periods = data3.get('properties', {}).get('periods')
-                    if not periods:
-                        await ctx.send(embed=discord.Embed(title="Error", description="Could not fetch forecast details.", color=0xff4545))
-                        return
+            latitude, longitude = data1.get('latitude'), data1.get('longitude')
+            if not latitude or not longitude:
+                await ctx.send(embed=discord.Embed(title="Error", description="Could not fetch latitude and longitude for the provided code.", color=0xff4545))
+                return
+            if data1.get('country_code') != 'US':
+                await ctx.send(embed=discord.Embed(title="Error", description="Weather forecasts are currently only available for airports in the United States.", color=0xff4545))
+                return
+
+            points_url = f"https://api.weather.gov/points/{latitude},{longitude}"
+            await self._throttle(points_url)
+            async with self.session.get(points_url) as response2:
+                data2 = await response2.json()
+                forecast_url = data2.get('properties', {}).get('forecast')
+                if not forecast_url:
+                    await ctx.send(embed=discord.Embed(title="Error", description="Could not fetch forecast URL.", color=0xff4545))
+                    return
+
+            await self._throttle(forecast_url)
+            async with self.session.get(forecast_url) as response3:
+                data3 = await response3.json()
+                periods = data3.get('properties', {}).get('periods')
+                if not periods:
+                    await ctx.send(embed=discord.Embed(title="Error", description="Could not fetch forecast details.", color=0xff4545))
+                    return
 
             combined_pages = []
             
@@ -1298,73 +2493,349 @@ class Skysearch(commands.Cog):
         except Exception as e:
             await ctx.send(embed=discord.Embed(title="Error", description=str(e), color=0xff4545))
 
+    @commands.guild_only()
+    @airport_group.command(name='search', help='Search the local airport database by name.')
+    async def airport_search(self, ctx, *, name: str):
+        if not len(self.airports):
+            embed = discord.Embed(title="Error", description="The local airport database is empty. An owner can load it with `airport importdb`.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        matches = self.airports.search(name)
+        if not matches:
+            embed = discord.Embed(title="Error", description=f"No airports found starting with **{name}**.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        def search_pages():
+            for start in range(0, len(matches), 10):
+                embed = discord.Embed(title=f"Airports matching {name}", color=0xfffffe)
+                embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/airplane.png")
+                for airport in matches[start:start + 10]:
+                    codes = " / ".join(code for code in (airport['icao'], airport.get('iata')) if code)
+                    place = ", ".join(part for part in (airport.get('location'), airport.get('country') or airport.get('country_code')) if part)
+                    embed.add_field(name=f"{airport['name']}", value=f"**`{codes}`** {place}", inline=False)
+                yield embed
 
+        await Paginator(ctx.author, search_pages, timeout=30.0).send(ctx)
+
+    @commands.guild_only()
+    @airport_group.command(name='near', help='List the airports and navaids nearest to a position.')
+    async def airport_near(self, ctx, lat: float, lon: float):
+        """
+        List the airports and navaids nearest to a latitude and longitude, using the local airport database.
+        """
+        if not len(self.airport_index):
+            embed = discord.Embed(title="Error", description="The local airport database is empty. An owner can load it with `airport importdb`.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            embed = discord.Embed(title="Error", description="Latitude must be between -90 and 90, and longitude between -180 and 180.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+        airports = self.airport_index.nearest(lat, lon, count=30, kinds=("large_airport", "medium_airport", "small_airport", "heliport", "seaplane_base"))
+        navaids = self.airport_index.nearest(lat, lon, count=10, kinds=("navaid",), max_km=500)
+        if not airports and not navaids:
+            embed = discord.Embed(title="Error", description=f"Nothing found near **{lat}, {lon}**.", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        def near_pages():
+            for start in range(0, max(len(airports), 1), 10):
+                embed = discord.Embed(title=f"Nearest to {lat}, {lon}", color=0xfffffe)
+                embed.set_thumbnail(url="https://www.beehive.systems/hubfs/Icon%20Packs/White/airplane.png")
+                for distance, airport in airports[start:start + 10]:
+                    codes = " / ".join(code for code in (airport['icao'] or airport['ident'], airport.get('iata')) if code)
+                    direction = compass_point(lat, lon, airport['latitude'], airport['longitude'])
+                    embed.add_field(name=f"{airport['name']}", value=f"**`{codes}`** {distance:,.1f} km {direction}", inline=False)
+                if start == 0 and navaids:
+                    lines = []
+                    for distance, navaid in navaids:
+                        frequency = ""
+                        if navaid['frequency_khz']:
+                            # NDBs broadcast in kHz, VOR/DME and friends in MHz
+                            frequency = f" {navaid['frequency_khz']} kHz" if navaid['type'] == 'NDB' else f" {navaid['frequency_khz'] / 1000:.2f} MHz"
+                        lines.append(f"**`{navaid['ident']}`** {navaid['type']}{frequency} - {distance:,.1f} km {compass_point(lat, lon, navaid['latitude'], navaid['longitude'])}")
+                    embed.add_field(name="Navaids", value="\n".join(lines)[:1024], inline=False)
+                yield embed
+
+        await Paginator(ctx.author, near_pages, timeout=30.0).send(ctx)
+
+    @commands.is_owner()
+    @airport_group.command(name='importdb', help='Import the OurAirports dataset into the local airport database.')
+    async def import_airport_database(self, ctx):
+        """
+        Import airports, runways and navaids from OurAirports into the local database.
+
+        Attach `airports.csv` (and optionally `runways.csv`, `navaids.csv` and `countries.csv`) to import your own copy; otherwise the latest export is downloaded.
+        """
+        base_url = "https://davidmegginson.github.io/ourairports-data"
+        names = ("airports", "runways", "navaids", "countries")
+        attached = {attachment.filename.lower(): attachment for attachment in ctx.message.attachments}
+        started = time.monotonic()
+
+        async def load(name):
+            attachment = attached.get(f"{name}.csv")
+            if attachment is not None:
+                return (await attachment.read()).decode('utf-8', errors='replace')
+            if attached:
+                return ""
+            async with self.session.get(f"{base_url}/{name}.csv", timeout=aiohttp.ClientTimeout(total=300)) as response:
+                response.raise_for_status()
+                return await response.text(encoding='utf-8', errors='replace')
+
+        try:
+            async with ctx.typing():
+                airports_csv, runways_csv, navaids_csv, countries_csv = await asyncio.gather(*(load(name) for name in names))
+                if not airports_csv:
+                    embed = discord.Embed(title="Error", description="An `airports.csv` file is required.", color=0xff4545)
+                    await ctx.send(embed=embed)
+                    return
+                counts = await self.bot.loop.run_in_executor(
+                    None, self.airports.import_ourairports, airports_csv, runways_csv, navaids_csv, countries_csv
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError, csv.Error, KeyError, sqlite3.Error) as e:
+            embed = discord.Embed(title="Error", description=f"Importing the airport database failed: {e}", color=0xff4545)
+            await ctx.send(embed=embed)
+            return
+
+        await self._rebuild_airport_index()
+        embed = discord.Embed(title="Airport database imported", description=f"Finished in **{time.monotonic() - started:.1f}s**. Airport lookups now answer locally and fall back to the network for anything missing.", color=0x2BBD8E)
+        embed.add_field(name="Airports", value=f"**{counts['airports']:,}**", inline=True)
+        embed.add_field(name="Runways", value=f"**{counts['runways']:,}**", inline=True)
+        embed.add_field(name="Navaids", value=f"**{counts['navaids']:,}**", inline=True)
+        await ctx.send(embed=embed)
+
+    async def _fetch_emergencies(self):
+        """
+        Fetch every aircraft squawking an emergency code in one concurrent sweep, keyed by hex.
+
+        Returns None if any lookup failed, so a bad sweep isn't mistaken for emergencies clearing.
+        """
+        responses = await asyncio.gather(*(self._make_request(f"{self.api_url}/squawk/{code}") for code in EMERGENCY_SQUAWKS))
+        if any(response is None for response in responses):
+            return None
+        emergencies = {}
+        for response in responses:
+            for aircraft_info in response.get('ac', []):
+                hex_id = aircraft_info.get('hex', '').upper()
+                # Ignore aircraft with the callsign 00000000
+                if not hex_id or aircraft_info.get('flight', '').strip() == '00000000':
+                    continue
+                emergencies[hex_id] = aircraft_info
+        return emergencies
+
+    async def _send_alert(self, channel, role_id, embeds, view):
+        await self.alert_limiter.acquire()
+        if role_id:
+            await channel.send(f"<@&{role_id}>", embeds=embeds, view=view, allowed_mentions=discord.AllowedMentions(roles=True))
+        else:
+            await channel.send(embeds=embeds, view=view)
+
+    async def _build_emergency_alert(self, event, hex_id, aircraft_info, previous):
+        """Build the embeds for one emergency event, returning `(embeds, view, mention_role)`."""
+        if event in ('landed', 'cleared'):
+            state = previous if aircraft_info is None else aircraft_info
+            name = state.get('desc') or hex_id
+            flight = (state.get('flight') or '').strip()
+            label = f"{name} ({flight})" if flight else name
+            if event == 'landed':
+                embed = discord.Embed(title="Aircraft landed", description=f"Aircraft {label} has landed while squawking {aircraft_info.get('squawk')}.", color=0x00ff00)
+            else:
+                embed = discord.Embed(title="Emergency cleared", description=f"Aircraft {label} is no longer squawking {previous['squawk']}. It first declared <t:{int(previous['first_seen'])}:R>.", color=0x00ff00)
+            view = discord.ui.View()
+            view.add_item(discord.ui.Button(label="View on airplanes.live", emoji="🗺️", url=f"https://globe.airplanes.live/?icao={hex_id}", style=discord.ButtonStyle.link))
+            return [embed], view, False
+
+        embed, view = await self._build_aircraft_embed(aircraft_info)
+        if event == 'squawk':
+            notice = discord.Embed(title="Squawk changed", description=f"Aircraft {hex_id} changed its squawk from {previous['squawk']} to {aircraft_info.get('squawk')}.", color=0xff4545)
+            return [notice, embed], view, True
+        if event == 'reminder':
+            notice = discord.Embed(title="Emergency ongoing", description=f"Aircraft {hex_id} has been squawking {aircraft_info.get('squawk')} since <t:{int(previous['first_seen'])}:R>.", color=0xff4545)
+            return [notice, embed], view, False
+        return [embed], view, True
 
     @tasks.loop(minutes=2)
     async def check_emergency_squawks(self):
         try:
-            emergency_squawk_codes = ['7500', '7600', '7700']
-            for squawk_code in emergency_squawk_codes:
-                url = f"{self.api_url}/squawk/{squawk_code}"
-                response = await self._make_request(url)
-                if response and 'ac' in response:
-                    for aircraft_info in response['ac']:
-                        # Ignore aircraft with the callsign 00000000
-                        if aircraft_info.get('icao') == '00000000':
-                            continue
-                        guilds = self.bot.guilds
-                        for guild in guilds:
-                            alert_channel_id = await self.config.guild(guild).alert_channel()
-                            if alert_channel_id:
-                                alert_channel = self.bot.get_channel(alert_channel_id)
-                                if alert_channel:
-                                    # Get the alert role
-                                    alert_role_id = await self.config.guild(guild).alert_role()
-                                    alert_role_mention = f"<@&{alert_role_id}>" if alert_role_id else ""
-                                    
-                                    # Send the new alert with role mention if available
-                                    if alert_role_mention:
-                                        await alert_channel.send(alert_role_mention, allowed_mentions=discord.AllowedMentions(roles=True))
-                                    await self._send_aircraft_info(alert_channel, {'ac': [aircraft_info]})
-                                    
-                                    # Check if aircraft has landed
-                                    if aircraft_info.get('altitude') is not None and aircraft_info.get('altitude') < 25:
-                                        embed = discord.Embed(title="Aircraft landed", description=f"Aircraft {aircraft_info.get('icao')} has landed while squawking {squawk_code}.", color=0x00ff00)
-                                        await alert_channel.send(embed=embed)
-                                else:
-                                    print(f"Error: Alert channel not found for guild {guild.name}")
-                            else:
-                                print(f"Error: No alert channel set for guild {guild.name}")
-                await asyncio.sleep(2)  # Add a delay to respect API rate limit
+            emergencies, guild_settings = await asyncio.gather(self._fetch_emergencies(), self.config.all_guilds())
+            if emergencies is None:
+                return
+            now = time.time()
+            for hex_id, aircraft_info in emergencies.items():
+                self.track_history.add(hex_id, aircraft_info, now)
+            targets = []
+            for guild_id, settings in guild_settings.items():
+                alert_channel_id = settings.get('alert_channel')
+                if not alert_channel_id:
+                    continue
+                alert_channel = self.bot.get_channel(alert_channel_id)
+                if alert_channel is None:
+                    print(f"Error: Alert channel not found for guild {guild_id}")
+                    continue
+                targets.append((guild_id, alert_channel, settings.get('alert_role')))
+            events = self.emergency_tracker.update(emergencies, await self.config.emergency_realert_minutes() * 60)
+            await self.config.active_emergencies.set(self.emergency_tracker.active)
+            if not events or not targets:
+                return
+
+            # Each alert is built once (with a single photo lookup) and shared by every guild
+            alerts = await asyncio.gather(*(self._build_emergency_alert(*event) for event in events))
+            sends = [
+                self._send_alert(alert_channel, role_id if mention else None, embeds, view)
+                for embeds, view, mention in alerts
+                for guild_id, alert_channel, role_id in targets
+            ]
+            results = await asyncio.gather(*sends, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"Error sending emergency squawk alert: {result}")
+
+            now = time.time()
+            for guild_id, alert_channel, role_id in targets:
+                await self.config.guild_from_id(guild_id).last_emergency_squawk_time.set(now)
         except Exception as e:
             print(f"Error checking emergency squawks: {e}")
 
     @check_emergency_squawks.before_loop
     async def before_check_emergency_squawks(self):
         await self.bot.wait_until_ready()  # Removed unnecessary try-except block
+        self.emergency_tracker = EmergencyTracker(await self.config.active_emergencies())
+
+    async def _fetch_watched(self, index):
+        """
+        Look up every watched target in batched requests, keyed by hex.
+
+        Values are comma-joined into as few requests as possible, so the request count depends on how
+        many distinct targets are watched, not how many guilds watch them. Returns None if any lookup failed.
+        """
+        urls = []
+        for kind, values in index.queries().items():
+            batch, length = [], 0
+            for value in values:
+                value = quote_plus(value)
+                if batch and (len(batch) >= WATCH_BATCH_SIZE or length + len(value) > WATCH_BATCH_CHARS):
+                    urls.append(f"{self.api_url}/{kind}/{','.join(batch)}")
+                    batch, length = [], 0
+                batch.append(value)
+                length += len(value) + 1
+            if batch:
+                urls.append(f"{self.api_url}/{kind}/{','.join(batch)}")
+        responses = await asyncio.gather(*(self._make_request(url) for url in urls))
+        if any(response is None for response in responses):
+            return None
+        return {
+            aircraft['hex'].upper(): aircraft
+            for response in responses
+            for aircraft in response.get('ac') or []
+            if aircraft.get('hex')
+        }
+
+    def _watch_update_line(self, event, hex_id, aircraft, previous):
+        """One line of a compact watchlist update."""
+        name = (aircraft.get('flight') or '').strip() or aircraft.get('r') or hex_id
+        label = f"[{name}](https://globe.airplanes.live/?icao={hex_id.lower()})" + (f" ({aircraft['t']})" if aircraft.get('t') else "")
+        airport = ""
+        if aircraft.get('lat') is not None and aircraft.get('lon') is not None:
+            nearest = self._nearest_airport(float(aircraft['lat']), float(aircraft['lon']))
+            if nearest is not None and nearest[0] <= 15:
+                airport = nearest[1].get('iata') or nearest[1]['icao'] or nearest[1]['ident']
+        if event == 'takeoff':
+            return f":airplane_departure: {label} took off" + (f" from **{airport}**" if airport else "")
+        if event == 'landing':
+            return f":airplane_arriving: {label} landed" + (f" at **{airport}**" if airport else "")
+        if event == 'squawk':
+            emoji = ":rotating_light:" if aircraft.get('squawk') in EMERGENCY_SQUAWKS else ":pager:"
+            return f"{emoji} {label} changed squawk from **{previous['squawk']}** to **{aircraft.get('squawk')}**"
+        return f":round_pushpin: {label} entered the geofence"
+
+    @tasks.loop(seconds=60)
+    async def poll_watchlists(self):
+        try:
+            guild_settings = await self.config.all_guilds()
+            index = WatchIndex({guild_id: settings['watchlist'] for guild_id, settings in guild_settings.items() if settings.get('watchlist')})
+            if not len(index):
+                return
+            aircraft_by_hex = await self._fetch_watched(index)
+            if aircraft_by_hex is None:
+                return
+            watchers = {}
+            for hex_id, aircraft in aircraft_by_hex.items():
+                guilds = index.match(aircraft)
+                if guilds:
+                    watchers[hex_id] = guilds
+            geofences = {
+                guild_id: (settings['geofence']['lat'], settings['geofence']['lon'], settings['geofence']['radius_km'])
+                for guild_id, settings in guild_settings.items() if settings.get('geofence')
+            }
+            now = time.time()
+            for hex_id in watchers:
+                self.track_history.add(hex_id, aircraft_by_hex[hex_id], now)
+            events = self.watch_tracker.update({hex_id: aircraft_by_hex[hex_id] for hex_id in watchers}, watchers, geofences, now)
+
+            updates = {}
+            for event, hex_id, aircraft, previous, guilds in events:
+                line = self._watch_update_line(event, hex_id, aircraft, previous)
+                for guild_id in guilds:
+                    updates.setdefault(guild_id, []).append(line)
+            sends = []
+            for guild_id, lines in updates.items():
+                settings = guild_settings[guild_id]
+                channel = self.bot.get_channel(settings.get('watch_channel') or settings.get('alert_channel') or 0)
+                if channel is None:
+                    continue
+                embeds = []
+                for line in lines:
+                    if not embeds or len(embeds[-1].description) + len(line) + 1 > 4000:
+                        if len(embeds) == 10:
+                            break
+                        embeds.append(discord.Embed(title="Watchlist updates" if not embeds else None, description="", color=0xfffffe))
+                    embeds[-1].description += ("\n" if embeds[-1].description else "") + line
+                sends.append(self._send_alert(channel, None, embeds, None))
+            results = await asyncio.gather(*sends, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"Error sending watchlist update: {result}")
+        except Exception as e:
+            print(f"Error polling watchlists: {e}")
+
+    @poll_watchlists.before_loop
+    async def before_poll_watchlists(self):
+        await self.bot.wait_until_ready()
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        if message.author == self.bot.user:
+        # Cheapest checks first: this runs for every message the bot can see
+        content = message.content
+        if len(content) != 6 or message.guild is None or message.guild.id not in self.auto_icao_guilds:
             return
-
-        if message.guild is None:
+        if message.author == self.bot.user or not HEX_DIGITS.issuperset(content):
             return
 
-        auto_icao = await self.config.guild(message.guild).auto_icao()
-        if not auto_icao:
+        hex_id = content.upper()
+        key = (message.channel.id, hex_id)
+        now = time.monotonic()
+        last = self._auto_icao_recent.get(key)
+        if last is not None and now - last < AUTO_ICAO_DEBOUNCE:
             return
+        self._auto_icao_recent[key] = now
+        self._auto_icao_recent.move_to_end(key)
+        while len(self._auto_icao_recent) > 1000:
+            self._auto_icao_recent.popitem(last=False)
 
-        content = message.content
-        icao_pattern = re.compile(r'^[a-fA-F0-9]{6}$')
-
-        if icao_pattern.match(content):
-            ctx = await self.bot.get_context(message)
-            await self.aircraft_by_icao(ctx, content)
+        ctx = await self.bot.get_context(message)
+        await self.aircraft_by_icao(ctx, content)
 
     def cog_unload(self):
         try:
             self.check_emergency_squawks.cancel()
+            self.poll_watchlists.cancel()
+            if self._photo_cache_saver is not None:
+                self._photo_cache_saver.cancel()
+            if self.photo_cache.dirty:
+                self.photo_cache.save()
+            self.airports.close()
+            self.bot.loop.create_task(self.session.close())
         except Exception as e:
             print(f"Error unloading cog: {e}")
 
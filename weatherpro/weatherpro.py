@@ -1,10 +1,120 @@
 import discord #type: ignore
 import aiohttp #type: ignore
 import asyncio
-import csv
+import time
+from collections import OrderedDict
 from datetime import datetime
 from redbot.core import commands, Config #type: ignore
 from redbot.core.data_manager import bundled_data_path #type: ignore
+from .zipindex import ZipIndex
+
+ALERT_FETCH_CONCURRENCY = 5  # Parallel requests to api.weather.gov while polling alerts
+ALERT_SEND_CONCURRENCY = 10  # Parallel DM deliveries
+COUNTER_FLUSH_INTERVAL = 300  # Seconds between writing usage counters to config
+CURRENT_CONDITIONS_TTL = 600  # Seconds current conditions are served from memory
+FORECAST_TTL = 3600  # Seconds forecasts are served from memory
+
+
+def point_in_geometry(latitude, longitude, geometry):
+    """Whether a point falls inside a GeoJSON Polygon or MultiPolygon, such as an NWS alert's area."""
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return False
+
+    def in_ring(ring):
+        inside = False
+        for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+            if (y1 > latitude) != (y2 > latitude) and longitude < (x2 - x1) * (latitude - y1) / (y2 - y1) + x1:
+                inside = not inside
+        return inside
+
+    # The first ring is the outline and any others are holes
+    return any(in_ring(polygon[0]) and not any(in_ring(hole) for hole in polygon[1:]) for polygon in polygons)
+
+
+class ResponseCache:
+    """
+    In-memory TTL cache for API responses, keyed by location.
+
+    Concurrent lookups of the same key share one in-flight request, and failed lookups (None) aren't cached.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key, ttl: float, fetch):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        future = self._inflight.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._store(key, ttl, done))
+        else:
+            self.hits += 1
+        # Shielded so one caller giving up doesn't cancel the request for everyone else
+        return await asyncio.shield(future)
+
+    def _store(self, key, ttl, future):
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None or future.result() is None:
+            return
+        self._entries[key] = (time.monotonic() + ttl, future.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class AlertLedger:
+    """
+    Which users have been sent which NWS alerts, so nobody gets the same alert twice.
+
+    Entries are keyed by alert id and dropped once the alert expires, so the ledger only ever
+    holds alerts that are still active.
+    """
+
+    def __init__(self, state=None):
+        self.alerts = {alert_id: (entry["expires"], set(entry["users"])) for alert_id, entry in (state or {}).items()}
+
+    def __contains__(self, key):
+        user_id, alert_id = key
+        entry = self.alerts.get(alert_id)
+        return entry is not None and user_id in entry[1]
+
+    def __len__(self):
+        return sum(len(users) for _, users in self.alerts.values())
+
+    def add(self, user_id, alert):
+        expires = alert['properties'].get('expires') or alert['properties'].get('ends')
+        try:
+            expires = datetime.fromisoformat(expires).timestamp()
+        except (TypeError, ValueError):
+            expires = time.time() + 86400
+        entry = self.alerts.setdefault(alert['id'], (expires, set()))
+        entry[1].add(user_id)
+
+    def prune(self, now=None):
+        """Forget expired alerts, returning how many were dropped."""
+        now = now or time.time()
+        expired = [alert_id for alert_id, (expires, _) in self.alerts.items() if expires <= now]
+        for alert_id in expired:
+            del self.alerts[alert_id]
+        return len(expired)
+
+    def to_config(self):
+        return {alert_id: {"expires": expires, "users": sorted(users)} for alert_id, (expires, users) in self.alerts.items()}
+
 
 class Weather(commands.Cog):
     """It's beautiful out there"""
@@ -22,6 +132,8 @@ class Weather(commands.Cog):
         }
         self.config.register_user(**default_user)
         default_global = {
+            "zip_points": {},
+            "alert_ledger": {},
             "total_alerts_sent": 0,
             "total_heat_alerts_sent": 0,
             "total_freeze_alerts_sent": 0,
@@ -44,22 +156,53 @@ class Weather(commands.Cog):
             "highest_rainfall_date": None,
         }
         self.config.register_global(**default_global)
-        data_dir = bundled_data_path(self)
-        with (data_dir / "zipcodes.csv").open(mode="r") as zip_code_file:
-            csv_reader = csv.reader(zip_code_file)
-            self.zip_codes = {
-                row[0]: (row[1], row[2])
-                for i, row in enumerate(csv_reader)
-                if i != 0
-            }
-        
+        self.pending_counts = {}
+        self.alert_ledger = None
+        self.responses = ResponseCache()
+        self.zip_points = None
+        self.tasks = []
+        self._zip_codes = None
+
+    @property
+    def zip_codes(self):
+        """Zip code to (latitude, longitude), memory-mapped from the prebuilt `zipcodes.bin` on first use."""
+        if self._zip_codes is None:
+            self._zip_codes = ZipIndex.load(bundled_data_path(self) / "zipcodes.bin")
+        return self._zip_codes
+
     def cog_load(self):
-        self.bot.loop.create_task(self.start_severe_alerts_task())
-        self.bot.loop.create_task(self.start_freeze_alerts_task())
-        self.bot.loop.create_task(self.start_heat_alerts_task())
+        self.tasks = [
+            self.bot.loop.create_task(self.start_severe_alerts_task()),
+            self.bot.loop.create_task(self.start_freeze_alerts_task()),
+            self.bot.loop.create_task(self.start_heat_alerts_task()),
+            self.bot.loop.create_task(self.start_counter_flush_task()),
+        ]
 
     def cog_unload(self):
+        for task in self.tasks:
+            task.cancel()
+        self.bot.loop.create_task(self._flush_counters())
         self.bot.loop.create_task(self.session.close())
+        if self._zip_codes is not None:
+            self._zip_codes.close()
+
+    def _count(self, counter, amount=1):
+        """Add to a global usage counter. Counts are held in memory and flushed to config periodically."""
+        self.pending_counts[counter] = self.pending_counts.get(counter, 0) + amount
+
+    async def _counter_total(self, counter):
+        return await self.config.get_attr(counter)() + self.pending_counts.get(counter, 0)
+
+    async def _flush_counters(self):
+        pending, self.pending_counts = self.pending_counts, {}
+        for counter, amount in pending.items():
+            value = self.config.get_attr(counter)
+            await value.set(await value() + amount)
+
+    async def start_counter_flush_task(self):
+        while True:
+            await asyncio.sleep(COUNTER_FLUSH_INTERVAL)
+            await self._flush_counters()
 
     def fahrenheit_to_celsius(self, f):
         result = round((f - 32) * 5.0 / 9.0, 1)
@@ -77,60 +220,6 @@ class Weather(commands.Cog):
         millimeters = inches * 25.4
         return f"{millimeters:.1f}"
     
-    async def check_weather_alerts(self):
-        """Check for weather alerts and DM users if any severe or extreme warnings are issued"""
-        all_users = await self.config.all_users()
-        users_with_alerts = [user_id for user_id, data in all_users.items() if data.get("severealerts")]
-
-        for user_id in users_with_alerts:
-            user_data = await self.config.user_from_id(user_id).all()
-            zip_code = user_data.get("zip_code")
-            if not zip_code or zip_code not in self.zip_codes:
-                continue
-
-            latitude, longitude = self.zip_codes[zip_code]
-            alerts_url = f"https://api.weather.gov/alerts/active?point={latitude.strip()},{longitude.strip()}"
-
-            async with self.session.get(alerts_url) as response:
-                if response.status != 200:
-                    continue
-
-                data = await response.json()
-                alerts = data.get('features', [])
-                severe_alerts = [alert for alert in alerts if alert['properties']['severity'] in ['Severe', 'Extreme']]
-
-                if severe_alerts:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        sent_alerts = user_data.get("sent_alerts", [])
-                        new_alerts = [alert for alert in severe_alerts if alert['id'] not in sent_alerts]
-
-                        if new_alerts:
-                            for alert in new_alerts:
-                                embed = discord.Embed(
-                                    title=alert['properties']['event'],
-                                    description=f"{'An' if alert['properties']['event'][0].lower() in 'aeiou' else 'A'} **{alert['properties']['event']}** was issued at **<t:{int(datetime.fromisoformat(alert['properties']['sent']).timestamp())}:F>** for your location and is in effect until **<t:{int(datetime.fromisoformat(alert['properties']['expires']).timestamp())}:F>**.",
-                                    color=0xff4545
-                                )
-                                if 'instruction' in alert['properties']:
-                                    instruction = alert['properties']['instruction'].replace('\n', ' ').strip()
-                                    embed.add_field(name="Instruction", value=instruction, inline=False)
-                                if 'severity' in alert['properties']:
-                                    embed.add_field(name="Severity", value=alert['properties']['severity'], inline=True)
-                                if 'urgency' in alert['properties']:
-                                    embed.add_field(name="Urgency", value=alert['properties']['urgency'], inline=True)
-                                if 'certainty' in alert['properties']:
-                                    embed.add_field(name="Certainty", value=alert['properties']['certainty'], inline=True)
-                                if 'senderName' in alert['properties']:
-                                    embed.set_footer(text=f"Issued by {alert['properties']['senderName']}")
-
-                                await user.send(embed=embed)
-                                sent_alerts.append(alert['id'])
-
-                            await self.config.user_from_id(user_id).sent_alerts.set(sent_alerts)
-                            total_alerts_sent = await self.config.total_alerts_sent()
-                            await self.config.total_alerts_sent.set(total_alerts_sent + len(new_alerts))
-
     @commands.group()
     async def weather(self, ctx):
         """Fetch current and upcoming conditions, search and explore hundreds of weather-focused words, check alert statistics across the country, and fetch information on observation stations and radar installations"""
@@ -150,80 +239,62 @@ class Weather(commands.Cog):
             await ctx.send("Invalid zip code. Please set a valid zip code.")
             return
         
-        latitude, longitude = self.zip_codes[zip_code]
-        points_url = f"https://api.weather.gov/points/{latitude.strip()},{longitude.strip()}"
+        # The zip's grid cell is looked up once ever, and the cell's forecast is shared for an hour
+        periods = await self._forecast_periods(zip_code)
+        if periods is None:
+            await ctx.send(f"Failed to fetch the forecast data.")
+            return
+        if not periods:
+            await ctx.send(f"Failed to retrieve forecast periods.")
+            return
         
-        # Fetch weather data using the latitude and longitude
-        async with self.session.get(points_url) as response:
-            if response.status != 200:
-                await ctx.send(f"Failed to fetch the weather data. Status Code: {response.status}")
-                return
-
-            data = await response.json()
-            forecast_url = data.get('properties', {}).get('forecast')
-            if not forecast_url:
-                await ctx.send(f"Failed to retrieve forecast URL.")
-                return
+        embeds = []
+        
+        for period in periods[:10]:  # Create a page for each of the next 10 forecast periods
+            name = period.get('name', 'N/A')
+            detailed_forecast = period.get('detailedForecast', 'No detailed forecast available.')
+            temperature = period.get('temperature', 'N/A')
+            if temperature != 'N/A':
+                temperature = f"{temperature}°F"
+            wind_speed = period.get('windSpeed', 'N/A')
+            wind_direction = period.get('windDirection', 'N/A')
             
-            async with self.session.get(forecast_url) as forecast_response:
-                if forecast_response.status != 200:
-                    await ctx.send(f"Failed to fetch the forecast data.")
-                    return
-                
-                forecast_data = await forecast_response.json()
-                periods = forecast_data.get('properties', {}).get('periods', [])
-                if not periods:
-                    await ctx.send(f"Failed to retrieve forecast periods.")
-                    return
-                
-                embeds = []
-                
-                for period in periods[:10]:  # Create a page for each of the next 10 forecast periods
-                    name = period.get('name', 'N/A')
-                    detailed_forecast = period.get('detailedForecast', 'No detailed forecast available.')
-                    temperature = period.get('temperature', 'N/A')
-                    if temperature != 'N/A':
-                        temperature = f"{temperature}°F"
-                    wind_speed = period.get('windSpeed', 'N/A')
-                    wind_direction = period.get('windDirection', 'N/A')
-                    
-                    embed = discord.Embed(
-                        title=f"Weather forecast for {name}",
-                        description=f"{detailed_forecast}",
-                        color=0xfffffe
-                    )
-                    embed.add_field(name="Temperature", value=temperature)
-                    embed.add_field(name="Wind speed", value=wind_speed)
-                    embed.add_field(name="Wind direction", value=wind_direction)
-                    
-                    embeds.append(embed)
-                
-                message = await ctx.send(embed=embeds[0])
-                forecasts_fetched = await self.config.forecasts_fetched()
-                await self.config.forecasts_fetched.set(forecasts_fetched + 1)
-                page = 0
-                await message.add_reaction("⬅️")
-                await message.add_reaction("❌")
-                await message.add_reaction("➡️")
+            embed = discord.Embed(
+                title=f"Weather forecast for {name}",
+                description=f"{detailed_forecast}",
+                color=0xfffffe
+            )
+            embed.add_field(name="Temperature", value=temperature)
+            embed.add_field(name="Wind speed", value=wind_speed)
+            embed.add_field(name="Wind direction", value=wind_direction)
+            
+            embeds.append(embed)
+        
+        message = await ctx.send(embed=embeds[0])
+        self._count("forecasts_fetched")
+        page = 0
+        await message.add_reaction("⬅️")
+        await message.add_reaction("❌")
+        await message.add_reaction("➡️")
 
-                def check(reaction, user):
-                    return user == ctx.author and str(reaction.emoji) in ["⬅️", "➡️", "❌"] and reaction.message.id == message.id
+        def check(reaction, user):
+            return user == ctx.author and str(reaction.emoji) in ["⬅️", "➡️", "❌"] and reaction.message.id == message.id
 
-                while True:
-                    try:
-                        reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
-                        if str(reaction.emoji) == "➡️":
-                            page = (page + 1) % len(embeds)
-                        elif str(reaction.emoji) == "⬅️":
-                            page = (page - 1) % len(embeds)
-                        elif str(reaction.emoji) == "❌":
-                            await message.delete()
-                            break
-                        
-                        await message.edit(embed=embeds[page])
-                        await message.remove_reaction(reaction, user)
-                    except asyncio.TimeoutError:
-                        break
+        while True:
+            try:
+                reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
+                if str(reaction.emoji) == "➡️":
+                    page = (page + 1) % len(embeds)
+                elif str(reaction.emoji) == "⬅️":
+                    page = (page - 1) % len(embeds)
+                elif str(reaction.emoji) == "❌":
+                    await message.delete()
+                    break
+                
+                await message.edit(embed=embeds[page])
+                await message.remove_reaction(reaction, user)
+            except asyncio.TimeoutError:
+                break
 
     @weather.command(name="stats")
     async def stats(self, ctx):
@@ -234,12 +305,12 @@ class Weather(commands.Cog):
             users_with_severe_alerts = sum(1 for user_data in all_users.values() if user_data.get("severealerts"))
             users_with_freeze_alerts = sum(1 for user_data in all_users.values() if user_data.get("freezealerts"))
             users_with_heat_alerts = sum(1 for user_data in all_users.values() if user_data.get("heatalerts"))
-            total_alerts_sent = await self.config.total_alerts_sent()
-            heat_alerts_sent = await self.config.total_heat_alerts_sent()
-            cold_alerts_sent = await self.config.total_freeze_alerts_sent()
-            nowcasts_fetched = await self.config.nowcasts_fetched()
-            forecasts_fetched = await self.config.forecasts_fetched()
-            glossary_definitions_shown = await self.config.glossary_definitions_shown()
+            total_alerts_sent = await self._counter_total("total_alerts_sent")
+            heat_alerts_sent = await self._counter_total("total_heat_alerts_sent")
+            cold_alerts_sent = await self._counter_total("total_freeze_alerts_sent")
+            nowcasts_fetched = await self._counter_total("nowcasts_fetched")
+            forecasts_fetched = await self._counter_total("forecasts_fetched")
+            glossary_definitions_shown = await self._counter_total("glossary_definitions_shown")
 
             usage = discord.Embed(
                 title="Weather usage data",
@@ -256,6 +327,9 @@ class Weather(commands.Cog):
             usage.add_field(name="Nowcasts served", value=f"**{nowcasts_fetched}** nowcast{'s' if nowcasts_fetched != 1 else ''}", inline=True)
             usage.add_field(name="Forecasts served", value=f"**{forecasts_fetched}** forecast{'s' if forecasts_fetched != 1 else ''}", inline=True)
             usage.add_field(name="Glossary terms shown", value=f"**{glossary_definitions_shown}** term{'s' if glossary_definitions_shown != 1 else ''}", inline=True)
+            cache_lookups = self.responses.hits + self.responses.misses
+            if cache_lookups:
+                usage.add_field(name="Cache hit rate", value=f"**{self.responses.hits / cache_lookups:.0%}** of {cache_lookups} lookup{'s' if cache_lookups != 1 else ''}", inline=True)
 
             await ctx.send(embed=usage)
 
@@ -263,20 +337,21 @@ class Weather(commands.Cog):
     async def records(self, ctx):
         """Show historical weather records"""
         async with ctx.typing():
-            highest_temperature = await self.config.highest_temperature()
-            highest_temperature_date = await self.config.highest_temperature_date()
-            lowest_temperature = await self.config.lowest_temperature()
-            lowest_temperature_date = await self.config.lowest_temperature_date()
-            highest_wind_speed = await self.config.highest_wind_speed()
-            highest_wind_speed_date = await self.config.highest_wind_speed_date()
-            highest_precipitation = await self.config.highest_precipitation()
-            highest_precipitation_date = await self.config.highest_precipitation_date()
-            highest_wind_gusts = await self.config.highest_wind_gusts()
-            highest_wind_gusts_date = await self.config.highest_wind_gusts_date()
-            highest_snowfall = await self.config.highest_snowfall()
-            highest_snowfall_date = await self.config.highest_snowfall_date()
-            highest_rainfall = await self.config.highest_rainfall()
-            highest_rainfall_date = await self.config.highest_rainfall_date()
+            records = await self.config.all()
+            highest_temperature = records['highest_temperature']
+            highest_temperature_date = records['highest_temperature_date']
+            lowest_temperature = records['lowest_temperature']
+            lowest_temperature_date = records['lowest_temperature_date']
+            highest_wind_speed = records['highest_wind_speed']
+            highest_wind_speed_date = records['highest_wind_speed_date']
+            highest_precipitation = records['highest_precipitation']
+            highest_precipitation_date = records['highest_precipitation_date']
+            highest_wind_gusts = records['highest_wind_gusts']
+            highest_wind_gusts_date = records['highest_wind_gusts_date']
+            highest_snowfall = records['highest_snowfall']
+            highest_snowfall_date = records['highest_snowfall_date']
+            highest_rainfall = records['highest_rainfall']
+            highest_rainfall_date = records['highest_rainfall_date']
 
             history = discord.Embed(title="Historical records", description="Records observed by the bot that users experienced in real life. Check the weather often to update statistics.", color=0xfffffe)
             history.add_field(name="Highest temperature", value=f"**{highest_temperature}°F** • {self.fahrenheit_to_celsius(highest_temperature)}°C\n**<t:{int(datetime.fromisoformat(str(highest_temperature_date)).timestamp())}:D>**" if highest_temperature is not None and highest_temperature_date is not None else "N/A", inline=True)
@@ -326,8 +401,8 @@ class Weather(commands.Cog):
             # Fetch current weather data using the latitude and longitude
             url = "https://api.open-meteo.com/v1/forecast"
             params = {
-                "latitude": str(latitude).strip(),
-                "longitude": str(longitude).strip(),
+                "latitude": f"{latitude:.4f}",
+                "longitude": f"{longitude:.4f}",
                 "current": "temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,rain,showers,snowfall,cloud_cover,pressure_msl,surface_pressure,wind_speed_10m,wind_direction_10m,wind_gusts_10m",
                 "hourly": "uv_index,cape,direct_radiation_instant,soil_temperature_0cm",
                 "minutely_15": "lightning_potential,visibility,soil_moisture_0_to_1cm",
@@ -341,276 +416,274 @@ class Weather(commands.Cog):
             queryString = "&".join(f"{key}={value}" for key, value in params.items())
             weather_url = f"{url}?{queryString}"
             
-            async with self.session.get(weather_url) as response:
-                if response.status != 200:
-                    await ctx.send(f"Failed to fetch the weather data. URL: {weather_url}, Status Code: {response.status}")
-                    return
-
-                data = await response.json()
-                if not data:
-                    await ctx.send(f"Failed to retrieve current weather data. URL: {weather_url}, Data: {data}")
-                    return
-                
-                current = data.get('current', {})
-                hourly = data.get('hourly', {})
-                minutely_15 = data.get('minutely_15', {})
-                
-                embed = discord.Embed(
-                    title=f"Current conditions",
-                    color=0xfffffe
-                )
-                temperature = current.get('temperature_2m', 'N/A')
-                embed.add_field(name="Temperature", value=f"**{temperature}°F** • {self.fahrenheit_to_celsius(temperature)}°C")
-                embed.add_field(name="Feels like", value=f"**{current.get('apparent_temperature', 'N/A')}°F** • {self.fahrenheit_to_celsius(current.get('apparent_temperature', 'N/A'))}°C")
-
-                ground_temp = hourly.get('soil_temperature_0cm', 'N/A')
-                if isinstance(ground_temp, list) and ground_temp:
-                    ground_temp = ground_temp[0]
-                embed.add_field(name="Ground temperature", value=f"**{ground_temp}°F** • {self.fahrenheit_to_celsius(ground_temp)}°C")
-
-                wind_direction = current.get('wind_direction_10m', 'N/A')
-                if wind_direction != 'N/A':
-                    if (wind_direction >= 0 and wind_direction <= 22.5) or (wind_direction > 337.5 and wind_direction <= 360):
-                        wind_direction_str = 'North'
-                    elif wind_direction > 22.5 and wind_direction <= 67.5:
-                        wind_direction_str = 'Northeast'
-                    elif wind_direction > 67.5 and wind_direction <= 112.5:
-                        wind_direction_str = 'East'
-                    elif wind_direction > 112.5 and wind_direction <= 157.5:
-                        wind_direction_str = 'Southeast'
-                    elif wind_direction > 157.5 and wind_direction <= 202.5:
-                        wind_direction_str = 'South'
-                    elif wind_direction > 202.5 and wind_direction <= 247.5:
-                        wind_direction_str = 'Southwest'
-                    elif wind_direction > 247.5 and wind_direction <= 292.5:
-                        wind_direction_str = 'West'
-                    else:
-                        wind_direction_str = 'Northwest'
-                else:
-                    wind_direction_str = 'N/A'
-                embed.add_field(name="Wind direction", value=wind_direction_str)
-
-                wind_speed = current.get('wind_speed_10m', 'N/A')
-                if wind_speed != 'N/A':
-                    wind_speed_knots = self.mph_to_knots(wind_speed)
-                    embed.add_field(name="Wind speed", value=f"**{wind_speed} mph** • {wind_speed_knots} kts")
-
-                wind_gusts = current.get('wind_gusts_10m', 'N/A')
-                if wind_gusts != 'N/A':
-                    wind_gusts_knots = self.mph_to_knots(wind_gusts)
-                    embed.add_field(name="Wind gusts", value=f"**{wind_gusts} mph** • {wind_gusts_knots} kts")
-                
-                embed.add_field(name="Humidity", value=f"{current.get('relative_humidity_2m', 'N/A')}%")
-                
-                precipitation = current.get('precipitation', 'N/A')
-                if precipitation != 'N/A' and precipitation != 0.0:
-                    embed.add_field(name="Precipitation", value=f"{precipitation} inches")
-                
-                rain = current.get('rain', 'N/A')
-                if rain != 'N/A' and rain != 0.0:
-                    embed.add_field(name="Rain", value=f"{rain} inches")
-                
-                showers = current.get('showers', 'N/A')
-                if showers != 'N/A' and showers != 0.0:
-                    embed.add_field(name="Showers", value=f"{showers} inches")
-                
-                snowfall = current.get('snowfall', 'N/A')
-                if snowfall != 'N/A' and snowfall != 0.0:
-                    embed.add_field(name="Snowfall", value=f"{snowfall} inches")
-                
-                embed.add_field(name="Cloud cover", value=f"{current.get('cloud_cover', 'N/A')}%")
-
-                visibility = minutely_15.get('visibility', [0])
-                if isinstance(visibility, list) and visibility:
-                    visibility_value_miles = visibility[0] / 5280
-                    visibility_value_meters = float(self.miles_to_meters(visibility_value_miles))
-                    if visibility_value_meters < 1000:
-                        visibility_str = f"{visibility_value_meters:.1f} m"
-                    else:
-                        visibility_value_km = visibility_value_meters / 1000
-                        visibility_str = f"{visibility_value_km:.1f} km"
+            # Conditions are shared by everyone in the same forecast grid cell for a few minutes
+            point = (await self._zip_points([zip_code])).get(zip_code)
+            cell = point["grid"] if point else f"{latitude:.2f},{longitude:.2f}"
+            data = await self.responses.get(("current", cell), CURRENT_CONDITIONS_TTL, lambda: self._fetch_json(weather_url))
+            if not data:
+                await ctx.send(f"Failed to fetch the weather data. URL: {weather_url}")
+                return
+            
+            current = data.get('current', {})
+            hourly = data.get('hourly', {})
+            minutely_15 = data.get('minutely_15', {})
+            
+            embed = discord.Embed(
+                title=f"Current conditions",
+                color=0xfffffe
+            )
+            temperature = current.get('temperature_2m', 'N/A')
+            embed.add_field(name="Temperature", value=f"**{temperature}°F** • {self.fahrenheit_to_celsius(temperature)}°C")
+            embed.add_field(name="Feels like", value=f"**{current.get('apparent_temperature', 'N/A')}°F** • {self.fahrenheit_to_celsius(current.get('apparent_temperature', 'N/A'))}°C")
+
+            ground_temp = hourly.get('soil_temperature_0cm', 'N/A')
+            if isinstance(ground_temp, list) and ground_temp:
+                ground_temp = ground_temp[0]
+            embed.add_field(name="Ground temperature", value=f"**{ground_temp}°F** • {self.fahrenheit_to_celsius(ground_temp)}°C")
+
+            wind_direction = current.get('wind_direction_10m', 'N/A')
+            if wind_direction != 'N/A':
+                if (wind_direction >= 0 and wind_direction <= 22.5) or (wind_direction > 337.5 and wind_direction <= 360):
+                    wind_direction_str = 'North'
+                elif wind_direction > 22.5 and wind_direction <= 67.5:
+                    wind_direction_str = 'Northeast'
+                elif wind_direction > 67.5 and wind_direction <= 112.5:
+                    wind_direction_str = 'East'
+                elif wind_direction > 112.5 and wind_direction <= 157.5:
+                    wind_direction_str = 'Southeast'
+                elif wind_direction > 157.5 and wind_direction <= 202.5:
+                    wind_direction_str = 'South'
+                elif wind_direction > 202.5 and wind_direction <= 247.5:
+                    wind_direction_str = 'Southwest'
+                elif wind_direction > 247.5 and wind_direction <= 292.5:
+                    wind_direction_str = 'West'
                 else:
-                    visibility_value_miles = 0
-                    visibility_str = "0.0 miles"
-                embed.add_field(name="Visibility", value=f"{visibility_value_miles:.2f} mi • {visibility_str}")
-
-                embed.add_field(name="Pressure (MSL)", value=f"{current.get('pressure_msl', 'N/A')} hPa")
-                embed.add_field(name="Surface pressure", value=f"{current.get('surface_pressure', 'N/A')} hPa")
-                
-                lightning_potential = minutely_15.get('lightning_potential', [None])
-                if isinstance(lightning_potential, list) and lightning_potential:
-                    lightning_potential = lightning_potential[0]
-                if lightning_potential is None or lightning_potential == 0:
-                    lightning_potential_str = 'None'
-                elif lightning_potential < 500:
-                    lightning_potential_str = 'Low'
-                elif lightning_potential < 1000:
-                    lightning_potential_str = 'Medium'
-                elif lightning_potential < 2000:
-                    lightning_potential_str = 'High'
+                    wind_direction_str = 'Northwest'
+            else:
+                wind_direction_str = 'N/A'
+            embed.add_field(name="Wind direction", value=wind_direction_str)
+
+            wind_speed = current.get('wind_speed_10m', 'N/A')
+            if wind_speed != 'N/A':
+                wind_speed_knots = self.mph_to_knots(wind_speed)
+                embed.add_field(name="Wind speed", value=f"**{wind_speed} mph** • {wind_speed_knots} kts")
+
+            wind_gusts = current.get('wind_gusts_10m', 'N/A')
+            if wind_gusts != 'N/A':
+                wind_gusts_knots = self.mph_to_knots(wind_gusts)
+                embed.add_field(name="Wind gusts", value=f"**{wind_gusts} mph** • {wind_gusts_knots} kts")
+            
+            embed.add_field(name="Humidity", value=f"{current.get('relative_humidity_2m', 'N/A')}%")
+            
+            precipitation = current.get('precipitation', 'N/A')
+            if precipitation != 'N/A' and precipitation != 0.0:
+                embed.add_field(name="Precipitation", value=f"{precipitation} inches")
+            
+            rain = current.get('rain', 'N/A')
+            if rain != 'N/A' and rain != 0.0:
+                embed.add_field(name="Rain", value=f"{rain} inches")
+            
+            showers = current.get('showers', 'N/A')
+            if showers != 'N/A' and showers != 0.0:
+                embed.add_field(name="Showers", value=f"{showers} inches")
+            
+            snowfall = current.get('snowfall', 'N/A')
+            if snowfall != 'N/A' and snowfall != 0.0:
+                embed.add_field(name="Snowfall", value=f"{snowfall} inches")
+            
+            embed.add_field(name="Cloud cover", value=f"{current.get('cloud_cover', 'N/A')}%")
+
+            visibility = minutely_15.get('visibility', [0])
+            if isinstance(visibility, list) and visibility:
+                visibility_value_miles = visibility[0] / 5280
+                visibility_value_meters = float(self.miles_to_meters(visibility_value_miles))
+                if visibility_value_meters < 1000:
+                    visibility_str = f"{visibility_value_meters:.1f} m"
                 else:
-                    lightning_potential_str = 'Extreme'
-                embed.add_field(name="Lightning potential", value=f"{lightning_potential_str}")
-                
-                # Fetch severe and extreme weather alerts
-                alerts_url = f"https://api.weather.gov/alerts/active?point={latitude.strip()},{longitude.strip()}"
-                async with self.session.get(alerts_url) as alerts_response:
-                    try:
-                        alerts_response.raise_for_status()
-                        alerts_data = await alerts_response.json()
-                        alerts = alerts_data.get('features', [])
-                        if alerts:
-                            embed.set_footer(text="When thunder roars, go indoors. If you can hear thunder, you can be struck by lightning.")
-                            alert_titles = []
-                            event_emojis = {
-                                "Tornado Warning": ":cloud_tornado:",
-                                "Severe Thunderstorm Warning": ":thunder_cloud_rain:",
-                                "Flood Warning": ":ocean:",
-                                "Flood Watch": ":ocean:",
-                                "Heat Advisory": ":desert:",
-                                "Special Weather Statement": ":information_source:",
-                                "Winter Storm Warning": ":cloud_snow:",
-                                "High Wind Warning": ":wind_blowing_face:",
-                                "Excessive Heat Warning": ":thermometer:",
-                                "Fire Weather Watch": ":fire:",
-                                "Flood Advisory": ":ocean:",
-                                "Hurricane Warning": ":cyclone:",
-                                "Tsunami Warning": ":ocean:",
-                                "Earthquake Warning": ":earth_americas:",
-                                "Blizzard Warning": ":snowflake:",
-                                "Freeze Warning": ":snowflake:",
-                                "Dust Storm Warning": ":dash:",
-                                "Extreme Cold Warning": ":cold_face:",
-                                "Extreme Heat Warning": ":hot_face:",
-                                "Gale Warning": ":wind_face:",
-                                "Ice Storm Warning": ":ice_cube:",
-                                "Red Flag Warning": ":triangular_flag_on_post:",
-                                "Severe Weather Statement": ":cloud_with_lightning_and_rain:",
-                                "Special Marine Warning": ":anchor:",
-                                "Storm Surge Warning": ":ocean:",
-                                "Tropical Storm Warning": ":thunder_cloud_rain:",
-                                "Tropical Cyclone Statement": ":cyclone:",
-                                "Volcano Warning": ":volcano:",
-                                "Flash Flood Warning": ":ocean:",
-                                "Frost Advisory": ":snowflake:",
-                                "Hydrologic Outlook": ":notepad_spiral:",
-                                "Rip Current Statement": ":ocean:",
-                                "Mandatory evacuation order": ":person_running:",
-                                "Air Quality Alert": ":face_in_clouds:",
-                                "Coastal Flood Warning": ":beach_umbrella:",
-                                # Add more event types and corresponding emojis as needed
-                            }
-                            event_transformations = {
-                                "Evacuation - Immediate": "Mandatory evacuation order",
-                                # Add more event transformations as needed
-                            }
-                            for alert in alerts:
-                                event = alert['properties']['event']
-                                event = event_transformations.get(event, event)  # Transform event name if applicable
-                                emoji = event_emojis.get(event, ":warning:")  # Default to warning emoji if event not found
-                                expires = alert['properties'].get('expires')
-                                if expires:
+                    visibility_value_km = visibility_value_meters / 1000
+                    visibility_str = f"{visibility_value_km:.1f} km"
+            else:
+                visibility_value_miles = 0
+                visibility_str = "0.0 miles"
+            embed.add_field(name="Visibility", value=f"{visibility_value_miles:.2f} mi • {visibility_str}")
+
+            embed.add_field(name="Pressure (MSL)", value=f"{current.get('pressure_msl', 'N/A')} hPa")
+            embed.add_field(name="Surface pressure", value=f"{current.get('surface_pressure', 'N/A')} hPa")
+            
+            lightning_potential = minutely_15.get('lightning_potential', [None])
+            if isinstance(lightning_potential, list) and lightning_potential:
+                lightning_potential = lightning_potential[0]
+            if lightning_potential is None or lightning_potential == 0:
+                lightning_potential_str = 'None'
+            elif lightning_potential < 500:
+                lightning_potential_str = 'Low'
+            elif lightning_potential < 1000:
+                lightning_potential_str = 'Medium'
+            elif lightning_potential < 2000:
+                lightning_potential_str = 'High'
+            else:
+                lightning_potential_str = 'Extreme'
+            embed.add_field(name="Lightning potential", value=f"{lightning_potential_str}")
+            
+            # Fetch severe and extreme weather alerts
+            alerts_url = f"https://api.weather.gov/alerts/active?point={latitude:.4f},{longitude:.4f}"
+            async with self.session.get(alerts_url) as alerts_response:
+                try:
+                    alerts_response.raise_for_status()
+                    alerts_data = await alerts_response.json()
+                    alerts = alerts_data.get('features', [])
+                    if alerts:
+                        embed.set_footer(text="When thunder roars, go indoors. If you can hear thunder, you can be struck by lightning.")
+                        alert_titles = []
+                        event_emojis = {
+                            "Tornado Warning": ":cloud_tornado:",
+                            "Severe Thunderstorm Warning": ":thunder_cloud_rain:",
+                            "Flood Warning": ":ocean:",
+                            "Flood Watch": ":ocean:",
+                            "Heat Advisory": ":desert:",
+                            "Special Weather Statement": ":information_source:",
+                            "Winter Storm Warning": ":cloud_snow:",
+                            "High Wind Warning": ":wind_blowing_face:",
+                            "Excessive Heat Warning": ":thermometer:",
+                            "Fire Weather Watch": ":fire:",
+                            "Flood Advisory": ":ocean:",
+                            "Hurricane Warning": ":cyclone:",
+                            "Tsunami Warning": ":ocean:",
+                            "Earthquake Warning": ":earth_americas:",
+                            "Blizzard Warning": ":snowflake:",
+                            "Freeze Warning": ":snowflake:",
+                            "Dust Storm Warning": ":dash:",
+                            "Extreme Cold Warning": ":cold_face:",
+                            "Extreme Heat Warning": ":hot_face:",
+                            "Gale Warning": ":wind_face:",
+                            "Ice Storm Warning": ":ice_cube:",
+                            "Red Flag Warning": ":triangular_flag_on_post:",
+                            "Severe Weather Statement": ":cloud_with_lightning_and_rain:",
+                            "Special Marine Warning": ":anchor:",
+                            "Storm Surge Warning": ":ocean:",
+                            "Tropical Storm Warning": ":thunder_cloud_rain:",
+                            "Tropical Cyclone Statement": ":cyclone:",
+                            "Volcano Warning": ":volcano:",
+                            "Flash Flood Warning": ":ocean:",
+                            "Frost Advisory": ":snowflake:",
+                            "Hydrologic Outlook": ":notepad_spiral:",
+                            "Rip Current Statement": ":ocean:",
+                            "Mandatory evacuation order": ":person_running:",
+                            "Air Quality Alert": ":face_in_clouds:",
+                            "Coastal Flood Warning": ":beach_umbrella:",
+                            # Add more event types and corresponding emojis as needed
+                        }
+                        event_transformations = {
+                            "Evacuation - Immediate": "Mandatory evacuation order",
+                            # Add more event transformations as needed
+                        }
+                        for alert in alerts:
+                            event = alert['properties']['event']
+                            event = event_transformations.get(event, event)  # Transform event name if applicable
+                            emoji = event_emojis.get(event, ":warning:")  # Default to warning emoji if event not found
+                            expires = alert['properties'].get('expires')
+                            if expires:
+                                try:
+                                    expires_timestamp = f"<t:{int(datetime.fromisoformat(expires[:-1]).timestamp())}:R>"
+                                except ValueError:
+                                    # Attempt to correct the timestamp format
                                     try:
-                                        expires_timestamp = f"<t:{int(datetime.fromisoformat(expires[:-1]).timestamp())}:R>"
-                                    except ValueError:
-                                        # Attempt to correct the timestamp format
-                                        try:
-                                            corrected_expires = expires + '0'  # Adding missing zero
-                                            expires_timestamp = f"<t:{int(datetime.fromisoformat(corrected_expires[:-1]).timestamp())}:R>"
-                                        except ValueError as ve:
-                                            expires_timestamp = f"Invalid expiry time format: {expires}"
-                                    alert_titles.append(f"{emoji} **{event}** expiring **{expires_timestamp}**")
-                                else:
-                                    alert_titles.append(f"{emoji} **{event}**")
-                            alert_status = "\n".join(alert_titles)
-                        else:
-                            alert_status = "None right now - **#It'sAmazingOutThere**"
-                    except Exception as e:
-                        alert_status = f"Failed to fetch alerts: {str(e)}, url={alerts_url}"
-                
-                embed.add_field(name="Active alerts", value=alert_status, inline=False)
-
-                # Check if OpenAI key is set and generate AI weather summary
-                tokens = await self.bot.get_shared_api_tokens("openai")
-                openai_key = tokens.get("api_key") if tokens else None
-                if openai_key:
-                    openai_url = "https://api.openai.com/v1/chat/completions"
-                    headers = {
-                        "Authorization": f"Bearer {openai_key}",
-                        "Content-Type": "application/json"
-                    }
-                    messages = [
-                        {"role": "system", "content": "You are a virtual meteorologist built into an app. Never talk about the location the data comes from or the time. Always respond in conversational text, giving recommendations based on conditions where appropriate."},
-                        {"role": "user", "content": f"Generate a summary of the current weather conditions based on the following data: {data}"}
-                    ]
-                    openai_payload = {
-                        "model": "gpt-4o-mini",
-                        "messages": messages,
-                        "max_tokens": 250,
-                        "temperature": 1.0
-                    }
-                    async with self.session.post(openai_url, headers=headers, json=openai_payload) as openai_response:
-                        if openai_response.status == 200:
-                            openai_data = await openai_response.json()
-                            ai_summary = openai_data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-                            embed.add_field(name="AI weather summary", value=ai_summary, inline=False)
-                        else:
-                            pass
-
-                await ctx.send(embed=embed)
-                nowcasts_fetched = await self.config.nowcasts_fetched()
-                await self.config.nowcasts_fetched.set(nowcasts_fetched + 1)
-
-                # Update highest and lowest values
-                highest_temperature = await self.config.highest_temperature()
-                highest_temperature_date = await self.config.highest_temperature_date()
-                lowest_temperature = await self.config.lowest_temperature()
-                lowest_temperature_date = await self.config.lowest_temperature_date()
-                highest_wind_speed = await self.config.highest_wind_speed()
-                highest_wind_speed_date = await self.config.highest_wind_speed_date()
-                highest_precipitation = await self.config.highest_precipitation()
-                highest_precipitation_date = await self.config.highest_precipitation_date()
-                highest_wind_gusts = await self.config.highest_wind_gusts()
-                highest_wind_gusts_date = await self.config.highest_wind_gusts_date()
-                highest_snowfall = await self.config.highest_snowfall()
-                highest_snowfall_date = await self.config.highest_snowfall_date()
-                highest_rainfall = await self.config.highest_rainfall()
-                highest_rainfall_date = await self.config.highest_rainfall_date()
-
-                current_date = datetime.now().isoformat()
-
-                if temperature != 'N/A':
-                    if highest_temperature is None or temperature > highest_temperature:
-                        await self.config.highest_temperature.set(temperature)
-                        await self.config.highest_temperature_date.set(current_date)
-                    if lowest_temperature is None or temperature < lowest_temperature:
-                        await self.config.lowest_temperature.set(temperature)
-                        await self.config.lowest_temperature_date.set(current_date)
-
-                if wind_speed != 'N/A':
-                    if highest_wind_speed is None or wind_speed > highest_wind_speed:
-                        await self.config.highest_wind_speed.set(wind_speed)
-                        await self.config.highest_wind_speed_date.set(current_date)
-
-                if wind_gusts != 'N/A':
-                    if highest_wind_gusts is None or wind_gusts > highest_wind_gusts:
-                        await self.config.highest_wind_gusts.set(wind_gusts)
-                        await self.config.highest_wind_gusts_date.set(current_date)
-
-                if precipitation != 'N/A' and precipitation != 0.0:
-                    if highest_precipitation is None or precipitation > highest_precipitation:
-                        await self.config.highest_precipitation.set(precipitation)
-                        await self.config.highest_precipitation_date.set(current_date)
-
-                if snowfall != 'N/A' and snowfall != 0.0:
-                    if highest_snowfall is None or snowfall > highest_snowfall:
-                        await self.config.highest_snowfall.set(snowfall)
-                        await self.config.highest_snowfall_date.set(current_date)
-
-                if showers != 'N/A' and showers != 0.0:
-                    if highest_rainfall is None or showers > highest_rainfall:
-                        await self.config.highest_rainfall.set(showers)
-                        await self.config.highest_rainfall_date.set(current_date)
+                                        corrected_expires = expires + '0'  # Adding missing zero
+                                        expires_timestamp = f"<t:{int(datetime.fromisoformat(corrected_expires[:-1]).timestamp())}:R>"
+                                    except ValueError as ve:
+                                        expires_timestamp = f"Invalid expiry time format: {expires}"
+                                alert_titles.append(f"{emoji} **{event}** expiring **{expires_timestamp}**")
+                            else:
+                                alert_titles.append(f"{emoji} **{event}**")
+                        alert_status = "\n".join(alert_titles)
+                    else:
+                        alert_status = "None right now - **#It'sAmazingOutThere**"
+                except Exception as e:
+                    alert_status = f"Failed to fetch alerts: {str(e)}, url={alerts_url}"
+            
+            embed.add_field(name="Active alerts", value=alert_status, inline=False)
+
+            # Check if OpenAI key is set and generate AI weather summary
+            tokens = await self.bot.get_shared_api_tokens("openai")
+            openai_key = tokens.get("api_key") if tokens else None
+            if openai_key:
+                openai_url = "https://api.openai.com/v1/chat/completions"
+                headers = {
+                    "Authorization": f"Bearer {openai_key}",
+                    "Content-Type": "application/json"
+                }
+                messages = [
+                    {"role": "system", "content": "You are a virtual meteorologist built into an app. Never talk about the location the data comes from or the time. Always respond in conversational text, giving recommendations based on conditions where appropriate."},
+                    {"role": "user", "content": f"Generate a summary of the current weather conditions based on the following data: {data}"}
+                ]
+                openai_payload = {
+                    "model": "gpt-4o-mini",
+                    "messages": messages,
+                    "max_tokens": 250,
+                    "temperature": 1.0
+                }
+                async with self.session.post(openai_url, headers=headers, json=openai_payload) as openai_response:
+                    if openai_response.status == 200:
+                        openai_data = await openai_response.json()
+                        ai_summary = openai_data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+                        embed.add_field(name="AI weather summary", value=ai_summary, inline=False)
+                    else:
+                        pass
+
+            await ctx.send(embed=embed)
+            self._count("nowcasts_fetched")
+
+            # Update highest and lowest values
+            records = await self.config.all()
+            highest_temperature = records['highest_temperature']
+            highest_temperature_date = records['highest_temperature_date']
+            lowest_temperature = records['lowest_temperature']
+            lowest_temperature_date = records['lowest_temperature_date']
+            highest_wind_speed = records['highest_wind_speed']
+            highest_wind_speed_date = records['highest_wind_speed_date']
+            highest_precipitation = records['highest_precipitation']
+            highest_precipitation_date = records['highest_precipitation_date']
+            highest_wind_gusts = records['highest_wind_gusts']
+            highest_wind_gusts_date = records['highest_wind_gusts_date']
+            highest_snowfall = records['highest_snowfall']
+            highest_snowfall_date = records['highest_snowfall_date']
+            highest_rainfall = records['highest_rainfall']
+            highest_rainfall_date = records['highest_rainfall_date']
+
+            current_date = datetime.now().isoformat()
+
+            if temperature != 'N/A':
+                if highest_temperature is None or temperature > highest_temperature:
+                    await self.config.highest_temperature.set(temperature)
+                    await self.config.highest_temperature_date.set(current_date)
+                if lowest_temperature is None or temperature < lowest_temperature:
+                    await self.config.lowest_temperature.set(temperature)
+                    await self.config.lowest_temperature_date.set(current_date)
+
+            if wind_speed != 'N/A':
+                if highest_wind_speed is None or wind_speed > highest_wind_speed:
+                    await self.config.highest_wind_speed.set(wind_speed)
+                    await self.config.highest_wind_speed_date.set(current_date)
+
+            if wind_gusts != 'N/A':
+                if highest_wind_gusts is None or wind_gusts > highest_wind_gusts:
+                    await self.config.highest_wind_gusts.set(wind_gusts)
+                    await self.config.highest_wind_gusts_date.set(current_date)
+
+            if precipitation != 'N/A' and precipitation != 0.0:
+                if highest_precipitation is None or precipitation > highest_precipitation:
+                    await self.config.highest_precipitation.set(precipitation)
+                    await self.config.highest_precipitation_date.set(current_date)
+
+            if snowfall != 'N/A' and snowfall != 0.0:
+                if highest_snowfall is None or snowfall > highest_snowfall:
+                    await self.config.highest_snowfall.set(snowfall)
+                    await self.config.highest_snowfall_date.set(current_date)
+
+            if showers != 'N/A' and showers != 0.0:
+                if highest_rainfall is None or showers > highest_rainfall:
+                    await self.config.highest_rainfall.set(showers)
+                    await self.config.highest_rainfall_date.set(current_date)
 
     @commands.guild_only()
     @weather.command(name="glossary")
@@ -675,8 +748,7 @@ class Weather(commands.Cog):
                 return
 
             message = await ctx.send(embed=pages[0])
-            glossary_definitions_shown = await self.config.glossary_definitions_shown()
-            await self.config.glossary_definitions_shown.set(glossary_definitions_shown + 1)
+            self._count("glossary_definitions_shown")
             await message.add_reaction("⬅️")
             await message.add_reaction("➡️")
             await message.add_reaction("❌")  # Add a close reaction
@@ -698,14 +770,12 @@ class Weather(commands.Cog):
                     if i > 0:
                         i -= 1
                         await message.edit(embed=pages[i])
-                        glossary_definitions_shown = await self.config.glossary_definitions_shown()
-                        await self.config.glossary_definitions_shown.set(glossary_definitions_shown + 1)
+                        self._count("glossary_definitions_shown")
                 elif str(reaction) == "➡️":
                     if i < len(pages) - 1:
                         i += 1
                         await message.edit(embed=pages[i])
-                        glossary_definitions_shown = await self.config.glossary_definitions_shown()
-                        await self.config.glossary_definitions_shown.set(glossary_definitions_shown + 1)
+                        self._count("glossary_definitions_shown")
                 elif str(reaction) == "❌":
                     await message.delete()
                     break
@@ -1138,62 +1208,189 @@ class Weather(commands.Cog):
             await self.config.user(user).severealerts.set(False)
             await ctx.send("Weather alerts have been disabled.")
 
-    async def check_weather_alerts(self):
-        """Check for weather alerts and DM users if any severe or extreme warnings are issued"""
-        all_users = await self.config.all_users()
-        users_with_alerts = [user_id for user_id, data in all_users.items() if data.get("severealerts")]
+    def _subscribers(self, all_users, setting):
+        """Ids of users with `setting` enabled and a known zip code, grouped by zip code."""
+        subscribers = {}
+        for user_id, data in all_users.items():
+            zip_code = data.get("zip_code")
+            if data.get(setting) and zip_code in self.zip_codes:
+                subscribers.setdefault(zip_code, []).append(user_id)
+        return subscribers
+
+    async def _send_dms(self, deliveries):
+        """
+        DM each `(user_id, embeds)` pair concurrently, returning how many embeds reached each user.
+
+        A user's embeds go out in order and stop at the first failure, such as closed DMs.
+        """
+        semaphore = asyncio.Semaphore(ALERT_SEND_CONCURRENCY)
+
+        async def deliver(user_id, embeds):
+            user = self.bot.get_user(user_id)
+            delivered = 0
+            if user is None:
+                return user_id, delivered
+            async with semaphore:
+                for embed in embeds:
+                    try:
+                        await user.send(embed=embed)
+                    except discord.HTTPException:
+                        break
+                    delivered += 1
+            return user_id, delivered
 
-        for user_id in users_with_alerts:
-            user_data = await self.config.user_from_id(user_id).all()
-            zip_code = user_data.get("zip_code")
-            if not zip_code or zip_code not in self.zip_codes:
-                continue
+        return dict(await asyncio.gather(*(deliver(user_id, embeds) for user_id, embeds in deliveries)))
 
+    def _severe_alert_embed(self, alert):
+        properties = alert['properties']
+        embed = discord.Embed(
+            title=properties['event'],
+            description=f"{'An' if properties['event'][0].lower() in 'aeiou' else 'A'} **{properties['event']}** was issued at **<t:{int(datetime.fromisoformat(properties['sent']).timestamp())}:F>** for your location and is in effect until **<t:{int(datetime.fromisoformat(properties['expires']).timestamp())}:F>**.",
+            color=0xff4545
+        )
+        if properties.get('instruction'):
+            embed.add_field(name="Instruction", value=properties['instruction'][:1024], inline=False)
+        if 'severity' in properties:
+            embed.add_field(name="Severity", value=properties['severity'], inline=True)
+        if 'urgency' in properties:
+            embed.add_field(name="Urgency", value=properties['urgency'], inline=True)
+        if 'certainty' in properties:
+            embed.add_field(name="Certainty", value=properties['certainty'], inline=True)
+        if 'senderName' in properties:
+            embed.set_footer(text=f"Issued by {properties['senderName']}")
+        return embed
+
+    async def _fetch_json(self, url, **kwargs):
+        """GET a JSON document, or None if the request fails."""
+        try:
+            async with self.session.get(url, **kwargs) as response:
+                if response.status != 200:
+                    return None
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+
+    async def _zip_points(self, zip_codes):
+        """
+        NWS point metadata for each zip: forecast zone and county codes (e.g. `["TXZ192", "TXC113"]`),
+        the forecast grid cell and its forecast URLs.
+
+        None of it ever changes for a zip, so `/points` is called once per zip and the result kept in config.
+        """
+        if self.zip_points is None:
+            self.zip_points = await self.config.zip_points()
+        known = self.zip_points
+        missing = [zip_code for zip_code in zip_codes if "forecast" not in known.get(zip_code, {})]
+        semaphore = asyncio.Semaphore(ALERT_FETCH_CONCURRENCY)
+
+        async def lookup(zip_code):
             latitude, longitude = self.zip_codes[zip_code]
-            alerts_url = f"https://api.weather.gov/alerts/active?point={latitude.strip()},{longitude.strip()}"
+            async with semaphore:
+                data = await self.responses.get(("points", zip_code), FORECAST_TTL, lambda: self._fetch_json(f"https://api.weather.gov/points/{latitude:.4f},{longitude:.4f}"))
+            if not data:
+                return zip_code, None
+            properties = data.get('properties', {})
+            return zip_code, {
+                "zones": [properties[key].rsplit('/', 1)[-1] for key in ('forecastZone', 'county', 'fireWeatherZone') if properties.get(key)],
+                "grid": f"{properties.get('gridId')}/{properties.get('gridX')},{properties.get('gridY')}",
+                "forecast": properties.get('forecast'),
+                "forecastHourly": properties.get('forecastHourly'),
+            }
 
-            async with self.session.get(alerts_url) as response:
-                if response.status != 200:
-                    continue
+        found = {zip_code: point for zip_code, point in await asyncio.gather(*(lookup(zip_code) for zip_code in missing)) if point}
+        if found:
+            known.update(found)
+            async with self.config.zip_points() as zip_points:
+                zip_points.update(found)
+        return {zip_code: known[zip_code] for zip_code in zip_codes if zip_code in known}
+
+    async def _forecast_periods(self, zip_code):
+        """Forecast periods for a zip from its grid cell's cached forecast, or None if it couldn't be fetched."""
+        point = (await self._zip_points([zip_code])).get(zip_code)
+        if not point or not point.get("forecast"):
+            return None
+        data = await self.responses.get(("forecast", point["grid"]), FORECAST_TTL, lambda: self._fetch_json(point["forecast"]))
+        if data is None:
+            return None
+        return data.get('properties', {}).get('periods', [])
 
-                data = await response.json()
-                alerts = data.get('features', [])
-                severe_alerts = [alert for alert in alerts if alert['properties']['severity'] in ['Severe', 'Extreme']]
-
-                if severe_alerts:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        sent_alerts = user_data.get("sent_alerts", [])
-                        new_alerts = [alert for alert in severe_alerts if alert['id'] not in sent_alerts]
-
-                        if new_alerts:
-                            for alert in new_alerts:
-                                embed = discord.Embed(
-                                    title=alert['properties']['event'],
-                                    description=f"{'An' if alert['properties']['event'][0].lower() in 'aeiou' else 'A'} **{alert['properties']['event']}** was issued at **<t:{int(datetime.fromisoformat(alert['properties']['sent']).timestamp())}:F>** for your location and is in effect until **<t:{int(datetime.fromisoformat(alert['properties']['expires']).timestamp())}:F>**.",
-                                    color=0xff4545
-                                )
-                                if 'instruction' in alert['properties']:
-                                    embed.add_field(name="Instruction", value=alert['properties']['instruction'], inline=False)
-                                if 'severity' in alert['properties']:
-                                    embed.add_field(name="Severity", value=alert['properties']['severity'], inline=True)
-                                if 'urgency' in alert['properties']:
-                                    embed.add_field(name="Urgency", value=alert['properties']['urgency'], inline=True)
-                                if 'certainty' in alert['properties']:
-                                    embed.add_field(name="Certainty", value=alert['properties']['certainty'], inline=True)
-                                if 'senderName' in alert['properties']:
-                                    embed.set_footer(text=f"Issued by {alert['properties']['senderName']}")
-
-                                await user.send(embed=embed)
-                                sent_alerts.append(alert['id'])
-
-                            await self.config.user_from_id(user_id).sent_alerts.set(sent_alerts)
-                            total_alerts_sent = await self.config.total_alerts_sent()
-                            await self.config.total_alerts_sent.set(total_alerts_sent + len(new_alerts))
+    async def check_weather_alerts(self):
+        """
+        Check for weather alerts and DM users if any severe or extreme warnings are issued.
+
+        Active alerts are pulled nationwide in one request and matched to each subscribed zip
+        locally: by polygon when the alert has one, otherwise by the zip's forecast zone or county.
+        """
+        if self.alert_ledger is None:
+            self.alert_ledger = AlertLedger(await self.config.alert_ledger())
+        if self.alert_ledger.prune():
+            await self.config.alert_ledger.set(self.alert_ledger.to_config())
+        all_users = await self.config.all_users()
+        subscribers = self._subscribers(all_users, "severealerts")
+        if not subscribers:
+            return
+
+        async with self.session.get("https://api.weather.gov/alerts/active", params={"status": "actual", "severity": "Severe,Extreme"}) as response:
+            if response.status != 200:
+                return
+            alerts = (await response.json()).get('features', [])
+        if not alerts:
+            return
+        await self._migrate_sent_alerts(all_users, alerts)
+
+        zip_points = await self._zip_points(list(subscribers))
+        by_zone = {}
+        for alert in alerts:
+            if not alert.get('geometry'):
+                for zone in alert['properties'].get('geocode', {}).get('UGC', []):
+                    by_zone.setdefault(zone, []).append(alert)
+
+        deliveries = []
+        for zip_code, user_ids in subscribers.items():
+            latitude, longitude = self.zip_codes[zip_code]
+            matched = {alert['id']: alert for alert in alerts if alert.get('geometry') and point_in_geometry(latitude, longitude, alert['geometry'])}
+            for zone in zip_points.get(zip_code, {}).get("zones", []):
+                matched.update((alert['id'], alert) for alert in by_zone.get(zone, []))
+            if not matched:
+                continue
+            for user_id in user_ids:
+                new_alerts = [alert for alert in matched.values() if (user_id, alert['id']) not in self.alert_ledger]
+                if new_alerts:
+                    deliveries.append((user_id, new_alerts))
+
+        delivered = await self._send_dms([(user_id, [self._severe_alert_embed(alert) for alert in new_alerts]) for user_id, new_alerts in deliveries])
+        for user_id, new_alerts in deliveries:
+            for alert in new_alerts[:delivered[user_id]]:
+                self.alert_ledger.add(user_id, alert)
+        await self.config.alert_ledger.set(self.alert_ledger.to_config())
+        self._count("total_alerts_sent", sum(delivered.values()))
+
+    async def _migrate_sent_alerts(self, all_users, alerts):
+        """
+        Move the per-user `sent_alerts` lists used before the ledger into it.
+
+        Every user with a list is migrated, subscribed or not, against every active alert nationwide, so
+        nothing already delivered is sent again. Ids of alerts that are no longer active can't be resent
+        and are dropped. A user's list is only cleared once the ledger holding its ids has been saved.
+        """
+        legacy_users = {user_id: set(data["sent_alerts"]) for user_id, data in all_users.items() if data.get("sent_alerts")}
+        if not legacy_users:
+            return
+        for alert in alerts:
+            for user_id, sent in legacy_users.items():
+                if alert['id'] in sent:
+                    self.alert_ledger.add(user_id, alert)
+        await self.config.alert_ledger.set(self.alert_ledger.to_config())
+        await asyncio.gather(*(self.config.user_from_id(user_id).sent_alerts.clear() for user_id in legacy_users))
+        for user_id in legacy_users:
+            all_users[user_id]["sent_alerts"] = []
 
     async def start_severe_alerts_task(self):
         while True:
-            await self.check_weather_alerts()
+            try:
+                await self.check_weather_alerts()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Error checking weather alerts: {e}")
             await asyncio.sleep(900)
 
     @commands.cooldown(1, 900, commands.BucketType.user)
@@ -1206,44 +1403,38 @@ class Weather(commands.Cog):
         status = "enabled" if not freeze_alerts_enabled else "disabled"
         await ctx.send(f"Freeze alerts have been {status} for your location.")
 
-    async def check_freeze_alerts(self):
-        """Check for upcoming dangerously cold temperatures and DM users if any are expected"""
-        all_users = await self.config.all_users()
-        users_with_freeze_alerts = [user_id for user_id, data in all_users.items() if data.get("freezealerts")]
-
-        for user_id in users_with_freeze_alerts:
-            user_data = await self.config.user_from_id(user_id).all()
-            zip_code = user_data.get("zip_code")
-            if not zip_code or zip_code not in self.zip_codes:
-                continue
+    async def _forecast_periods_by_zip(self, zip_codes):
+        """Forecast periods for each zip, fetched once per grid cell with bounded concurrency."""
+        await self._zip_points(zip_codes)
+        semaphore = asyncio.Semaphore(ALERT_FETCH_CONCURRENCY)
 
-            latitude, longitude = self.zip_codes[zip_code]
-            forecast_url = f"https://api.weather.gov/points/{latitude.strip()},{longitude.strip()}/forecast"
+        async def fetch(zip_code):
+            async with semaphore:
+                return zip_code, await self._forecast_periods(zip_code) or []
 
-            async with self.session.get(forecast_url) as response:
-                if response.status != 200:
-                    continue
+        return dict(await asyncio.gather(*(fetch(zip_code) for zip_code in zip_codes)))
 
-                data = await response.json()
-                periods = data.get('properties', {}).get('periods', [])
-                cold_alerts = [period for period in periods if period['temperature'] <= 10]
-
-                if cold_alerts:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        for alert in cold_alerts:
-                            embed = discord.Embed(
-                                title="Extreme cold alert",
-                                description=f"Expected dangerously cold temperatures: {alert['temperature']}°F",
-                                color=0x1E90FF
-                            )
-                            embed.add_field(name="Time", value=alert['name'], inline=True)
-                            embed.add_field(name="Detailed Forecast", value=alert['detailedForecast'], inline=False)
-                            embed.set_footer(text="Stay warm and take necessary precautions.")
-
-                            await user.send(embed=embed)
-                            total_freeze_alerts_sent = await self.config.total_freeze_alerts_sent()
-                            await self.config.total_freeze_alerts_sent.set(total_freeze_alerts_sent + 1)
+    async def check_freeze_alerts(self):
+        """Check for upcoming dangerously cold temperatures and DM users if any are expected"""
+        subscribers = self._subscribers(await self.config.all_users(), "freezealerts")
+        periods_by_zip = await self._forecast_periods_by_zip(list(subscribers))
+        deliveries = []
+        for zip_code, user_ids in subscribers.items():
+            embeds = []
+            for alert in [period for period in periods_by_zip.get(zip_code, []) if period['temperature'] <= 10]:
+                embed = discord.Embed(
+                    title="Extreme cold alert",
+                    description=f"Expected dangerously cold temperatures: {alert['temperature']}°F",
+                    color=0x1E90FF
+                )
+                embed.add_field(name="Time", value=alert['name'], inline=True)
+                embed.add_field(name="Detailed Forecast", value=alert['detailedForecast'], inline=False)
+                embed.set_footer(text="Stay warm and take necessary precautions.")
+                embeds.append(embed)
+            if embeds:
+                deliveries.extend((user_id, embeds) for user_id in user_ids)
+        delivered = await self._send_dms(deliveries)
+        self._count("total_freeze_alerts_sent", sum(delivered.values()))
 
     async def start_freeze_alerts_task(self):
         while True:
@@ -1262,42 +1453,25 @@ class Weather(commands.Cog):
 
     async def check_heat_alerts(self):
         """Check for upcoming dangerously hot temperatures and DM users if any are expected"""
-        all_users = await self.config.all_users()
-        users_with_heat_alerts = [user_id for user_id, data in all_users.items() if data.get("heatalerts")]
-
-        for user_id in users_with_heat_alerts:
-            user_data = await self.config.user_from_id(user_id).all()
-            zip_code = user_data.get("zip_code")
-            if not zip_code or zip_code not in self.zip_codes:
-                continue
-
-            latitude, longitude = self.zip_codes[zip_code]
-            forecast_url = f"https://api.weather.gov/points/{latitude.strip()},{longitude.strip()}/forecast"
-
-            async with self.session.get(forecast_url) as response:
-                if response.status != 200:
-                    continue
-
-                data = await response.json()
-                periods = data.get('properties', {}).get('periods', [])
-                heat_alerts = [period for period in periods if period['temperature'] >= 100]
-
-                if heat_alerts:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        for alert in heat_alerts:
-                            embed = discord.Embed(
-                                title="Extreme heat alert",
-                                description=f"Expected dangerously hot temperatures: {alert['temperature']}°F",
-                                color=0xFF4500
-                            )
-                            embed.add_field(name="Time", value=alert['name'], inline=True)
-                            embed.add_field(name="Detailed Forecast", value=alert['detailedForecast'], inline=False)
-                            embed.set_footer(text="Stay cool and take necessary precautions.")
-
-                            await user.send(embed=embed)
-                            total_heat_alerts_sent = await self.config.total_heat_alerts_sent()
-                            await self.config.total_heat_alerts_sent.set(total_heat_alerts_sent + 1)
+        subscribers = self._subscribers(await self.config.all_users(), "heatalerts")
+        periods_by_zip = await self._forecast_periods_by_zip(list(subscribers))
+        deliveries = []
+        for zip_code, user_ids in subscribers.items():
+            embeds = []
+            for alert in [period for period in periods_by_zip.get(zip_code, []) if period['temperature'] >= 100]:
+                embed = discord.Embed(
+                    title="Extreme heat alert",
+                    description=f"Expected dangerously hot temperatures: {alert['temperature']}°F",
+                    color=0xFF4500
+                )
+                embed.add_field(name="Time", value=alert['name'], inline=True)
+                embed.add_field(name="Detailed Forecast", value=alert['detailedForecast'], inline=False)
+                embed.set_footer(text="Stay cool and take necessary precautions.")
+                embeds.append(embed)
+            if embeds:
+                deliveries.extend((user_id, embeds) for user_id in user_ids)
+        delivered = await self._send_dms(deliveries)
+        self._count("total_heat_alerts_sent", sum(delivered.values()))
 
     async def start_heat_alerts_task(self):
         while True:
@@ -1307,7 +1481,7 @@ class Weather(commands.Cog):
     @weatherset.command(name="zip")
     async def zip(self, ctx, zip_code: str):
         """Set your zip code for queries"""
-        # Validate the zip code against zipcodes.csv
+        # Validate the zip code against the zip code index
         if zip_code not in self.zip_codes:
             embed = discord.Embed(
                 title="Invalid Zip Code",
@@ -0,0 +1,162 @@
+"""
+Compact, memory-mapped zip code index for WeatherPro.
+
+`data/zipcodes.bin` is built once from `data/zipcodes.csv` by running this file directly:
+
+    python weatherpro/zipindex.py
+
+Layout (little-endian): an 8 byte header (`ZIP1` + row count), then four arrays of `count` entries:
+zip codes as sorted uint32, float32 latitudes, float32 longitudes, and uint32 row numbers ordered by
+latitude for nearest-zip lookups.
+"""
+
+import array
+import bisect
+import csv
+import math
+import mmap
+import struct
+import sys
+from pathlib import Path
+
+MAGIC = b"ZIP1"
+HEADER = struct.Struct("<4sI")
+EARTH_RADIUS_KM = 6371.0
+
+
+def is_zip_code(value):
+    """Five ASCII digits; `str.isdigit()` alone would also accept characters like `²` that `int()` can't parse."""
+    return len(value) == 5 and value.isascii() and value.isdigit()
+
+
+class ZipIndex:
+    """Zip code to coordinates, searched with bisect over the memory-mapped arrays."""
+
+    def __init__(self, buffer, mapping=None):
+        magic, count = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a zip code index")
+        self._mapping = mapping
+        self.zips, self.lats, self.lons, self.by_lat = (
+            self._column(buffer, HEADER.size + column * count * 4, count, typecode)
+            for column, typecode in enumerate("IffI")
+        )
+
+    @staticmethod
+    def _column(buffer, offset, count, typecode):
+        view = memoryview(buffer)[offset:offset + count * 4]
+        if sys.byteorder == "little":
+            return view.cast(typecode)
+        values = array.array(typecode, view)
+        values.byteswap()
+        return values
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as index_file:
+            mapping = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapping, mapping)
+
+    def close(self):
+        for column in (self.zips, self.lats, self.lons, self.by_lat):
+            if isinstance(column, memoryview):
+                column.release()
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __len__(self):
+        return len(self.zips)
+
+    def _row(self, zip_code):
+        if not isinstance(zip_code, str) or not is_zip_code(zip_code):
+            return None
+        value = int(zip_code)
+        row = bisect.bisect_left(self.zips, value)
+        if row < len(self.zips) and self.zips[row] == value:
+            return row
+        return None
+
+    def __contains__(self, zip_code):
+        return self._row(zip_code) is not None
+
+    def __getitem__(self, zip_code):
+        row = self._row(zip_code)
+        if row is None:
+            raise KeyError(zip_code)
+        return self.lats[row], self.lons[row]
+
+    def get(self, zip_code, default=None):
+        row = self._row(zip_code)
+        return default if row is None else (self.lats[row], self.lons[row])
+
+    def nearest(self, latitude, longitude, max_km=100.0):
+        """The closest zip code to a point as `(zip_code, distance_km)`, or None if none are within `max_km`."""
+        lat_rad = math.radians(latitude)
+        km_per_degree = math.pi * EARTH_RADIUS_KM / 180
+        best = None
+        best_km = max_km
+        start = bisect.bisect_left(_LatitudeView(self), latitude)
+        # Walk outward in latitude order; stop each way once latitude alone rules out a closer zip
+        for step, stop in ((-1, -1), (1, len(self.by_lat))):
+            position = start - 1 if step < 0 else start
+            while position != stop:
+                row = self.by_lat[position]
+                if abs(self.lats[row] - latitude) * km_per_degree > best_km:
+                    break
+                row_lat = math.radians(self.lats[row])
+                d_lat = row_lat - lat_rad
+                d_lon = math.radians(self.lons[row] - longitude)
+                a = math.sin(d_lat / 2) ** 2 + math.cos(lat_rad) * math.cos(row_lat) * math.sin(d_lon / 2) ** 2
+                distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+                if distance <= best_km:
+                    best, best_km = row, distance
+                position += step
+        if best is None:
+            return None
+        return f"{self.zips[best]:05d}", best_km
+
+
+class _LatitudeView:
+    """Latitudes in `by_lat` order, so bisect can search them without building a list."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index.by_lat)
+
+    def __getitem__(self, position):
+        return self.index.lats[self.index.by_lat[position]]
+
+
+def build(csv_path, index_path):
+    """Convert `zipcodes.csv` (`ZIP,LAT,LNG`) into the binary index. Rows that aren't plain 5 digit zips are skipped."""
+    rows = {}
+    with open(csv_path, newline="") as csv_file:
+        reader = csv.reader(csv_file)
+        next(reader)
+        for zip_code, latitude, longitude in reader:
+            zip_code = zip_code.strip()
+            if is_zip_code(zip_code):
+                rows[int(zip_code)] = (float(latitude), float(longitude))
+    zips = sorted(rows)
+    columns = [
+        array.array("I", zips),
+        array.array("f", (rows[zip_code][0] for zip_code in zips)),
+        array.array("f", (rows[zip_code][1] for zip_code in zips)),
+    ]
+    columns.append(array.array("I", sorted(range(len(zips)), key=lambda row: columns[1][row])))
+    with open(index_path, "wb") as index_file:
+        index_file.write(HEADER.pack(MAGIC, len(zips)))
+        for column in columns:
+            if sys.byteorder != "little":
+                column.byteswap()
+            column.tofile(index_file)
+    return len(zips)
+
+
+if __name__ == "__main__":
+    data_dir = Path(__file__).resolve().parent / "data"
+    count = build(data_dir / "zipcodes.csv", data_dir / "zipcodes.bin")
+    print(f"Wrote {count} zip codes to {data_dir / 'zipcodes.bin'}")